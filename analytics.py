@@ -0,0 +1,283 @@
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from archive import MATCH_COLUMNS_SQL
+from config.os_config import ROOT_DIR
+from config.scraper_config import ANALYTICS_CHUNK_ROWS, OUTPUT_FORMAT
+from output import DEFAULT_OUTPUT_NAMES, OUTPUT_FORMATS
+
+# Odds analytics over an archive written by main.py, computed on NumPy columns one chunk
+# at a time so memory stays bounded however large the archive is, e.g.
+#   python analytics.py --by season --min-matches 50
+#   python analytics.py --input-format sqlite --by player --csv players.csv
+
+# Sets won by each player at the start of the space-joined score column, e.g. '2 1'
+SCORE_PATTERN = r'^\s*(?P<sets1>\d+)\D+(?P<sets2>\d+)'
+# The CSV writes both odds into one column as 'odds1-odds2'
+CSV_ODDS_PATTERN = r'^(?P<odds1>[^-]*)-(?P<odds2>.*)$'
+# Bytes the CSV reader parses per block; blocks are gathered into chunks of chunk_rows
+CSV_BLOCK_BYTES = 16 * 1024 * 1024
+
+# Columns each summary is grouped by
+GROUPINGS = {
+    'tournament': ['country', 'tournament'],
+    'season': ['country', 'tournament', 'year'],
+    'year': ['year'],
+    'player': ['player'],
+}
+
+
+def _numbers(strings):
+    """Float64 array of the numeric strings in an Arrow string array, NaN for anything else such as 'N/A'."""
+    strings = pc.utf8_trim_whitespace(strings)
+    numeric = pc.match_substring_regex(strings, r'^\d+(\.\d+)?$')
+    return pc.cast(pc.if_else(numeric, strings, pa.scalar(None, pa.string())), pa.float64())
+
+
+def _chunks(batches, chunk_rows):
+    # Readers hand out batches of their own size (Parquet batches never span files, a
+    # partitioned dataset has many small ones and a CSV block may hold far more rows than
+    # chunk_rows), so they are regrouped into tables of exactly chunk_rows rows
+    pending = []
+    rows = 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        if rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            offset = 0
+            while rows - offset >= chunk_rows:
+                yield table.slice(offset, chunk_rows)
+                offset += chunk_rows
+            pending = table.slice(offset).to_batches()
+            rows -= offset
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def _csv_frames(path, chunk_rows):
+    import pyarrow.csv as pa_csv
+
+    names = ['country', 'tournament', 'date', 'time', 'player1', 'player2', 'score', 'odds']
+    reader = pa_csv.open_csv(
+        str(path),
+        read_options=pa_csv.ReadOptions(column_names=names, skip_rows=1, block_size=CSV_BLOCK_BYTES),
+        convert_options=pa_csv.ConvertOptions(column_types={name: pa.string() for name in names}),
+    )
+    for table in _chunks(reader, chunk_rows):
+        odds = pc.extract_regex(table['odds'], CSV_ODDS_PATTERN)
+        date = pc.strptime(table['date'], format='%Y%m%d', unit='s', error_is_null=True)
+        yield pa.table({
+            'country': table['country'],
+            'tournament': table['tournament'],
+            # The CSV has no season column, the calendar year of the match stands in for it
+            'year': pc.if_else(pc.is_valid(date), pc.utf8_slice_codeunits(table['date'], 0, 4), 'N/A'),
+            'date': date,
+            'player1': table['player1'],
+            'player2': table['player2'],
+            'score': table['score'],
+            'odds1': _numbers(pc.struct_field(odds, [0])),
+            'odds2': _numbers(pc.struct_field(odds, [1])),
+        }).to_pandas(date_as_object=False)
+
+
+def _parquet_frames(path, chunk_rows):
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(
+        pa.schema([('country', pa.string()), ('tournament', pa.string()), ('year', pa.string())]), flavor='hive'
+    )
+    dataset = ds.dataset(str(path), format='parquet', partitioning=partitioning)
+    columns = ['country', 'tournament', 'year', 'date', 'player1', 'player2', 'score', 'odds1', 'odds2']
+    for table in _chunks(dataset.to_batches(columns=columns, batch_size=chunk_rows), chunk_rows):
+        yield table.to_pandas(date_as_object=False)
+
+
+def _sqlite_frames(path, chunk_rows):
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        for chunk in pd.read_sql_query(f"{MATCH_COLUMNS_SQL} ORDER BY m.id", connection, chunksize=chunk_rows):
+            chunk = chunk.rename(columns={'season': 'year'})
+            chunk['date'] = pd.to_datetime(chunk['date'], format='%Y-%m-%d', errors='coerce')
+            chunk['odds1'] = chunk['odds1'].astype(float)
+            chunk['odds2'] = chunk['odds2'].astype(float)
+            yield chunk
+    finally:
+        connection.close()
+
+
+def iter_frames(output_format, path, chunk_rows=ANALYTICS_CHUNK_ROWS):
+    """
+    Stream an archive as DataFrames of at most `chunk_rows` matches, with typed
+    columns: datetime64 dates, float odds (NaN when not listed) and the season as 'year'.
+    """
+    if output_format == 'csv':
+        return _csv_frames(path, chunk_rows)
+    if output_format == 'parquet':
+        return _parquet_frames(path, chunk_rows)
+    if output_format == 'sqlite':
+        return _sqlite_frames(path, chunk_rows)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def add_metrics(frame):
+    """
+    Add the per-match columns every summary is built from, without a Python loop:
+
+        sets1, sets2        sets won, parsed from the score (NaN when it has none)
+        winner              1 or 2, 0 when the score does not decide it
+        implied1, implied2  1 / odds, NaN unless both odds are listed
+        margin              bookmaker margin, implied1 + implied2 - 1
+        favourite           1 or 2 for the shorter odds, 0 when unpriced or level
+        favourite_won       favourite and winner are both known and the same
+        favourite_profit    profit of 1 unit on the favourite at the archived odds
+        underdog_profit     the same for the underdog
+    """
+    sets = pc.extract_regex(pa.array(frame['score'], type=pa.string(), from_pandas=True), SCORE_PATTERN)
+    sets1 = pc.cast(pc.struct_field(sets, [0]), pa.float64()).to_numpy(zero_copy_only=False)
+    sets2 = pc.cast(pc.struct_field(sets, [1]), pa.float64()).to_numpy(zero_copy_only=False)
+    winner = np.select([sets1 > sets2, sets2 > sets1], [1, 2], 0)
+
+    odds1 = frame['odds1'].to_numpy(dtype=float)
+    odds2 = frame['odds2'].to_numpy(dtype=float)
+    priced = (odds1 > 1) & (odds2 > 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        implied1 = np.where(priced, 1 / odds1, np.nan)
+        implied2 = np.where(priced, 1 / odds2, np.nan)
+    favourite = np.select([priced & (odds1 < odds2), priced & (odds2 < odds1)], [1, 2], 0)
+    decided = (favourite > 0) & (winner > 0)
+    favourite_won = decided & (favourite == winner)
+    favourite_odds = np.where(favourite == 1, odds1, odds2)
+    underdog_odds = np.where(favourite == 1, odds2, odds1)
+
+    return frame.assign(
+        sets1=sets1, sets2=sets2, winner=winner, implied1=implied1, implied2=implied2,
+        margin=implied1 + implied2 - 1, favourite=favourite, favourite_won=favourite_won,
+        favourite_profit=np.where(decided, np.where(favourite_won, favourite_odds - 1, -1.0), np.nan),
+        underdog_profit=np.where(decided, np.where(favourite_won, -1.0, underdog_odds - 1), np.nan),
+    )
+
+
+def _group_partials(frame, keys):
+    # Sums only, so the partials of every chunk can simply be added up
+    priced = frame['margin'].notna().to_numpy()
+    decided = frame['favourite_profit'].notna().to_numpy()
+    sums = pd.DataFrame({
+        'matches': 1,
+        'priced': priced,
+        'margin_sum': np.where(priced, frame['margin'].to_numpy(), 0.0),
+        'decided': decided,
+        'favourite_wins': frame['favourite_won'].to_numpy(),
+        'favourite_profit': np.where(decided, frame['favourite_profit'].to_numpy(), 0.0),
+        'underdog_profit': np.where(decided, frame['underdog_profit'].to_numpy(), 0.0),
+    }, index=frame.index)
+    for key in keys:
+        sums[key] = frame[key].astype(str)
+    return sums.groupby(keys, sort=False).sum()
+
+
+def _player_partials(frame):
+    # One row per player and match, the player's own odds and result side by side
+    winner = frame['winner'].to_numpy()
+    implied1 = frame['implied1'].to_numpy()
+    implied2 = frame['implied2'].to_numpy()
+    overround = implied1 + implied2
+    odds = np.concatenate([frame['odds1'].to_numpy(dtype=float), frame['odds2'].to_numpy(dtype=float)])
+    decided = np.tile(winner > 0, 2)
+    won = np.concatenate([winner == 1, winner == 2])
+    bet = decided & ~np.isnan(np.concatenate([implied1, implied2]))
+    with np.errstate(invalid='ignore'):
+        fair_probability = np.concatenate([implied1 / overround, implied2 / overround])
+    favourite = frame['favourite'].to_numpy()
+    sums = pd.DataFrame({
+        'player': np.concatenate([frame['player1'].astype(str).to_numpy(), frame['player2'].astype(str).to_numpy()]),
+        'matches': 1,
+        'decided': decided,
+        'wins': won,
+        'bets': bet,
+        'profit': np.where(bet, np.where(won, odds - 1, -1.0), 0.0),
+        'expected_wins': np.where(bet, fair_probability, 0.0),
+        'bet_wins': bet & won,
+        'favourite_matches': np.concatenate([favourite == 1, favourite == 2]),
+    })
+    return sums.groupby('player', sort=False).sum()
+
+
+def _finish_groups(totals):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'matches': totals['matches'].astype(int),
+            'priced': totals['priced'].astype(int),
+            'mean_margin': totals['margin_sum'] / totals['priced'],
+            'favourite_win_rate': totals['favourite_wins'] / totals['decided'],
+            'favourite_roi': totals['favourite_profit'] / totals['decided'],
+            'underdog_roi': totals['underdog_profit'] / totals['decided'],
+        })
+
+
+def _finish_players(totals):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'matches': totals['matches'].astype(int),
+            'wins': totals['wins'].astype(int),
+            'win_rate': totals['wins'] / totals['decided'],
+            # Wins against what the odds, without the margin, gave the player
+            'expected_win_rate': totals['expected_wins'] / totals['bets'],
+            'actual_win_rate': totals['bet_wins'] / totals['bets'],
+            'roi': totals['profit'] / totals['bets'],
+            'favourite_share': totals['favourite_matches'] / totals['matches'],
+        })
+
+
+def summarize(output_format, path, by='season', chunk_rows=ANALYTICS_CHUNK_ROWS):
+    """
+    Margin, favourite accuracy and closing-odds ROI of an archive grouped `by` one of
+    GROUPINGS, largest groups first. Each chunk is reduced to per-group sums before the
+    next one is read, so memory grows with the number of groups, not of matches.
+    """
+    keys = GROUPINGS[by]
+    totals = None
+    for frame in iter_frames(output_format, path, chunk_rows):
+        frame = add_metrics(frame)
+        partials = _player_partials(frame) if by == 'player' else _group_partials(frame, keys)
+        totals = partials if totals is None else totals.add(partials, fill_value=0)
+    if totals is None:
+        return pd.DataFrame()
+    summary = _finish_players(totals) if by == 'player' else _finish_groups(totals)
+    return summary.sort_values('matches', ascending=False, kind='stable')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Odds analytics over the match archive")
+    parser.add_argument('--input-format', choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT,
+                        help="Format of the archive written by main.py")
+    parser.add_argument('--input', default=None,
+                        help="CSV file, Parquet directory or SQLite file to read "
+                             "(default: matches.csv / matches_parquet / matches.db in the root)")
+    parser.add_argument('--by', choices=list(GROUPINGS), default='season', help="How matches are grouped")
+    parser.add_argument('--min-matches', type=int, default=1, help="Leave out groups with fewer matches")
+    parser.add_argument('--top', type=int, default=30, help="Groups to print")
+    parser.add_argument('--chunk-rows', type=int, default=ANALYTICS_CHUNK_ROWS,
+                        help="Matches held in memory at once")
+    parser.add_argument('--csv', default=None, help="Also write the whole summary to this CSV file")
+    args = parser.parse_args()
+
+    input_path = args.input or os.path.join(ROOT_DIR, DEFAULT_OUTPUT_NAMES[args.input_format])
+    start = time.perf_counter()
+    result = summarize(args.input_format, input_path, args.by, args.chunk_rows)
+    if not result.empty:
+        result = result[result['matches'] >= args.min_matches]
+    elapsed = time.perf_counter() - start
+
+    if args.csv:
+        result.to_csv(args.csv, float_format='%.4f')
+    with pd.option_context('display.width', 160, 'display.max_columns', None, 'display.float_format', '{:.3f}'.format):
+        print(result.head(args.top))
+    print(f"{len(result)} groups by {args.by} in {elapsed:.2f}s")
@@ -0,0 +1,201 @@
+import os
+from datetime import date
+from typing import NamedTuple, Optional
+
+from browser_lifecycle import BrowserLifecycle
+from config.scraper_config import (
+    BLOCK_RESOURCES, CACHE_DIR, EXTRACTION_ENGINE, FETCH_MODE, FRONTIER_PATH, HTTP_POOL_SIZE, PROFILE_DIR,
+    RESULTS_URL, RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+)
+from extractor import extract_page_meta
+from output import read_rows, to_date, to_float
+from retry import RetryPolicy, call_with_retries
+from scraper import YearJob, fetch_season, fetch_year_http, iter_cached_rows, parse_year
+
+# Streaming access to the scraper from other Python code, e.g.
+#   import api
+#   for match in api.iter_matches('https://www.oddsportal.com/tennis/australia/australian-open-2024/results/'):
+#       print(match.player1, match.player2, match.odds1, match.odds2)
+# Nothing here imports Selenium: the discovery steps and the browser are only loaded when
+# a page actually has to be opened in Chrome, so the offline readers start immediately.
+
+
+class Match(NamedTuple):
+    """One match with its closing odds; dates and odds the site did not list are None."""
+    country: str
+    tournament: str
+    season: Optional[str]
+    date: Optional[date]
+    time: str
+    player1: str
+    player2: str
+    score: str
+    odds1: Optional[float]
+    odds2: Optional[float]
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a Match from a row dict as the crawler writes it."""
+        return cls(
+            row['country'], row['tournament'], row.get('year'), to_date(row['date']), row['time'],
+            row['player1'], row['player2'], row['score'], to_float(row['odds1']), to_float(row['odds2']),
+        )
+
+
+class Tournament(NamedTuple):
+    """A tournament of the results page with the URLs of all of its seasons."""
+    country_name: str
+    tournament_name: str
+    tournament_url: str
+    year_urls: list
+
+
+class Scraper:
+    """
+    Lazily scrapes tournaments and matches, one page at a time as the caller iterates.
+    The browser is started on the first page that needs it (with fetch_mode 'http' a
+    season may never need it) and is recycled like the crawler's main browser. Use it
+    as a context manager, or call close(), to quit the browser.
+    """
+
+    def __init__(self, results_url=RESULTS_URL, engine=EXTRACTION_ENGINE, fetch_mode=FETCH_MODE,
+                 block_resources=BLOCK_RESOURCES, profile_dir=PROFILE_DIR, cache=None,
+                 retry_policy=RetryPolicy(RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)):
+        self.results_url = results_url
+        self.engine = engine
+        self.block_resources = block_resources
+        self.profile_dir = profile_dir
+        self.cache = cache
+        self.retry_policy = retry_policy
+        self.browser = BrowserLifecycle(self._start_browser, 'api')
+        self.http = None
+        if fetch_mode == 'http':
+            # requests is only loaded when the HTTP path is wanted
+            from fetcher import HttpFetcher
+            self.http = HttpFetcher(pool_size=HTTP_POOL_SIZE)
+
+    def _start_browser(self):
+        from driver_caller import Driver
+
+        return Driver(self.block_resources, self.profile_dir).get_driver()
+
+    def _driver(self):
+        """The browser, started on first use and restarted between pages once it is worn out."""
+        if self.browser.due():
+            return self.browser.recycle()
+        if self.browser.driver is None:
+            driver = self.browser.start()
+            # Accept the consent once, so the season pages and the HTTP session get its cookie
+            self._open_results_page(driver)
+            return driver
+        return self.browser.driver
+
+    def _open_results_page(self, driver):
+        from discovery import accept_cookies, open_results_page
+
+        call_with_retries(lambda: open_results_page(driver, self.results_url), self.retry_policy, "results page")
+        accept_cookies(driver)
+        if self.http is not None:
+            self.http.adopt_browser(driver)
+
+    def iter_tournaments(self):
+        """
+        Yield a Tournament for every tournament on the results page. All tournament links
+        are collected first, while the results page is open; each tournament page is then
+        only opened when the caller asks for the next Tournament.
+        """
+        from discovery import collapse_country, expand_country, find_country_containers, read_tournament
+
+        started = self.browser.driver is not None
+        driver = self._driver()
+        if started:
+            self._open_results_page(driver)
+        country_containers = find_country_containers(driver)
+        total = len(country_containers)
+        tournament_urls = []
+        for idx, country in enumerate(country_containers, start=1):
+            tournament_urls.extend(call_with_retries(
+                lambda: expand_country(driver, country, idx, total), self.retry_policy, f"country {idx}/{total}"
+            ))
+            collapse_country(driver, country)
+
+        for tournament_url in tournament_urls:
+            country_name, tournament_name, year_urls = call_with_retries(
+                lambda: read_tournament(self._driver(), tournament_url), self.retry_policy,
+                f"tournament {tournament_url}"
+            )
+            yield Tournament(country_name, tournament_name, tournament_url, year_urls)
+
+    def iter_matches(self, year_url, country_name=None, tournament_name=None):
+        """
+        Yield the matches of one season page as Match records, a results page at a time.
+        Without the names (as given by iter_tournaments) they are read from the page itself.
+        """
+        job = YearJob(country_name, tournament_name, year_url, year_url)
+        page = fetch_year_http(job, self.http, self.cache) if self.http is not None else None
+        in_browser = page is None
+        pages = fetch_season(self._driver(), job, self.engine, self.cache) if in_browser else [page]
+        for page in pages:
+            if job.country_name is None or job.tournament_name is None:
+                # A browser snapshot may hold only the matches list; the names are in the whole document
+                meta = extract_page_meta(self.browser.driver.page_source if in_browser else page.html)
+                job = job._replace(country_name=country_name or meta[0], tournament_name=tournament_name or meta[1])
+            if in_browser:
+                self.browser.page_done(page.fetch_seconds)
+            for row in parse_year(page._replace(job=job)):
+                yield Match.from_row(row)
+
+    def iter_all_matches(self):
+        """Yield every match of every season of every tournament, tournament by tournament."""
+        for tournament in self.iter_tournaments():
+            for year_url in tournament.year_urls:
+                yield from self.iter_matches(year_url, tournament.country_name, tournament.tournament_name)
+
+    def close(self):
+        self.browser.quit()
+        if self.http is not None:
+            self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_tournaments(**options):
+    """Yield every Tournament of the results page; `options` are passed on to Scraper."""
+    with Scraper(**options) as scraper:
+        yield from scraper.iter_tournaments()
+
+
+def iter_matches(year_url, country_name=None, tournament_name=None, **options):
+    """Yield the Match records of one season page; `options` are passed on to Scraper."""
+    with Scraper(**options) as scraper:
+        yield from scraper.iter_matches(year_url, country_name, tournament_name)
+
+
+def iter_archive_matches(output_format, path):
+    """Yield the Match records of an archive written by main.py ('csv', 'parquet' or 'sqlite')."""
+    for row in read_rows(output_format, path):
+        yield Match.from_row(row)
+
+
+def iter_cached_matches(cache_dir=CACHE_DIR, frontier_path=FRONTIER_PATH):
+    """
+    Yield the Match records of every page in the page cache, parsed offline like replay.py
+    does, with each match only once even when several cached pages list it.
+    """
+    from frontier import CrawlFrontier
+    from page_cache import PageCache
+
+    cache = PageCache(cache_dir)
+    frontier = CrawlFrontier(frontier_path) if os.path.exists(frontier_path) else None
+    try:
+        for _, rows in iter_cached_rows(cache, frontier):
+            for row in rows:
+                yield Match.from_row(row)
+    finally:
+        cache.close()
+        if frontier is not None:
+            frontier.close()
@@ -0,0 +1,329 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+from config.scraper_config import ARCHIVE_BATCH_ROWS
+from scraper import match_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS countries (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY,
+    country_id INTEGER NOT NULL REFERENCES countries (id),
+    name TEXT NOT NULL,
+    UNIQUE (country_id, name)
+);
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY,
+    match_key TEXT NOT NULL UNIQUE,
+    tournament_id INTEGER NOT NULL REFERENCES tournaments (id),
+    season TEXT,
+    date TEXT,
+    time TEXT,
+    player1_id INTEGER NOT NULL REFERENCES players (id),
+    player2_id INTEGER NOT NULL REFERENCES players (id),
+    score TEXT,
+    odds1 REAL,
+    odds2 REAL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_player1 ON matches (player1_id, date);
+CREATE INDEX IF NOT EXISTS matches_player2 ON matches (player2_id, date);
+CREATE INDEX IF NOT EXISTS matches_date ON matches (date);
+CREATE INDEX IF NOT EXISTS matches_tournament ON matches (tournament_id, season, date);
+"""
+
+# Re-scraping a match, e.g. from the current season page once it has finished, refreshes its
+# result and odds instead of adding a second row. A match first read from the 'Current' page
+# takes the season of its finished season page, but never goes back to 'Current', and odds
+# the site no longer lists do not wipe out the archived ones.
+UPSERT_MATCH_SQL = """
+INSERT INTO matches
+    (match_key, tournament_id, season, date, time, player1_id, player2_id, score, odds1, odds2, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (match_key) DO UPDATE SET
+    tournament_id = excluded.tournament_id,
+    season = CASE
+        WHEN excluded.season = 'Current' AND matches.season IS NOT NULL THEN matches.season
+        ELSE excluded.season
+    END,
+    score = excluded.score,
+    odds1 = COALESCE(excluded.odds1, matches.odds1),
+    odds2 = COALESCE(excluded.odds2, matches.odds2),
+    updated_at = excluded.updated_at
+"""
+
+# Long-format bookmaker odds from the match detail pages, one row per match, bookmaker and
+# player (outcome 1 or 2); kept in the match archive so it joins on matches.match_key
+BOOKMAKER_ODDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookmaker_odds (
+    match_key TEXT NOT NULL,
+    bookmaker TEXT NOT NULL,
+    outcome INTEGER NOT NULL,
+    opening_odds REAL,
+    closing_odds REAL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (match_key, bookmaker, outcome)
+) WITHOUT ROWID;
+"""
+
+UPSERT_BOOKMAKER_ODDS_SQL = """
+INSERT INTO bookmaker_odds (match_key, bookmaker, outcome, opening_odds, closing_odds, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (match_key, bookmaker, outcome) DO UPDATE SET
+    opening_odds = excluded.opening_odds,
+    closing_odds = excluded.closing_odds,
+    updated_at = excluded.updated_at
+"""
+
+MATCH_COLUMNS_SQL = """
+SELECT c.name AS country, t.name AS tournament, m.season, m.date, m.time,
+       p1.name AS player1, p2.name AS player2, m.score, m.odds1, m.odds2
+FROM matches m
+JOIN tournaments t ON t.id = m.tournament_id
+JOIN countries c ON c.id = t.country_id
+JOIN players p1 ON p1.id = m.player1_id
+JOIN players p2 ON p2.id = m.player2_id
+"""
+
+
+def _iso_date(value):
+    """'20240114' -> '2024-01-14', so dates sort and compare as text; None when unknown."""
+    try:
+        return datetime.strptime(value, '%Y%m%d').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+
+def _odds(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MatchArchive:
+    """
+    SQLite match archive with normalized country, tournament and player tables, one row
+    per match keyed by match_key (so re-written matches are upserted, not duplicated),
+    and indexes for the lookups below: a player's matches, head-to-heads, date ranges
+    and tournament seasons.
+
+    Also an output backend like CsvOutput and ParquetOutput: written rows are buffered
+    and stored in one transaction once `batch_rows` are waiting, with the ids of known
+    countries, tournaments and players cached in memory.
+    """
+
+    # The crawler hands an upserting backend the matches it wrote before as well, so a
+    # re-scraped match gets its new season, result and odds
+    upserts = True
+
+    def __init__(self, path, append=True, batch_rows=ARCHIVE_BATCH_ROWS):
+        self.path = str(path)
+        self.batch_rows = batch_rows
+        self.buffer = []
+        # Written to by the pipeline's writer thread, queried from any thread
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # A crash may lose the last transaction but never corrupts the file; the frontier redoes those pages
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if not append:
+            # Same as truncating the CSV
+            with self.connection:
+                self.connection.execute("BEGIN")
+                for table in ('matches', 'players', 'tournaments', 'countries'):
+                    self.connection.execute(f"DELETE FROM {table}")
+        self.country_ids = {name: row_id for row_id, name in self.connection.execute("SELECT id, name FROM countries")}
+        self.tournament_ids = {
+            (country_id, name): row_id
+            for row_id, country_id, name in self.connection.execute("SELECT id, country_id, name FROM tournaments")
+        }
+        self.player_ids = {name: row_id for row_id, name in self.connection.execute("SELECT id, name FROM players")}
+
+    def write_rows(self, rows):
+        self.buffer.extend(rows)
+
+    def flush(self, force=False):
+        """
+        Store the buffered rows once at least `batch_rows` are waiting (or always with
+        `force`); returns True once every written row is persisted.
+        """
+        if self.buffer and (force or len(self.buffer) >= self.batch_rows):
+            with self.lock, self.connection:
+                self.connection.execute("BEGIN")
+                self._store(self.buffer)
+            self.buffer = []
+        return not self.buffer
+
+    def _id(self, cache, table, key, columns, values):
+        row_id = cache.get(key)
+        if row_id is None:
+            placeholders = ', '.join('?' * len(values))
+            row_id = self.connection.execute(
+                f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", values
+            ).lastrowid
+            cache[key] = row_id
+        return row_id
+
+    def _store(self, rows):
+        now = datetime.now().isoformat(timespec='seconds')
+        matches = []
+        for row in rows:
+            country_id = self._id(self.country_ids, 'countries', row['country'], 'name', (row['country'],))
+            tournament_id = self._id(
+                self.tournament_ids, 'tournaments', (country_id, row['tournament']), 'country_id, name',
+                (country_id, row['tournament'])
+            )
+            player1_id = self._id(self.player_ids, 'players', row['player1'], 'name', (row['player1'],))
+            player2_id = self._id(self.player_ids, 'players', row['player2'], 'name', (row['player2'],))
+            matches.append((
+                match_key(row), tournament_id, row.get('year'), _iso_date(row['date']), row['time'],
+                player1_id, player2_id, row['score'], _odds(row['odds1']), _odds(row['odds2']), now,
+            ))
+        self.connection.executemany(UPSERT_MATCH_SQL, matches)
+
+    def close(self):
+        self.flush(force=True)
+        with self.lock:
+            self.connection.close()
+
+    def _query(self, where, params, order='m.date, m.time'):
+        with self.lock:
+            return [
+                dict(row) for row in self.connection.execute(
+                    f"{MATCH_COLUMNS_SQL} WHERE {where} ORDER BY {order}", params
+                )
+            ]
+
+    @staticmethod
+    def _date_range(since, until):
+        where, params = [], []
+        if since:
+            where.append("m.date >= ?")
+            params.append(since)
+        if until:
+            where.append("m.date <= ?")
+            params.append(until)
+        return where, params
+
+    def find_players(self, pattern):
+        """Return (id, name) of the players whose name contains `pattern`."""
+        with self.lock:
+            return [
+                tuple(row) for row in self.connection.execute(
+                    "SELECT id, name FROM players WHERE name LIKE ? ORDER BY name", (f'%{pattern}%',)
+                )
+            ]
+
+    def player_id(self, name):
+        """Id of the player called exactly `name`, or of the only player whose name contains it."""
+        with self.lock:
+            row = self.connection.execute("SELECT id FROM players WHERE name = ? COLLATE NOCASE", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        candidates = self.find_players(name)
+        if len(candidates) == 1:
+            return candidates[0][0]
+        if not candidates:
+            raise LookupError(f"No player matches {name!r}")
+        raise LookupError(f"{name!r} matches {len(candidates)} players: {', '.join(n for _, n in candidates[:10])}")
+
+    def player_matches(self, name, since=None, until=None):
+        """Every match of a player, oldest first; `since`/`until` are 'YYYY-MM-DD' dates."""
+        player_id = self.player_id(name)
+        where, params = self._date_range(since, until)
+        # Two indexed lookups instead of an OR that would scan the whole table
+        return self._query(
+            " AND ".join(["m.id IN (SELECT id FROM matches WHERE player1_id = ? "
+                          "UNION ALL SELECT id FROM matches WHERE player2_id = ?)"] + where),
+            [player_id, player_id] + params,
+        )
+
+    def head_to_head(self, name_a, name_b, since=None, until=None):
+        """Every match between two players, whichever side each was listed on, oldest first."""
+        a, b = self.player_id(name_a), self.player_id(name_b)
+        where, params = self._date_range(since, until)
+        return self._query(
+            " AND ".join(["((m.player1_id = ? AND m.player2_id = ?) OR (m.player1_id = ? AND m.player2_id = ?))"]
+                         + where),
+            [a, b, b, a] + params,
+        )
+
+    def tournament_season(self, tournament, season, country=None):
+        """The matches of one season of a tournament ('Current' for the running one)."""
+        where = ["t.name = ? COLLATE NOCASE", "m.season = ?"]
+        params = [tournament, season]
+        if country:
+            where.append("c.name = ? COLLATE NOCASE")
+            params.append(country)
+        return self._query(" AND ".join(where), params)
+
+    def iter_rows(self):
+        """Every match as a row dict in the shape the crawler writes, for merging and exporting."""
+        with self.lock:
+            cursor = self.connection.execute(f"{MATCH_COLUMNS_SQL} ORDER BY m.id")
+            rows = cursor.fetchmany(10000)
+        while rows:
+            for row in rows:
+                row = dict(row)
+                row['year'] = row.pop('season')
+                row['date'] = row['date'].replace('-', '') if row['date'] else 'N/A'
+                for field in ('odds1', 'odds2'):
+                    row[field] = repr(row[field]) if row[field] is not None else 'N/A'
+                yield row
+            with self.lock:
+                rows = cursor.fetchmany(10000)
+
+    def counts(self):
+        with self.lock:
+            return {
+                table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('matches', 'players', 'tournaments', 'countries')
+            }
+
+
+class BookmakerOddsArchive:
+    """
+    Output backend for the odds stage that upserts bookmaker odds rows into the
+    bookmaker_odds table of a match archive, one transaction per flush.
+    """
+
+    def __init__(self, path, append=True):
+        self.path = str(path)
+        self.buffer = []
+        self.connection = sqlite3.connect(self.path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(BOOKMAKER_ODDS_SCHEMA)
+        if not append:
+            self.connection.execute("DELETE FROM bookmaker_odds")
+
+    def write_rows(self, rows):
+        self.buffer.extend(rows)
+
+    def flush(self, force=False):
+        if self.buffer:
+            now = datetime.now().isoformat(timespec='seconds')
+            with self.connection:
+                self.connection.execute("BEGIN")
+                self.connection.executemany(UPSERT_BOOKMAKER_ODDS_SQL, (
+                    (row['match_key'], row['bookmaker'], row['outcome'], _odds(row['opening_odds']),
+                     _odds(row['closing_odds']), now)
+                    for row in self.buffer
+                ))
+            self.buffer = []
+        return True
+
+    def close(self):
+        self.flush(force=True)
+        self.connection.close()
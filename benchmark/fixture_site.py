@@ -0,0 +1,291 @@
+import argparse
+import html
+import random
+import re
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Synthetic stand-in for the oddsportal results pages, reproducing only the DOM the
+# crawler depends on: country <ul> containers with tournament links, the cookie
+# button, breadcrumbs, the year <select>, and eventRow divs with dates, participants,
+# scores and add-to-coupon-button odds. Optional images and a web font stand in for the
+# assets the crawler never reads, to measure browser-level resource blocking. With
+# rows_per_page, long seasons are split into results pages that a small script swaps in
+# on #/page/N/ like the real site, fetching each page's rows from ?page=N. Every match
+# links to a detail page with a bookmaker odds table whose opening odds, like on the real
+# site, only show up in a tooltip while an odds cell is hovered.
+
+STATIC_PATH_RE = re.compile(r'^/static/(?P<name>[\w-]+)\.(?P<ext>png|woff2)$')
+TOURNAMENT_PATH_RE = re.compile(r'^/tennis/(?P<country>[^/]+)/(?P<slug>[^/]+)/results/$')
+SEASON_SUFFIX_RE = re.compile(r'^(?P<tournament>.+)-(?P<year>\d{4})$')
+PAGE_QUERY_RE = re.compile(r'^page=(?P<page>\d+)$')
+MATCH_PATH_RE = re.compile(r'^/tennis/(?P<country>[^/]+)/(?P<tournament>[^/]+)/(?P<slug>[a-z]+-[a-z]+-\d+)/$')
+BOOKMAKERS = ['bet365', 'Pinnacle', 'Unibet', 'William Hill', 'bwin', '1xBet', 'Betfair', 'Marathonbet']
+SURNAMES = ['Alcaraz', 'Sinner', 'Djokovic', 'Medvedev', 'Zverev', 'Rublev', 'Ruud', 'Fritz', 'Hurkacz', 'Paul',
+            'Swiatek', 'Sabalenka', 'Gauff', 'Rybakina', 'Pegula', 'Jabeur', 'Zheng', 'Paolini', 'Navarro', 'Keys']
+
+# Swaps the rows of the results page named in the URL fragment into the match list, after a
+# short delay standing in for the real site's data request
+PAGINATION_SCRIPT = """<script>
+function showPage() {
+    const match = /^#\\/page\\/(\\d+)\\//.exec(location.hash);
+    const page = match ? match[1] : '1';
+    fetch(location.pathname + '?page=' + page).then(response => response.text()).then(rows => {
+        setTimeout(() => {
+            document.querySelector('.flex.flex-col.px-3.text-sm').innerHTML = rows;
+        }, 100);
+    });
+}
+window.addEventListener('hashchange', showPage);
+if (location.hash) {
+    showPage();
+}
+</script>"""
+
+# Shows the opening odds of a hovered odds cell in a tooltip, and removes it again on mouseout
+OPENING_ODDS_TOOLTIP_SCRIPT = """<script>
+document.querySelectorAll('[data-testid="odd-container"]').forEach(cell => {
+    cell.addEventListener('mouseenter', () => {
+        setTimeout(() => {
+            const tooltip = document.createElement('div');
+            tooltip.className = 'tooltip';
+            tooltip.innerHTML = '<div>Opening odds:</div><div>01 Dec, 10:00</div><div>' + cell.dataset.opening + '</div>';
+            document.body.appendChild(tooltip);
+        }, 20);
+    });
+    cell.addEventListener('mouseleave', () => {
+        setTimeout(() => document.querySelectorAll('.tooltip').forEach(tooltip => tooltip.remove()), 10);
+    });
+});
+</script>"""
+
+COOKIE_BUTTON = (
+    '<div id="onetrust-banner-sdk"><button id="onetrust-accept-btn-handler" '
+    'onclick="this.parentNode.remove()">I Accept</button></div>'
+)
+
+
+class FixtureSite:
+    """Shape of the synthetic archive: how many countries, tournaments, seasons and rows, and page padding."""
+
+    def __init__(self, countries=3, tournaments=4, years=3, rows=100, padding_kb=0, current_year=2024,
+                 images=0, asset_kb=20, rows_per_page=0):
+        self.countries = countries
+        self.tournaments = tournaments
+        self.years = years
+        self.rows = rows
+        self.padding_kb = padding_kb
+        self.current_year = current_year
+        self.images = images
+        self.asset_kb = asset_kb
+        self.rows_per_page = rows_per_page
+
+    def total_year_pages(self):
+        return self.countries * self.tournaments * (self.years + 1)
+
+    def total_rows(self):
+        return self.total_year_pages() * self.rows
+
+    def page_count(self):
+        """Results pages of every season; 0 rows_per_page keeps each season on one page."""
+        if not self.rows_per_page:
+            return 1
+        return max(1, -(-self.rows // self.rows_per_page))
+
+    def _document(self, title, body):
+        # Inert filler standing in for the scripts and markup that make real pages heavy
+        padding = f'<div class="hidden" aria-hidden="true">{"x" * 1024 * self.padding_kb}</div>' if self.padding_kb else ''
+        assets = head = ''
+        if self.images:
+            assets = ''.join(f'<img src="/static/img-{i}.png" alt="">' for i in range(self.images))
+            head = (
+                '<style>@font-face{font-family:Fixture;src:url(/static/font.woff2)}'
+                'body{font-family:Fixture,sans-serif}</style>'
+            )
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<title>{html.escape(title)}</title>{head}</head>'
+            f'<body>{COOKIE_BUTTON}{assets}{body}{padding}</body></html>'
+        )
+
+    def asset(self, name):
+        # Incompressible-looking bytes of the configured size; browsers only need to download them
+        return random.Random(name).randbytes(1024 * self.asset_kb)
+
+    def results_page(self, base_url):
+        containers = []
+        for c in range(1, self.countries + 1):
+            links = ''.join(
+                f'<li class="flex items-center"><a href="{base_url}/tennis/country-{c}/tournament-{t}/">'
+                f'Tournament {c}.{t}</a></li>'
+                for t in range(1, self.tournaments + 1)
+            )
+            containers.append(
+                f'<ul class="flex content-start w-full text-xs border-l"><li>Country {c}</li>{links}</ul>'
+            )
+        return self._document('Tennis Results', ''.join(containers))
+
+    def season_page(self, base_url, country, tournament, year):
+        country_name = country.replace('country-', 'Country ')
+        tournament_name = tournament.replace('tournament-', f'Tournament {country_name.split()[-1]}.')
+        tournament_url = f'{base_url}/tennis/{country}/{tournament}/results/'
+
+        options = [f'<option value="{tournament_url}">{self.current_year}</option>']
+        for y in range(self.current_year - 1, self.current_year - 1 - self.years, -1):
+            options.append(f'<option value="{base_url}/tennis/{country}/{tournament}-{y}/results/">{y}</option>')
+
+        breadcrumbs = (
+            '<div class="bg-gray-med_light"><ul class="flex items-center">'
+            f'<li><a href="{base_url}/">Home</a></li><li><a href="{base_url}/tennis/">Tennis</a></li>'
+            f'<li><a href="{base_url}/tennis/{country}/">{country_name}</a></li>'
+            f'<li><a href="{tournament_url}">{tournament_name}</a></li></ul></div>'
+            f'<div class="breadcrumbs"><select>{"".join(options)}</select></div>'
+        )
+        heading = f'<h1>{tournament_name} Results, Scores &amp; Historical Odds</h1>'
+        rows = self.event_rows(base_url, country, tournament, year)
+        body = f'{breadcrumbs}{heading}<div class="flex flex-col px-3 text-sm max-mm:px-0">{rows}</div>'
+        if self.page_count() > 1:
+            links = ''.join(
+                f'<a class="pagination-link" data-number="{number}" href="#/page/{number}/">{number}</a>'
+                for number in range(1, self.page_count() + 1)
+            )
+            body += f'<div class="pagination">{links}</div>{PAGINATION_SCRIPT}'
+        return self._document(f'{tournament_name} {year}', body)
+
+    def event_rows(self, base_url, country, tournament, year, page=1):
+        """Rows of one results page of a season (all of them when the season is not paginated)."""
+        rng = random.Random(f'{country}/{tournament}/{year}')
+        season_year = self.current_year if year == 'Current' else int(year)
+        day = date(season_year, 12, 1)
+        first = (page - 1) * self.rows_per_page if self.page_count() > 1 else 0
+        last = first + self.rows_per_page if self.page_count() > 1 else self.rows
+        parts = []
+        for index in range(self.rows):
+            # A date header opens every group of about five matches and every results page, like the real site
+            date_header = ''
+            if index % 5 == 0:
+                day -= timedelta(days=1)
+            if index % 5 == 0 or index == first:
+                date_header = f'<div class="text-black-main font-main w-full">{day.strftime("%d %b %Y")}</div>'
+            player1, player2 = rng.sample(SURNAMES, 2)
+            sets1 = 2
+            sets2 = rng.randint(0, 1)
+            odds1 = f'{rng.uniform(1.05, 4.0):.2f}'
+            odds2 = f'{rng.uniform(1.05, 4.0):.2f}'
+            match_url = f'{base_url}/tennis/{country}/{tournament}/{player1.lower()}-{player2.lower()}-{index}/'
+            # The random draws above keep every row the same whichever page is rendered
+            if not first <= index < last:
+                continue
+            parts.append(
+                f'<div class="eventRow flex w-full flex-col text-xs">{date_header}'
+                f'<div class="flex w-full items-center"><p>{10 + index % 10:02d}:{(index * 7) % 60:02d}</p>'
+                f'<div class="participants">'
+                f'<a title="{player1}" href="{match_url}"><p class="participant-name truncate">{player1} A.</p></a>'
+                f'<a title="{player2}" href="{match_url}"><p class="participant-name truncate">{player2} B.</p></a>'
+                f'</div>'
+                f'<div class="flex gap-1 font-bold"><div class="font-bold">{sets1}</div>'
+                f'<div class="hidden">&ndash;</div><div class="font-bold">{sets2}</div></div>'
+                f'<div data-testid="add-to-coupon-button"><p>{odds1}</p></div>'
+                f'<div data-testid="add-to-coupon-button"><p>{odds2}</p></div>'
+                f'</div></div>'
+            )
+        return ''.join(parts)
+
+    def match_page(self, country, tournament, slug):
+        """Detail page of one match: a few bookmakers with closing odds shown and opening odds in tooltips."""
+        rng = random.Random(f'{country}/{tournament}/{slug}')
+        rows = []
+        for bookmaker in rng.sample(BOOKMAKERS, rng.randint(3, 6)):
+            cells = ''.join(
+                f'<div data-testid="odd-container" data-opening="{rng.uniform(1.05, 4.0):.2f}">'
+                f'<p class="height-content">{rng.uniform(1.05, 4.0):.2f}</p></div>'
+                for _ in range(2)
+            )
+            rows.append(
+                f'<div class="border-black-borders flex h-9 border-b border-l border-r text-xs">'
+                f'<a href="#"><p class="height-content">{bookmaker}</p></a>{cells}</div>'
+            )
+        return self._document(slug, f'<h1>{slug}</h1><div>{"".join(rows)}</div>{OPENING_ODDS_TOOLTIP_SCRIPT}')
+
+    def render(self, base_url, path, page=None):
+        """Return the HTML for `path`, or None for an unknown page. `page` asks for the rows of one results page."""
+        if path in ('/tennis/results/', '/tennis/results'):
+            return self.results_page(base_url)
+        match = MATCH_PATH_RE.match(path)
+        if match is not None:
+            return self.match_page(match.group('country'), match.group('tournament'), match.group('slug'))
+        match = TOURNAMENT_PATH_RE.match(path)
+        if match is None:
+            return None
+        slug = match.group('slug')
+        season = SEASON_SUFFIX_RE.match(slug)
+        tournament, year = (season.group('tournament'), season.group('year')) if season else (slug, 'Current')
+        if page is not None:
+            return self.event_rows(base_url, match.group('country'), tournament, year, page)
+        return self.season_page(base_url, match.group('country'), tournament, year)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    site = FixtureSite()
+
+    def do_GET(self):
+        base_url = f'http://{self.headers.get("Host")}'
+        path, _, query = self.path.partition('?')
+        page_query = PAGE_QUERY_RE.match(query)
+        static = STATIC_PATH_RE.match(path)
+        if static:
+            content_type = 'image/png' if static.group('ext') == 'png' else 'font/woff2'
+            self._send(self.site.asset(static.group('name')), content_type)
+            return
+        # Tournament links have no /results/ suffix, like on the real site
+        if TOURNAMENT_PATH_RE.match(path.rstrip('/') + '/results/') and not path.endswith('/results/'):
+            path = path.rstrip('/') + '/results/'
+        page = self.site.render(base_url, path, int(page_query.group('page')) if page_query else None)
+        if page is None:
+            self.send_error(404)
+            return
+        self._send(page.encode('utf-8'), 'text/html; charset=utf-8')
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(site, host='127.0.0.1', port=0):
+    """Serve `site` from a background thread; returns (server, base_url)."""
+    handler = type('SiteHandler', (FixtureHandler,), {'site': site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fixture-site', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve a synthetic oddsportal-like results site")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--countries', type=int, default=3)
+    parser.add_argument('--tournaments', type=int, default=4)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--padding-kb', type=int, default=0)
+    parser.add_argument('--images', type=int, default=0)
+    parser.add_argument('--asset-kb', type=int, default=20)
+    parser.add_argument('--rows-per-page', type=int, default=0)
+    args = parser.parse_args()
+
+    fixture = FixtureSite(args.countries, args.tournaments, args.years, args.rows, args.padding_kb,
+                          images=args.images, asset_kb=args.asset_kb, rows_per_page=args.rows_per_page)
+    fixture_server, url = start_fixture_server(fixture, port=args.port)
+    print(f"Serving {fixture.total_year_pages()} year pages at {url}/tennis/results/")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        fixture_server.shutdown()
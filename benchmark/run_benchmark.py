@@ -0,0 +1,247 @@
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmark.fixture_site import FixtureSite, start_fixture_server
+from config.os_config import ROOT_DIR
+from extractor import extract_rows_from_html
+
+# Measures scraper throughput against the local fixture site instead of oddsportal.com.
+# The 'parse' benchmark times offline extraction only; every browser engine runs the
+# full main.py crawl once per concurrency level and resource-blocking mode, loading the
+# year pages in the browser, and 'http' runs it fetching them over pooled HTTP. Run from
+# the repository root:
+#   python -m benchmark.run_benchmark --engines snapshot js --workers 0 2 4
+#   python -m benchmark.run_benchmark --engines snapshot http --workers 2
+#   python -m benchmark.run_benchmark --engines snapshot --images 20 --block-resources off media
+#   python -m benchmark.run_benchmark --engines snapshot --shards 1 2 4
+#   python -m benchmark.run_benchmark --engines snapshot --rows-per-page 50 --workers 0 2
+
+
+def year_page_urls(site, base_url):
+    urls = []
+    for c in range(1, site.countries + 1):
+        for t in range(1, site.tournaments + 1):
+            urls.append(f'{base_url}/tennis/country-{c}/tournament-{t}/results/')
+            for y in range(site.current_year - 1, site.current_year - 1 - site.years, -1):
+                urls.append(f'{base_url}/tennis/country-{c}/tournament-{t}-{y}/results/')
+    return urls
+
+
+def bench_parse(site, base_url, repeat):
+    """Time lxml extraction over every results page of the fixture, excluding the download."""
+    pages = []
+    for url in year_page_urls(site, base_url):
+        pages.append(urllib.request.urlopen(url).read().decode('utf-8'))
+        # Further results pages as the snapshot engine reads them: the matches container with that page's rows
+        for number in range(2, site.page_count() + 1):
+            rows = urllib.request.urlopen(f'{url}?page={number}').read().decode('utf-8')
+            pages.append(f'<div class="flex flex-col px-3 text-sm max-mm:px-0">{rows}</div>')
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            rows += len(extract_rows_from_html(page))
+    wall = time.perf_counter() - start
+    return {'engine': 'parse', 'workers': 0, 'block': '-', 'pages': len(pages) * repeat, 'rows': rows,
+            'wall_seconds': wall}
+
+
+def engine_args(engine):
+    """
+    main.py arguments of a benchmark engine. The fixture pages are static HTML, so the
+    browser engines must not take the HTTP path or they would measure nothing but it;
+    'http' benchmarks that path on its own.
+    """
+    if engine == 'http':
+        return ['--engine', 'snapshot', '--fetch-mode', 'http']
+    return ['--engine', engine, '--fetch-mode', 'browser']
+
+
+def crawl_command(base_url, engine, workers, block_resources, scratch, extra_args):
+    """main.py command line writing everything under `scratch`."""
+    return [
+        sys.executable, 'main.py',
+        '--results-url', f'{base_url}/tennis/results/',
+        *engine_args(engine),
+        '--workers', str(workers),
+        '--block-resources', block_resources,
+        '--fresh',
+        '--frontier-path', str(scratch / 'frontier.db'),
+        '--output-path', str(scratch / 'matches.csv'),
+        '--cache-dir', str(scratch / 'page_cache'),
+        '--dead-letters', str(scratch / 'dead_letters.jsonl'),
+        '--manifest', str(scratch / 'manifest.json'),
+        '--metrics-json', str(scratch / 'metrics.json'),
+        '--log-level', 'WARNING',
+        *extra_args,
+    ]
+
+
+def count_csv_rows(path):
+    if not path.exists():
+        return 0
+    with open(path, newline='', encoding='utf-8') as f:
+        return max(0, sum(1 for _ in csv.reader(f)) - 1)
+
+
+def bench_crawl(base_url, engine, workers, block_resources, extra_args, keep_logs, shards=1):
+    """
+    Run a full main.py crawl against the fixture site in a scratch directory. With
+    several shards, one main.py per shard runs side by side and merge_shards.py
+    combines and validates their outputs.
+    """
+    with tempfile.TemporaryDirectory(prefix='odds-bench-') as scratch:
+        scratch = Path(scratch)
+        shard_dirs = [scratch / f'shard-{index}' for index in range(shards)]
+        start = time.perf_counter()
+        processes = []
+        for index, shard_dir in enumerate(shard_dirs):
+            shard_dir.mkdir()
+            command = crawl_command(base_url, engine, workers, block_resources, shard_dir, extra_args)
+            if shards > 1:
+                command += ['--shard-index', str(index), '--shard-count', str(shards)]
+            processes.append(subprocess.Popen(
+                command, cwd=ROOT_DIR, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            ))
+        outputs = [process.communicate() for process in processes]
+        returncode = max(process.returncode for process in processes)
+
+        output_path = shard_dirs[0] / 'matches.csv'
+        if shards > 1:
+            output_path = scratch / 'merged.csv'
+            merge_command = [sys.executable, 'merge_shards.py', '--input-format', 'csv', '--output', str(output_path)]
+            for shard_dir in shard_dirs:
+                merge_command += ['--shard', str(shard_dir / 'matches.csv'), str(shard_dir / 'frontier.db')]
+            merged = subprocess.run(merge_command, cwd=ROOT_DIR, capture_output=True, text=True)
+            outputs.append((merged.stdout, merged.stderr))
+            returncode = max(returncode, merged.returncode)
+        wall = time.perf_counter() - start
+
+        rows = count_csv_rows(output_path)
+        shard_metrics = [
+            json.loads((shard_dir / 'metrics.json').read_text())
+            for shard_dir in shard_dirs if (shard_dir / 'metrics.json').exists()
+        ]
+        if returncode != 0 or keep_logs:
+            for stdout, stderr in outputs:
+                print(stdout[-2000:], stderr[-2000:], sep='\n')
+
+    def mean_value(name, stat):
+        samples = [m.get('values', {}).get(name, {}).get(stat, 0.0) for m in shard_metrics]
+        return sum(samples) / len(samples) if samples else 0.0
+
+    return {
+        'engine': engine,
+        'workers': workers,
+        'shards': shards,
+        'block': block_resources,
+        'page_kb': mean_value('page_transfer_kb', 'mean'),
+        'page_load_ms': mean_value('page_load_ms', 'mean'),
+        'pages': sum(m.get('counters', {}).get('year_pages', 0) for m in shard_metrics),
+        'rows': rows,
+        'wall_seconds': wall,
+        'webdriver_commands': sum(m.get('webdriver_commands', {}).get('total', 0) for m in shard_metrics),
+        'returncode': returncode,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local fixture site")
+    parser.add_argument('--engines', nargs='+', default=['parse', 'snapshot'],
+                        help="'parse' (offline extraction only) and/or main.py engines: snapshot, js, selenium, "
+                             "or 'http' (year pages over HTTP)")
+    parser.add_argument('--workers', nargs='+', type=int, default=[0], help="Concurrency levels for crawl engines")
+    parser.add_argument('--shards', nargs='+', type=int, default=[1],
+                        help="Numbers of main.py shards to run side by side and merge, for crawl engines")
+    parser.add_argument('--countries', type=int, default=2)
+    parser.add_argument('--tournaments', type=int, default=3)
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--rows', type=int, default=200, help="Match rows per year page")
+    parser.add_argument('--rows-per-page', type=int, default=0,
+                        help="Split every season into results pages of this many rows (0 = one page per season)")
+    parser.add_argument('--padding-kb', type=int, default=0, help="Extra bytes per page to mimic heavy pages")
+    parser.add_argument('--images', type=int, default=0, help="Images per page (plus one web font) to download")
+    parser.add_argument('--asset-kb', type=int, default=20, help="Size of each image and the font")
+    parser.add_argument('--block-resources', nargs='+', default=['off'], choices=['off', 'media', 'all'],
+                        help="Resource-blocking modes to compare for crawl engines")
+    parser.add_argument('--repeat', type=int, default=5, help="Passes over the pages for the parse benchmark")
+    parser.add_argument('--main-args', nargs=argparse.REMAINDER, default=[],
+                        help="Extra arguments passed to every main.py run")
+    parser.add_argument('--json', default=None, help="Also write the results to this JSON file")
+    parser.add_argument('--verbose', action='store_true', help="Print the tail of every main.py run's output")
+    args = parser.parse_args()
+
+    site = FixtureSite(args.countries, args.tournaments, args.years, args.rows, args.padding_kb,
+                       images=args.images, asset_kb=args.asset_kb, rows_per_page=args.rows_per_page)
+    server, base_url = start_fixture_server(site)
+    print(f"Fixture site at {base_url}: {site.total_year_pages()} year pages of {site.page_count()} results pages, "
+          f"{site.total_rows()} rows")
+
+    results = []
+    try:
+        for engine in args.engines:
+            if engine == 'parse':
+                results.append(bench_parse(site, base_url, args.repeat))
+                continue
+            for block_resources in args.block_resources:
+                for shards in args.shards:
+                    for workers in args.workers:
+                        results.append(bench_crawl(
+                            base_url, engine, workers, block_resources, args.main_args, args.verbose, shards
+                        ))
+    finally:
+        server.shutdown()
+
+    print(
+        f"{'engine':<10}{'block':>6}{'shards':>7}{'workers':>8}{'pages':>8}{'rows':>9}{'wall s':>10}{'rows/s':>11}"
+        f"{'wd cmds':>9}{'KB/page':>9}{'load ms':>9}"
+    )
+    for result in results:
+        rows_per_second = result['rows'] / result['wall_seconds'] if result['wall_seconds'] else 0.0
+        result['rows_per_second'] = rows_per_second
+        print(
+            f"{result['engine']:<10}{result['block']:>6}{result.get('shards', 1):>7}{result['workers']:>8}{result['pages']:>8}{result['rows']:>9}"
+            f"{result['wall_seconds']:>10.2f}{rows_per_second:>11.1f}{result.get('webdriver_commands', 0):>9}"
+            f"{result.get('page_kb', 0.0):>9.1f}{result.get('page_load_ms', 0.0):>9.1f}"
+        )
+
+    # Bytes saved and load time change of each blocking mode against the unblocked crawl
+    baselines = {(r['engine'], r['workers'], r.get('shards', 1)): r for r in results if r['block'] == 'off'}
+    for result in results:
+        baseline = baselines.get((result['engine'], result['workers'], result.get('shards', 1)))
+        if result['block'] in ('off', '-') or baseline is None:
+            continue
+        print(
+            f"{result['engine']} / {result['workers']} workers, block={result['block']}: "
+            f"{baseline['page_kb'] - result['page_kb']:.1f} KB saved per page, "
+            f"load time {result['page_load_ms'] - baseline['page_load_ms']:+.1f} ms per page"
+        )
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    # A crawl that failed or lost rows is a regression, not a slow run; 'parse' reads every page `repeat` times
+    def expected_rows(result):
+        return site.total_rows() * (args.repeat if result['engine'] == 'parse' else 1)
+
+    broken = [
+        result for result in results
+        if result.get('returncode', 0) != 0 or result['rows'] != expected_rows(result)
+    ]
+    for result in broken:
+        print(f"{result['engine']} with {result.get('shards', 1)} shards x {result['workers']} workers wrote {result['rows']} of {expected_rows(result)} rows")
+    if broken:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    os.chdir(ROOT_DIR)
+    main()
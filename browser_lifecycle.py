@@ -0,0 +1,137 @@
+import logging
+import os
+import statistics
+import time
+
+from config.scraper_config import (
+    RECYCLE_BASELINE_PAGES, RECYCLE_LATENCY_FACTOR, RECYCLE_MAX_PAGES, RECYCLE_MAX_RSS_MB, RECYCLE_RSS_CHECK_EVERY
+)
+from metrics import metrics
+
+# Smoothing of the recent page latency compared against the browser's own baseline
+LATENCY_ALPHA = 0.1
+
+
+def process_tree_rss_mb(pid):
+    """
+    Resident memory of a process and all of its descendants (the Chrome renderers and
+    helpers), read from /proc. Returns None where /proc is not available.
+    """
+    if pid is None or not os.path.isdir('/proc'):
+        return None
+    children = {}
+    rss_kb = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status', encoding='utf-8') as f:
+                status = dict(line.split(':', 1) for line in f if ':' in line)
+        except OSError:
+            continue
+        children.setdefault(int(status['PPid'].strip()), []).append(int(entry))
+        # Kernel threads and zombies have no VmRSS
+        rss_kb[int(entry)] = int(status['VmRSS'].split()[0]) if 'VmRSS' in status else 0
+
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_kb.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total / 1024
+
+
+def to_cdp_cookie(cookie):
+    """Convert a WebDriver cookie into the shape Network.setCookies expects."""
+    converted = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+                 if key in cookie}
+    if 'expiry' in cookie:
+        converted['expires'] = cookie['expiry']
+    return converted
+
+
+class BrowserLifecycle:
+    """
+    Owns one long-lived browser and replaces it before it degrades: after `max_pages`
+    pages, when its process tree grows past `max_rss_mb`, or when its recent page latency
+    drifts to `latency_factor` times the baseline of its first pages. Recycling only
+    happens between pages (callers ask `due()` when they are idle), and the cookies of
+    the old browser, including the consent cookie, are copied into the new one.
+    """
+
+    def __init__(self, factory, name, max_pages=RECYCLE_MAX_PAGES, max_rss_mb=RECYCLE_MAX_RSS_MB,
+                 latency_factor=RECYCLE_LATENCY_FACTOR, baseline_pages=RECYCLE_BASELINE_PAGES):
+        self.factory = factory
+        self.name = name
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.baseline_pages = baseline_pages
+        self.driver = None
+        self.reason = None
+
+    def start(self, cookies=()):
+        self.driver = self.factory()
+        self.pages = 0
+        self.started_at = time.monotonic()
+        self.first_latencies = []
+        self.baseline = None
+        self.recent = None
+        self.reason = None
+        if cookies:
+            try:
+                self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': [to_cdp_cookie(c) for c in cookies]})
+            except Exception as e:
+                logging.warning(f"Could not restore {len(cookies)} cookies into the new {self.name} browser: {e}")
+        return self.driver
+
+    def get(self):
+        """The current browser, started on first use."""
+        return self.driver if self.driver is not None else self.start()
+
+    def page_done(self, seconds):
+        """Record the load time of a page served by the current browser."""
+        self.pages += 1
+        if self.baseline is None:
+            self.first_latencies.append(seconds)
+            if len(self.first_latencies) >= self.baseline_pages:
+                self.baseline = statistics.median(self.first_latencies)
+        self.recent = seconds if self.recent is None else (1 - LATENCY_ALPHA) * self.recent + LATENCY_ALPHA * seconds
+
+        if self.max_pages and self.pages >= self.max_pages:
+            self.reason = 'pages'
+        elif self.baseline and self.pages >= 2 * self.baseline_pages \
+                and self.recent > self.latency_factor * self.baseline:
+            self.reason = 'latency'
+        elif self.max_rss_mb and self.pages % RECYCLE_RSS_CHECK_EVERY == 0:
+            rss_mb = process_tree_rss_mb(getattr(self.driver, 'browser_pid', None))
+            if rss_mb is not None:
+                metrics.set_gauge('browser_rss_mb', round(rss_mb), browser=self.name)
+                if rss_mb > self.max_rss_mb:
+                    self.reason = 'memory'
+
+    def due(self):
+        return self.reason is not None
+
+    def recycle(self):
+        """Quit the browser and start a fresh one carrying over its cookies; returns the new driver."""
+        cookies = []
+        try:
+            cookies = self.driver.get_cookies()
+        except Exception as e:
+            logging.warning(f"Could not read the cookies of the {self.name} browser: {e}")
+        print(f"Restarting the {self.name} browser after {self.pages} pages ({self.reason or 'crashed'})")
+        metrics.count(f'browser_recycles_{self.reason or "crashed"}')
+        self.quit()
+        with metrics.timer('browser_recycle'):
+            return self.start(cookies)
+
+    def quit(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logging.warning(f"Failed to quit the {self.name} browser: {e}")
+        self.driver = None
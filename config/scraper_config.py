@@ -0,0 +1,136 @@
+from config.os_config import ROOT_DIR
+
+# Page the crawl starts from (override with --results-url, e.g. for the benchmark fixture site)
+RESULTS_URL = "https://www.oddsportal.com/tennis/results/"
+
+# Default row extraction engine for year pages (override with --engine):
+#   'snapshot' - read the matches container's outerHTML once and parse it offline with lxml
+#   'js'       - walk the rows in the browser and return them all from one execute_script call
+#   'selenium' - query every field of every row through WebDriver (slow, kept for comparison)
+EXTRACTION_ENGINE = 'snapshot'
+
+# Parallel browsers scraping year pages (override with --workers). 0 scrapes every
+# year page inline on the same browser that walks countries and tournaments.
+WORKERS = 0
+
+# Year pages every worker browser loads at once, each in its own tab (override with --tabs).
+# Tabs share one Chrome process tree, so more pages are in flight per GB of RAM than with
+# one browser per page; pages are read in whichever order their tabs become ready.
+TABS_PER_BROWSER = 1
+
+# Long-lived browsers are restarted between pages, keeping their cookies, once they have
+# served RECYCLE_MAX_PAGES pages (override with --recycle-pages), once their process tree
+# uses more than RECYCLE_MAX_RSS_MB (override with --recycle-rss-mb, checked every
+# RECYCLE_RSS_CHECK_EVERY pages, Linux only), or once their recent page latency reaches
+# RECYCLE_LATENCY_FACTOR times the median of their first RECYCLE_BASELINE_PAGES pages.
+# 0 disables the page and memory limits.
+RECYCLE_MAX_PAGES = 500
+RECYCLE_MAX_RSS_MB = 2048
+RECYCLE_RSS_CHECK_EVERY = 10
+RECYCLE_LATENCY_FACTOR = 2.0
+RECYCLE_BASELINE_PAGES = 20
+
+# lxml threads turning fetched page snapshots into rows while the browsers load the
+# next pages (override with --parse-workers). Only used when WORKERS > 0.
+PARSE_WORKERS = 1
+
+# Capacity of each queue between the fetch, parse and write stages (override with
+# --queue-size). A full queue makes the stage before it wait, bounding memory use.
+PIPELINE_QUEUE_SIZE = 16
+
+# How year pages are fetched (override with --fetch-mode):
+#   'http'    - plain HTTP over a pooled keep-alive session carrying the browser's cookies,
+#               falling back to the browser for pages that need JavaScript or a bot check
+#   'browser' - always load year pages in Chrome
+# HTTP is given up for the run after HTTP_MAX_FALLBACKS consecutive fallbacks without a success.
+FETCH_MODE = 'http'
+HTTP_POOL_SIZE = 8
+HTTP_TIMEOUT = 20
+HTTP_MAX_FALLBACKS = 3
+
+# Adaptive per-host rate control in front of every page load and HTTP fetch (disable with
+# --no-rate-limit). Each host starts at the initial concurrency and requests per second;
+# fast successes raise both additively, while errors, timeouts, throttling responses and
+# pages RATE_LIMIT_SLOW_FACTOR times slower than usual halve them. The maxima (override
+# with --max-host-concurrency / --max-requests-per-second) cap the ramp-up.
+RATE_LIMIT_INITIAL_CONCURRENCY = 2
+RATE_LIMIT_MAX_CONCURRENCY = 16
+RATE_LIMIT_INITIAL_RPS = 1.0
+RATE_LIMIT_MIN_RPS = 0.2
+RATE_LIMIT_MAX_RPS = 20.0
+RATE_LIMIT_SLOW_FACTOR = 3.0
+
+# Failed crawl units (country expansion, tournament page, year page) are tried up to
+# RETRY_ATTEMPTS times (override with --retries), waiting a random delay of up to
+# RETRY_BASE_DELAY * 2 ** (attempt - 1) seconds, capped at RETRY_MAX_DELAY, in between.
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2.0
+RETRY_MAX_DELAY = 30.0
+
+# JSON Lines file of units that still failed after their retries (override with --dead-letters);
+# `main.py --retry-dead-letters` re-crawls only those units
+DEAD_LETTER_PATH = ROOT_DIR / 'dead_letters.jsonl'
+
+# Manifest of every discovered tournament with its names and year URLs (override with --manifest).
+# Tournament landing pages are only re-opened once their entry is older than
+# MANIFEST_REFRESH_DAYS (None never refreshes), which is when a new season may have appeared.
+# The manifest is also saved after every MANIFEST_SAVE_EVERY newly read tournaments.
+MANIFEST_PATH = ROOT_DIR / 'crawl_manifest.json'
+MANIFEST_REFRESH_DAYS = 7
+MANIFEST_SAVE_EVERY = 25
+
+# SQLite file tracking the state of every discovered year page (override with --frontier-path)
+FRONTIER_PATH = ROOT_DIR / 'crawl_frontier.db'
+
+# Raw page cache of rendered year pages (override with --cache-dir, disable with --no-cache).
+# Least recently used pages are evicted above CACHE_MAX_BYTES; pages fetched more than CACHE_MAX_AGE_DAYS
+# ago are dropped whenever main.py opens the cache (None keeps pages forever).
+CACHE_DIR = ROOT_DIR / 'page_cache'
+CACHE_MAX_BYTES = 5 * 1024 ** 3
+CACHE_MAX_AGE_DAYS = None
+
+# Opt-in bookmaker odds stage (--odds-details): after the results pass, ODDS_DETAIL_WORKERS
+# browsers (override with --odds-workers) open the detail page of every written match and
+# read each bookmaker's opening and closing odds. Results are written and recorded in the
+# frontier ODDS_DETAIL_BATCH_SIZE matches at a time, so an interrupted stage resumes from
+# the last batch. Opening odds come from a tooltip, given OPENING_ODDS_TIMEOUT_MS per cell.
+ODDS_DETAIL_WORKERS = 2
+ODDS_DETAIL_BATCH_SIZE = 200
+OPENING_ODDS_TIMEOUT_MS = 1000
+
+# Output backend (override with --output-format): 'csv', 'parquet' or 'sqlite'.
+# Parquet rows are buffered and written once PARQUET_BATCH_ROWS are waiting; the SQLite
+# archive (queried with query_archive.py) stores ARCHIVE_BATCH_ROWS rows per transaction.
+OUTPUT_FORMAT = 'csv'
+PARQUET_BATCH_ROWS = 50000
+ARCHIVE_BATCH_ROWS = 5000
+
+# Matches analytics.py holds in memory at once (override with --chunk-rows); every chunk is
+# reduced to per-group sums before the next one is read
+ANALYTICS_CHUNK_ROWS = 500000
+
+# Browser-level request blocking (override with --block-resources):
+#   'off'   - load every asset
+#   'media' - block images, media and fonts
+#   'all'   - also block analytics and ad domains
+# Page scripts are never blocked, they render the match list. The OneTrust consent
+# banner is left alone so the cookie prompt can still be accepted.
+BLOCK_RESOURCES = 'off'
+BLOCKED_MEDIA_PATTERNS = [
+    '*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*',
+    '*.mp4*', '*.webm*', '*.mp3*', '*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*',
+]
+BLOCKED_TRACKER_PATTERNS = [
+    '*googletagmanager.com*', '*google-analytics.com*', '*analytics.google.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*googleadservices.com*', '*adservice.google.*', '*amazon-adsystem.com*',
+    '*facebook.net*', '*connect.facebook.*', '*scorecardresearch.com*', '*hotjar.com*', '*criteo.*',
+    '*taboola.com*', '*outbrain.com*', '*adnxs.com*', '*pubmatic.com*', '*rubiconproject.com*',
+    '*quantserve.com*', '*clarity.ms*',
+]
+
+# Resolved chromedriver binaries per Chrome version, so startup skips the network version check
+DRIVER_CACHE_PATH = ROOT_DIR / '.driver_cache.json'
+
+# Parent directory of persistent Chrome profiles (override with --profile-dir). None uses a
+# throwaway profile per browser; otherwise every browser gets its own subdirectory.
+PROFILE_DIR = None
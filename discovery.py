@@ -0,0 +1,179 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from extractor import BREADCRUMB_XPATH, TOURNAMENT_NAME_SUFFIX
+from metrics import metrics
+from rate_limiter import rate_limiter
+from readiness import wait_until_ready
+
+# Browser steps of the discovery walk shared by main.py and the api module: the results
+# page with its country containers, the tournament links of each country, and the names
+# and season URLs of each tournament page.
+COUNTRY_CONTAINER_CSS = 'ul.flex.content-start.w-full.text-xs.border-l'
+TOURNAMENT_LINK_CSS = 'li.flex.items-center a'
+
+
+def open_results_page(driver, results_url):
+    with rate_limiter.slot(results_url), metrics.timer('results_page_load'):
+        driver.get(results_url)
+
+
+def accept_cookies(driver):
+    """Accept the cookie consent banner if it appears."""
+    # A persistent profile remembers the consent, so there is no point waiting for a banner that will not show up
+    if driver.get_cookie('OptanonAlertBoxClosed'):
+        print("Cookies already accepted in this browser profile")
+        return
+    try:
+        with metrics.timer('wait_cookie_consent'):
+            accept_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.ID, 'onetrust-accept-btn-handler'))
+            )
+        accept_button.click()
+        print("Accepted cookies")
+    except Exception:
+        print("No cookie consent button found or already accepted")
+
+
+def find_country_containers(driver):
+    """Wait for the results page to settle and return its country container elements."""
+    wait_until_ready(driver, 'results')
+    with metrics.timer('wait_country_containers'):
+        country_containers = WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located(
+                (By.CSS_SELECTOR, COUNTRY_CONTAINER_CSS)
+            )
+        )
+    print("Country containers are loaded")
+    return country_containers
+
+
+def collapse_country(driver, country):
+    driver.execute_script("arguments[0].click();", country)
+
+
+def expand_country(driver, country, idx, total):
+    """Expand a country container on the results page and return its tournament URLs."""
+    # **1. Reset `tournament_urls` for the current country to prevent accumulation**
+    tournament_urls = []
+
+    # **2. Click on the country container to expand tournaments**
+    # A retry must not click a country that is already expanded, that would collapse it again
+    driver.execute_script("arguments[0].scrollIntoView(true);", country)
+    if not driver.execute_script("return arguments[0].querySelectorAll('li.flex.items-center a').length;", country):
+        driver.execute_script("arguments[0].click();", country)
+    print(f"Clicked on the country container to expand tournaments (Country {idx}/{total})")
+
+    # **3. Extract Country Name from the Tournament Page Later**
+    # Since we are extracting the country name from the tournament page,
+    # we don't need to extract it here from the main page.
+    # However, to ensure the correct country is being processed,
+    # we can keep track of the country URL or other identifiers if needed.
+
+    # **4. Wait for tournaments to be visible within the country**
+    with metrics.timer('wait_tournament_links'):
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_all_elements_located(
+                (By.CSS_SELECTOR, TOURNAMENT_LINK_CSS)
+            )
+        )
+
+    # **5. Find all tournament links within the current country**
+    tournaments = country.find_elements(
+        By.CSS_SELECTOR,
+        TOURNAMENT_LINK_CSS
+    )
+    print(f"Found {len(tournaments)} tournaments in the country")
+
+    for tournament in tournaments:
+        try:
+            tournament_url = tournament.get_attribute('href')
+            # Ensure the URL ends with '/results/'
+            if not tournament_url.endswith('results/'):
+                tournament_url = tournament_url.rstrip('/') + '/results/'
+            tournament_urls.append(tournament_url)
+        except Exception as e:
+            print(f"Failed to get tournament URL: {e}")
+            continue  # Skip this tournament
+
+    print(f"Collected {len(tournament_urls)} tournament URLs for Country {idx}/{total}")
+    return tournament_urls
+
+
+def open_tournament(driver, tournament_url):
+    print(f"Opening tournament: {tournament_url}")
+    with rate_limiter.slot(tournament_url):
+        with metrics.timer('tournament_page_load'):
+            driver.get(tournament_url)
+
+        # Allow the page to load
+        wait_until_ready(driver, 'tournament')
+
+
+def tournament_details(driver, tournament_url):
+    """Return (country_name, tournament_name, year_urls) of the open tournament page."""
+    # **7. Extract Country Name from the Tournament Page**
+    try:
+        # Locate the breadcrumb navigation
+        with metrics.timer('wait_breadcrumbs'):
+            breadcrumb_ul = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located(
+                    (By.XPATH, BREADCRUMB_XPATH)
+                )
+            )
+        # Extract all breadcrumb links
+        breadcrumb_links = breadcrumb_ul.find_elements(By.TAG_NAME, 'a')
+
+        # Assuming the country name is the third breadcrumb link
+        if len(breadcrumb_links) >= 3:
+            country_name = breadcrumb_links[2].text.strip()
+        else:
+            # Fallback in case the structure is different
+            country_name = 'N/A'
+        print(f"Country Name: {country_name}")
+    except Exception as e:
+        country_name = 'N/A'
+        print(f"Failed to extract country name from tournament page: {e}")
+
+    # **8. Extract Tournament Name**
+    try:
+        tournament_name = driver.find_element(By.XPATH, '//h1').text.strip().replace(TOURNAMENT_NAME_SUFFIX, '')
+        print(f"Tournament Name: {tournament_name}")
+    except Exception as e:
+        tournament_name = 'N/A'
+        print(f"Failed to extract tournament name: {e}")
+
+    # **9. Collect all available years for the tournament**
+    try:
+        with metrics.timer('wait_year_select'):
+            years_container = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located(
+                    (By.XPATH, '//div[contains(@class, "breadcrumbs")]//select')
+                )
+            )
+        year_select = years_container
+        year_options = year_select.find_elements(By.TAG_NAME, 'option')
+
+        # Collect year URLs and ensure they end with '/results/'
+        year_urls = []
+        for year_option in year_options:
+            try:
+                year_url = year_option.get_attribute('value')
+                if not year_url.endswith('results/'):
+                    year_url = year_url.rstrip('/') + '/results/'
+                year_urls.append(year_url)
+            except Exception as e:
+                print(f"Failed to get year URL: {e}")
+                continue  # Skip this year
+        print(f"Found {len(year_urls)} years for this tournament")
+    except Exception as e:
+        print(f"No years navigation found for this tournament: {e}")
+        year_urls = [tournament_url]  # Default to the current tournament page
+
+    return country_name, tournament_name, year_urls
+
+
+def read_tournament(driver, tournament_url):
+    """Open a tournament page and return (country_name, tournament_name, year_urls)."""
+    open_tournament(driver, tournament_url)
+    return tournament_details(driver, tournament_url)
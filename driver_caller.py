@@ -1,15 +1,107 @@
-import undetected_chromedriver2 as uc
-from undetected_chromedriver2.options import ChromeOptions
-from webdriver_manager.chrome import ChromeDriverManager
 import os
+import json
 import logging
-from config.os_config import ROOT_DIR
+import subprocess
+import threading
+from config.scraper_config import (
+    BLOCK_RESOURCES, BLOCKED_MEDIA_PATTERNS, BLOCKED_TRACKER_PATTERNS, DRIVER_CACHE_PATH, PROFILE_DIR
+)
+from metrics import metrics
 
-os.chdir(ROOT_DIR)
+# undetected_chromedriver and webdriver_manager are only imported once a browser is actually
+# started, so offline tools importing the helpers below do not pay for Selenium
+
+
+# Transferred bytes and load time of the current page, from the Navigation/Resource Timing APIs
+PAGE_WEIGHT_JS = """
+const navigation = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let transferBytes = navigation ? navigation.transferSize : 0;
+for (const resource of resources) {
+    transferBytes += resource.transferSize || 0;
+}
+return {
+    transfer_bytes: transferBytes,
+    requests: resources.length + 1,
+    load_ms: navigation ? (navigation.loadEventEnd || navigation.domContentLoadedEventEnd) - navigation.startTime : null
+};
+"""
+
+
+def record_page_weight(driver):
+    """Record the bytes transferred and the load time of the page the driver just loaded."""
+    try:
+        weight = driver.execute_script(PAGE_WEIGHT_JS)
+    except Exception as e:
+        logging.debug(f"Could not read page timing: {e}")
+        return
+    metrics.record_value('page_transfer_kb', weight['transfer_bytes'] / 1024)
+    metrics.record_value('page_requests', weight['requests'])
+    if weight['load_ms'] is not None:
+        metrics.record_value('page_load_ms', weight['load_ms'])
+
+
+BLOCK_MODES = ('off', 'media', 'all')
+
+# Resolving the chromedriver binary is done once per process and cached on disk per Chrome version
+_install_lock = threading.Lock()
+_installed_path = None
+
+# The first launch patches the chromedriver binary in place; later launches may run concurrently
+_launch_lock = threading.Lock()
+_launched_once = False
+
+
+def chrome_version():
+    """Return the installed Chrome version string, or None if it cannot be determined."""
+    import undetected_chromedriver2 as uc
+
+    executable = uc.find_chrome_executable()
+    if not executable:
+        return None
+    try:
+        output = subprocess.run([executable, '--version'], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    version = output.strip().split(' ')[-1]
+    return version or None
+
+
+def _load_driver_cache():
+    try:
+        with open(DRIVER_CACHE_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_driver_cache(cache):
+    tmp_path = f'{DRIVER_CACHE_PATH}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, DRIVER_CACHE_PATH)
 
 
 class Driver:
-    def get_options(self) -> ChromeOptions:
+    def __init__(self, block_resources=BLOCK_RESOURCES, profile_dir=PROFILE_DIR, page_load_strategy='normal'):
+        # 'off' loads everything, 'media' drops images/media/fonts, 'all' also drops analytics and ad domains
+        self.block_resources = block_resources
+        # Persistent user-data-dir, so cookies (including the consent cookie) and the HTTP cache survive runs.
+        # A profile can only be used by one Chrome at a time.
+        self.profile_dir = profile_dir
+        # 'none' makes get() return once navigation starts, so one browser can load pages in several tabs
+        self.page_load_strategy = page_load_strategy
+
+    def blocked_url_patterns(self):
+        if self.block_resources == 'media':
+            return list(BLOCKED_MEDIA_PATTERNS)
+        if self.block_resources == 'all':
+            return list(BLOCKED_MEDIA_PATTERNS) + list(BLOCKED_TRACKER_PATTERNS)
+        return []
+
+    def get_options(self):
+        from undetected_chromedriver2.options import ChromeOptions
+
         options = ChromeOptions()
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-setuid-sandbox")
@@ -27,21 +119,89 @@ class Driver:
         options.add_argument("--hide-scrollbars")
         options.add_argument("--disable-extensions")
 
+        # Pages loading in background tabs must not have their timers and rendering throttled
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.page_load_strategy = self.page_load_strategy
+
+        # The crawler only reads text from the DOM, so images never need to be fetched or decoded
+        if self.block_resources != 'off':
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            })
+
         return options
 
     def install_driver(self) -> str:
-        path = ChromeDriverManager().install().replace("THIRD_PARTY_NOTICES.chromedriver", "chromedriver")
-        logging.info(f"Installed Driver to {path}")
+        """
+        Resolve the chromedriver binary. The result is reused for the rest of the process
+        and cached on disk per Chrome version, so only the first run after a Chrome update
+        pays for ChromeDriverManager's network version check.
+        """
+        global _installed_path
+        with _install_lock:
+            if _installed_path is not None:
+                return _installed_path
 
-        os.chmod(path, 0o755)
-        return path
+            version = chrome_version()
+            cache = _load_driver_cache()
+            path = cache.get(version) if version else None
+            if path and os.path.isfile(path) and os.access(path, os.X_OK):
+                logging.info(f"Using cached Driver for Chrome {version} at {path}")
+            else:
+                from webdriver_manager.chrome import ChromeDriverManager
+
+                path = ChromeDriverManager().install().replace("THIRD_PARTY_NOTICES.chromedriver", "chromedriver")
+                logging.info(f"Installed Driver to {path}")
+
+                os.chmod(path, 0o755)
+                if version:
+                    cache[version] = path
+                    _save_driver_cache(cache)
+
+            _installed_path = path
+            return path
+
+    def _launch(self, options, path):
+        import undetected_chromedriver2 as uc
+
+        if self.profile_dir is not None:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            return uc.Chrome(options=options, driver_executable_path=path, user_data_dir=str(self.profile_dir))
+        return uc.Chrome(options=options, driver_executable_path=path)
 
     def get_driver(self):
-        options = self.get_options()
-        # self.driver = uc.Chrome(options=options)
-        path = self.install_driver()
-        self.driver = uc.Chrome(options=options, driver_executable_path=path)
+        global _launched_once
+        with metrics.timer('driver_startup'):
+            options = self.get_options()
+            # self.driver = uc.Chrome(options=options)
+            path = self.install_driver()
+            self.driver = None
+            if not _launched_once:
+                with _launch_lock:
+                    if not _launched_once:
+                        self.driver = self._launch(options, path)
+                        _launched_once = True
+            if self.driver is None:
+                self.driver = self._launch(options, path)
 
+        metrics.instrument_driver(self.driver)
         self.driver.implicitly_wait(3)
+        self.block_requests()
+
+        return self.driver
 
-        return self.driver
\ No newline at end of file
+    def block_requests(self):
+        """Block matching requests at the network layer; scripts rendering the match list still load."""
+        patterns = self.blocked_url_patterns()
+        if not patterns:
+            return
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+            logging.info(f"Blocking {len(patterns)} URL patterns ({self.block_resources})")
+        except Exception as e:
+            logging.warning(f"Could not enable request blocking: {e}")
\ No newline at end of file
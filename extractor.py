@@ -0,0 +1,291 @@
+import re
+from datetime import datetime
+
+from lxml import html as lxml_html
+
+# XPaths shared by every extraction engine so they all read the same elements
+MATCHES_CONTAINER_XPATH = '//div[contains(@class, "flex flex-col px-3 text-sm")]'
+# Set by pagination.turn_page() on rows already read, in case the next page is appended below them
+SEEN_ROW_ATTRIBUTE = 'data-crawl-seen'
+EVENT_ROW_XPATH = f'.//div[contains(@class, "eventRow") and not(@{SEEN_ROW_ATTRIBUTE})]'
+DATE_XPATH = './/div[contains(@class, "text-black-main") and contains(@class, "font-main")]'
+TIME_XPATH = './/div[contains(@class, "flex w-full")]//p'
+PLAYER1_XPATH = './/a[contains(@title, "")][1]//p[contains(@class, "participant-name")]'
+PLAYER2_XPATH = './/a[contains(@title, "")][2]//p[contains(@class, "participant-name")]'
+SCORE_XPATH = './/div[contains(@class, "flex gap-1 font-bold")]//div[contains(@class, "hidden") or contains(@class, "font-bold")]'
+ODDS_XPATH = './/div[@data-testid="add-to-coupon-button"]//p'
+# Both participant links of a row lead to the match's detail page
+MATCH_LINK_XPATH = './/a[contains(@title, "")][1]'
+BREADCRUMB_XPATH = '//div[contains(@class, "bg-gray-med_light")]//ul[contains(@class, "flex items-center")]'
+TOURNAMENT_NAME_SUFFIX = ' Results, Scores & Historical Odds'
+# Links of the results pages of a season with more matches than one page holds
+PAGINATION_XPATH = '//a[contains(@class, "pagination-link") and @data-number]'
+# Match detail page: one row per bookmaker with its name and the current (closing) odds of
+# each player. Opening odds are only shown in a tooltip, which odds_detail copies onto the cells.
+BOOKMAKER_ROW_XPATH = './/div[contains(@class, "border-black-borders") and contains(@class, "flex h-9")]'
+BOOKMAKER_NAME_XPATH = './/a//p[contains(@class, "height-content")]'
+BOOKMAKER_ODDS_XPATH = './/div[@data-testid="odd-container"]'
+OPENING_ODDS_ATTRIBUTE = 'data-opening-odds'
+
+EXTRACTION_ENGINES = ('snapshot', 'js', 'selenium')
+
+# Walks every eventRow below the container in the browser and returns the rendered
+# text of each field XPath, so a whole page comes back in one execute_script call
+EXTRACT_ROWS_JS = """
+const container = arguments[0];
+const xpaths = arguments[1];
+const eventRowXpath = arguments[2];
+const linkXpath = arguments[3];
+
+function findAll(node, xpath) {
+    const result = document.evaluate(xpath, node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        nodes.push(result.snapshotItem(i));
+    }
+    return nodes;
+}
+
+return findAll(container, eventRowXpath).map(function (eventRow) {
+    const texts = {};
+    for (const xpath of xpaths) {
+        texts[xpath] = findAll(eventRow, xpath).map(el => (el.innerText || '').trim());
+    }
+    texts[linkXpath] = findAll(eventRow, linkXpath).map(el => el.getAttribute('href') || '');
+    return texts;
+});
+"""
+
+# Tailwind classes that make a "hidden" element visible again at some breakpoint.
+# The browser window is 1920px wide, so every breakpoint applies.
+RESPONSIVE_DISPLAY_RE = re.compile(r'^(sm|md|lg|xl|2xl):(block|flex|inline|inline-block|inline-flex|grid|table|contents)$')
+
+
+def year_from_url(year_url):
+    """Return the season suffix of a year URL, or 'Current' for the unsuffixed page."""
+    path = year_url.rstrip('/')
+    # Year URLs are normalized to end with '/results/', the season suffix is on the segment before it
+    if path.endswith('/results'):
+        path = path[:-len('/results')]
+    year = path.split('-')[-1]
+    # Only a four-digit suffix is a season; 'tournament-1' or 'atp-250' are part of the name
+    if not (year.isdigit() and len(year) == 4):
+        year = 'Current'
+    return year
+
+
+def season_page_url(year_url, number):
+    """URL of results page `number` of a season; the site switches pages with a #/page/N/ fragment."""
+    return year_url if number == 1 else f'{year_url}#/page/{number}/'
+
+
+def page_count_from_html(html):
+    """Number of results pages announced by the pagination links of a page, 1 when there are none."""
+    numbers = lxml_html.fromstring(html).xpath(f'{PAGINATION_XPATH}/@data-number')
+    return max((int(number) for number in numbers if number.isdigit()), default=1)
+
+
+def is_empty_row(row):
+    """True when nothing could be read from the row itself (its date is carried over from the header above)."""
+    return all(row[field] == 'N/A' for field in ('time', 'player1', 'player2', 'score', 'odds1', 'odds2'))
+
+
+def parse_match_date(match_date_str):
+    """Format a '14 Oct 2024' date header as YYYYMMDD."""
+    return datetime.strptime(match_date_str, '%d %b %Y').strftime('%Y%m%d')
+
+
+def _is_hidden(element):
+    # Mirror what Selenium's `.text` does for elements that are not displayed
+    while element is not None:
+        classes = element.get('class', '').split()
+        if 'hidden' in classes and not any(RESPONSIVE_DISPLAY_RE.match(c) for c in classes):
+            return True
+        if 'display:none' in element.get('style', '').replace(' ', ''):
+            return True
+        element = element.getparent()
+    return False
+
+
+def _visible_text(element):
+    if _is_hidden(element):
+        return ''
+    return ' '.join(element.text_content().split())
+
+
+def _first_text(event_row, xpath):
+    elements = event_row.xpath(xpath)
+    if not elements:
+        raise LookupError(xpath)
+    return _visible_text(elements[0])
+
+
+def _first_link(event_row, xpath):
+    elements = event_row.xpath(xpath)
+    if not elements:
+        raise LookupError(xpath)
+    return elements[0].get('href')
+
+
+def _build_rows(event_rows, first_text, all_texts, first_link):
+    # Shared row loop: carry the last seen date header forward to the rows below it
+    rows = []
+    current_date = 'N/A'
+
+    for event_row in event_rows:
+        try:
+            try:
+                match_date = parse_match_date(first_text(event_row, DATE_XPATH))
+                current_date = match_date
+            except Exception:
+                match_date = current_date
+
+            try:
+                match_time = first_text(event_row, TIME_XPATH)
+            except Exception:
+                match_time = 'N/A'
+
+            try:
+                player1 = first_text(event_row, PLAYER1_XPATH)
+            except Exception:
+                player1 = 'N/A'
+
+            try:
+                player2 = first_text(event_row, PLAYER2_XPATH)
+            except Exception:
+                player2 = 'N/A'
+
+            try:
+                scores = [text for text in all_texts(event_row, SCORE_XPATH) if text]
+                score = ' '.join(scores) if scores else 'N/A'
+            except Exception:
+                score = 'N/A'
+
+            try:
+                odds = all_texts(event_row, ODDS_XPATH)
+                if len(odds) >= 2:
+                    odds1, odds2 = odds[0], odds[1]
+                else:
+                    odds1 = odds2 = 'N/A'
+            except Exception:
+                odds1 = odds2 = 'N/A'
+
+            # Relative as written in the page; tag_rows resolves it against the season URL
+            try:
+                match_url = first_link(event_row, MATCH_LINK_XPATH) or None
+            except Exception:
+                match_url = None
+
+            rows.append({
+                'date': match_date,
+                'time': match_time,
+                'player1': player1,
+                'player2': player2,
+                'score': score,
+                'odds1': odds1,
+                'odds2': odds2,
+                'match_url': match_url,
+            })
+        except Exception as match_e:
+            print(f"Error processing match: {match_e}")
+            continue
+
+    return rows
+
+
+def extract_rows_from_html(html):
+    """
+    Parse match rows out of a page snapshot (full page_source or the matches
+    container's outerHTML) without any further WebDriver round trips.
+    """
+    tree = lxml_html.fromstring(html)
+    if tree.xpath('self::*[contains(@class, "flex flex-col px-3 text-sm")]'):
+        matches_container = tree
+    else:
+        containers = tree.xpath(MATCHES_CONTAINER_XPATH)
+        if not containers:
+            raise LookupError("Matches container not found in page snapshot")
+        matches_container = containers[0]
+
+    return _build_rows(
+        matches_container.xpath(EVENT_ROW_XPATH),
+        _first_text,
+        lambda event_row, xpath: [_visible_text(e) for e in event_row.xpath(xpath)],
+        _first_link,
+    )
+
+
+def extract_page_meta(html):
+    """
+    Read (country_name, tournament_name) from a cached page the way the crawler reads
+    them from a tournament page: the third breadcrumb link and the <h1>.
+    """
+    tree = lxml_html.fromstring(html)
+
+    country_name = 'N/A'
+    breadcrumbs = tree.xpath(BREADCRUMB_XPATH)
+    if breadcrumbs:
+        breadcrumb_links = breadcrumbs[0].xpath('.//a')
+        if len(breadcrumb_links) >= 3:
+            country_name = _visible_text(breadcrumb_links[2])
+
+    headings = tree.xpath('//h1')
+    tournament_name = _visible_text(headings[0]).replace(TOURNAMENT_NAME_SUFFIX, '') if headings else 'N/A'
+    return country_name, tournament_name
+
+
+def extract_bookmaker_odds(html):
+    """
+    Read the bookmaker table of a match detail page as (bookmaker, [(opening, closing), ...])
+    with one pair per player; odds that are not shown come back as 'N/A'.
+    """
+    tree = lxml_html.fromstring(html)
+    bookmakers = []
+    for bookmaker_row in tree.xpath(BOOKMAKER_ROW_XPATH):
+        names = bookmaker_row.xpath(BOOKMAKER_NAME_XPATH)
+        if not names:
+            continue
+        odds = [
+            (cell.get(OPENING_ODDS_ATTRIBUTE) or 'N/A', _visible_text(cell) or 'N/A')
+            for cell in bookmaker_row.xpath(BOOKMAKER_ODDS_XPATH)
+        ]
+        bookmakers.append((_visible_text(names[0]), odds))
+    return bookmakers
+
+
+def extract_rows_selenium(matches_container):
+    """Extract match rows with one WebDriver lookup per field (the original path)."""
+    from selenium.webdriver.common.by import By
+
+    return _build_rows(
+        matches_container.find_elements(By.XPATH, EVENT_ROW_XPATH),
+        lambda event_row, xpath: event_row.find_element(By.XPATH, xpath).text.strip(),
+        lambda event_row, xpath: [e.text.strip() for e in event_row.find_elements(By.XPATH, xpath)],
+        lambda event_row, xpath: event_row.find_element(By.XPATH, xpath).get_attribute('href'),
+    )
+
+
+def extract_rows_js(matches_container):
+    """Extract match rows with a single in-browser execute_script round trip."""
+    field_xpaths = [DATE_XPATH, TIME_XPATH, PLAYER1_XPATH, PLAYER2_XPATH, SCORE_XPATH, ODDS_XPATH]
+    row_texts = matches_container.parent.execute_script(
+        EXTRACT_ROWS_JS, matches_container, field_xpaths, EVENT_ROW_XPATH, MATCH_LINK_XPATH
+    )
+
+    def first_text(texts, xpath):
+        if not texts[xpath]:
+            raise LookupError(xpath)
+        return texts[xpath][0]
+
+    return _build_rows(row_texts, first_text, lambda texts, xpath: texts[xpath], first_text)
+
+
+def extract_rows(matches_container, engine='snapshot'):
+    """Extract all match rows below a located matches container with the chosen engine."""
+    if engine == 'selenium':
+        return extract_rows_selenium(matches_container)
+    if engine == 'js':
+        return extract_rows_js(matches_container)
+    if engine == 'snapshot':
+        return extract_rows_from_html(matches_container.get_attribute('outerHTML'))
+    raise ValueError(f"Unknown extraction engine: {engine}")
@@ -0,0 +1,112 @@
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+
+from config.scraper_config import HTTP_MAX_FALLBACKS, HTTP_POOL_SIZE, HTTP_TIMEOUT
+from extractor import EVENT_ROW_XPATH, MATCHES_CONTAINER_XPATH
+from metrics import metrics
+from rate_limiter import rate_limiter
+
+FETCH_MODES = ('http', 'browser')
+
+# Responses that mean a bot check or a rate limit is in the way, not that the page is missing
+BROWSER_STATUS_CODES = {401, 403, 429, 503}
+
+# Markers of interstitial challenge pages served instead of the real content
+CHALLENGE_MARKERS = ('cf-chl', 'challenge-platform', 'Just a moment...', 'captcha')
+
+
+class NeedsBrowser(Exception):
+    """The page cannot be used as fetched over plain HTTP and has to be loaded in Chrome."""
+
+
+class HttpFetcher:
+    """
+    Fetch year pages over a pooled keep-alive requests.Session instead of a browser.
+    The session carries the cookies and User-Agent of a real browser (see adopt_browser),
+    and a page is only accepted when its static HTML already contains the match list;
+    anything that needs JavaScript or a bot check raises NeedsBrowser so the caller can
+    load it in Chrome. After `max_fallbacks` consecutive fallbacks with no successful
+    page, HTTP is given up for the rest of the run instead of doubling every request.
+    Safe to share between fetch threads.
+    """
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT, max_fallbacks=HTTP_MAX_FALLBACKS):
+        self.timeout = timeout
+        self.max_fallbacks = max_fallbacks
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        self.lock = threading.Lock()
+        self.succeeded = 0
+        self.consecutive_fallbacks = 0
+        self.disabled = False
+
+    def adopt_browser(self, driver):
+        """Copy the browser's cookies (consent, session) and User-Agent into the session."""
+        try:
+            user_agent = driver.execute_script('return navigator.userAgent')
+            self.session.headers['User-Agent'] = user_agent.replace('HeadlessChrome', 'Chrome')
+        except Exception as e:
+            logging.debug(f"Could not read the browser User-Agent: {e}")
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/'),
+            )
+        referer = urlsplit(driver.current_url)
+        self.session.headers['Referer'] = f'{referer.scheme}://{referer.netloc}/'
+
+    def fetch(self, url):
+        """Return the HTML of `url`, or raise NeedsBrowser."""
+        if self.disabled:
+            raise NeedsBrowser('HTTP fetching disabled for this run')
+        try:
+            with rate_limiter.slot(url) as request:
+                with metrics.timer('http_get'):
+                    response = self.session.get(url, timeout=self.timeout)
+                page = response.text
+                # The site pushing back slows down the whole host, not only this fetcher
+                if (response.status_code in BROWSER_STATUS_CODES or response.status_code >= 500
+                        or any(marker in page for marker in CHALLENGE_MARKERS)):
+                    request.throttled()
+            if response.status_code in BROWSER_STATUS_CODES:
+                raise NeedsBrowser(f'HTTP {response.status_code}')
+            response.raise_for_status()
+            if any(marker in page for marker in CHALLENGE_MARKERS):
+                raise NeedsBrowser('bot check page')
+            # The match list of the real site may only exist, or only be filled, after its scripts run
+            containers = lxml_html.fromstring(page).xpath(MATCHES_CONTAINER_XPATH)
+            if not containers or not containers[0].xpath(EVENT_ROW_XPATH):
+                raise NeedsBrowser('match list is rendered by JavaScript')
+        except (NeedsBrowser, requests.RequestException) as e:
+            self._record_fallback(url, e)
+            raise NeedsBrowser(str(e)) from e
+
+        metrics.count('http_pages')
+        metrics.record_value('http_page_kb', len(response.content) / 1024)
+        with self.lock:
+            self.succeeded += 1
+            self.consecutive_fallbacks = 0
+        return page
+
+    def _record_fallback(self, url, error):
+        metrics.count('http_fallbacks')
+        with self.lock:
+            self.consecutive_fallbacks += 1
+            if not self.succeeded and self.consecutive_fallbacks >= self.max_fallbacks and not self.disabled:
+                self.disabled = True
+                print(f"Plain HTTP fetching failed for the first {self.max_fallbacks} pages, using the browser only")
+        logging.debug(f"Falling back to the browser for {url}: {error}")
+
+    def close(self):
+        self.session.close()
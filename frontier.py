@@ -0,0 +1,216 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CrawlFrontier:
+    """
+    SQLite record of every country -> tournament -> year URL seen by the crawler,
+    with its state (pending/done/failed), row count and last update time.
+    A restarted crawl skips year URLs that are already done.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        # Discovery runs on the main thread while results are recorded by the writer thread
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS year_pages (
+                year_url TEXT PRIMARY KEY,
+                country_name TEXT,
+                tournament_name TEXT,
+                tournament_url TEXT,
+                state TEXT NOT NULL DEFAULT 'pending',
+                row_count INTEGER,
+                error TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS year_pages_state ON year_pages (state)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS year_pages_tournament ON year_pages (tournament_url)")
+        # Keys of every match already written, so re-scraped pages only add new matches
+        self.connection.execute("CREATE TABLE IF NOT EXISTS match_keys (match_key TEXT PRIMARY KEY)")
+        # Detail page of every written match, collected during the results pass, and how far
+        # the opt-in bookmaker odds stage has got with it
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS match_details (
+                match_key TEXT PRIMARY KEY,
+                match_url TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                odds_count INTEGER,
+                error TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS match_details_state ON match_details (state, match_key)")
+        # Settings the crawl was started with, e.g. which shard of the site it covers
+        self.connection.execute("CREATE TABLE IF NOT EXISTS crawl_meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @staticmethod
+    def _now():
+        return datetime.now().isoformat(timespec='seconds')
+
+    def add(self, job):
+        """Record a discovered year page as pending, keeping the state of one seen before."""
+        with self.lock:
+            self.connection.execute(
+                """
+                INSERT INTO year_pages (year_url, country_name, tournament_name, tournament_url, state, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (year_url) DO UPDATE SET
+                    country_name = excluded.country_name,
+                    tournament_name = excluded.tournament_name,
+                    tournament_url = excluded.tournament_url
+                """,
+                (job.year_url, job.country_name, job.tournament_name, job.tournament_url, PENDING, self._now())
+            )
+
+    def state(self, year_url):
+        with self.lock:
+            result = self.connection.execute(
+                "SELECT state FROM year_pages WHERE year_url = ?", (year_url,)
+            ).fetchone()
+        return result[0] if result else None
+
+    def is_done(self, year_url):
+        return self.state(year_url) == DONE
+
+    def year_page(self, year_url):
+        """Return (country_name, tournament_name, tournament_url, year_url) of a known year page, or None."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT country_name, tournament_name, tournament_url, year_url FROM year_pages WHERE year_url = ?",
+                (year_url,)
+            ).fetchone()
+
+    def known_matches(self, match_keys):
+        """Return the subset of `match_keys` that has already been written."""
+        match_keys = list(match_keys)
+        known = set()
+        with self.lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(match_keys), 500):
+                chunk = match_keys[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                known.update(key for (key,) in self.connection.execute(
+                    f"SELECT match_key FROM match_keys WHERE match_key IN ({placeholders})", chunk
+                ))
+        return known
+
+    def mark_done(self, job, row_count, match_keys=(), match_details=()):
+        """
+        Mark a year page as done and remember the matches written from it, and the
+        (match_key, match_url) of their detail pages, atomically.
+        """
+        self._set_state(job, DONE, row_count=row_count, match_keys=match_keys, match_details=match_details)
+
+    def mark_failed(self, job, error):
+        self._set_state(job, FAILED, error=f"{type(error).__name__}: {error}")
+
+    def _set_state(self, job, state, row_count=None, error=None, match_keys=(), match_details=()):
+        now = self._now()
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO match_keys (match_key) VALUES (?)",
+                ((key,) for key in match_keys)
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO match_details (match_key, match_url, state, updated_at) VALUES (?, ?, ?, ?)",
+                ((key, url, PENDING, now) for key, url in match_details)
+            )
+            self.connection.execute(
+                """
+                INSERT INTO year_pages
+                    (year_url, country_name, tournament_name, tournament_url, state, row_count, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (year_url) DO UPDATE SET
+                    state = excluded.state,
+                    row_count = excluded.row_count,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (job.year_url, job.country_name, job.tournament_name, job.tournament_url,
+                 state, row_count, error, now)
+            )
+
+    def counts(self):
+        """Return the number of year pages in each state."""
+        with self.lock:
+            return dict(self.connection.execute("SELECT state, COUNT(*) FROM year_pages GROUP BY state"))
+
+    def match_count(self):
+        """Number of distinct matches written so far."""
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM match_keys").fetchone()[0]
+
+    def pending_match_details(self, after_key='', limit=1000):
+        """
+        Return up to `limit` (match_key, match_url) pairs whose bookmaker odds are not done
+        yet, in match_key order after `after_key`, so callers can page through them.
+        """
+        with self.lock:
+            return self.connection.execute(
+                """
+                SELECT match_key, match_url FROM match_details
+                WHERE state != ? AND match_key > ? ORDER BY match_key LIMIT ?
+                """,
+                (DONE, after_key, limit)
+            ).fetchall()
+
+    def mark_match_details(self, results):
+        """Record a batch of (match_key, odds_count, error) from the odds stage in one transaction."""
+        now = self._now()
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(
+                "UPDATE match_details SET state = ?, odds_count = ?, error = ?, updated_at = ? WHERE match_key = ?",
+                (
+                    (DONE if error is None else FAILED, odds_count,
+                     None if error is None else f"{type(error).__name__}: {error}", now, key)
+                    for key, odds_count, error in results
+                )
+            )
+
+    def match_detail_counts(self):
+        """Return the number of match detail pages in each state."""
+        with self.lock:
+            return dict(self.connection.execute("SELECT state, COUNT(*) FROM match_details GROUP BY state"))
+
+    def tournament_urls(self):
+        with self.lock:
+            return [url for (url,) in self.connection.execute("SELECT DISTINCT tournament_url FROM year_pages")]
+
+    def get_meta(self, key):
+        with self.lock:
+            result = self.connection.execute("SELECT value FROM crawl_meta WHERE key = ?", (key,)).fetchone()
+        return result[0] if result else None
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.connection.execute(
+                "INSERT INTO crawl_meta (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value)
+            )
+
+    def reset(self):
+        """Forget all progress, for a crawl that starts from scratch."""
+        with self.lock:
+            self.connection.execute("DELETE FROM year_pages")
+            self.connection.execute("DELETE FROM match_keys")
+            self.connection.execute("DELETE FROM match_details")
+            self.connection.execute("DELETE FROM crawl_meta")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -1,330 +1,568 @@
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from driver_caller import Driver  # Ensure this module is correctly implemented
 from config.os_config import ROOT_DIR  # Ensure this module is correctly implemented
+from config.scraper_config import (
+    BLOCK_RESOURCES, CACHE_DIR, CACHE_MAX_AGE_DAYS, CACHE_MAX_BYTES, DEAD_LETTER_PATH, EXTRACTION_ENGINE, FETCH_MODE,
+    FRONTIER_PATH, HTTP_POOL_SIZE, MANIFEST_PATH, MANIFEST_REFRESH_DAYS, MANIFEST_SAVE_EVERY, ODDS_DETAIL_WORKERS,
+    OUTPUT_FORMAT, PARQUET_BATCH_ROWS, PARSE_WORKERS, PIPELINE_QUEUE_SIZE, PROFILE_DIR, RATE_LIMIT_MAX_CONCURRENCY,
+    RATE_LIMIT_MAX_RPS, RECYCLE_MAX_PAGES, RECYCLE_MAX_RSS_MB, RESULTS_URL, RETRY_ATTEMPTS, RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY, TABS_PER_BROWSER, WORKERS
+)
+from browser_lifecycle import BrowserLifecycle
+from discovery import (
+    accept_cookies, collapse_country, expand_country, find_country_containers, open_results_page, open_tournament,
+    tournament_details
+)
+from driver_caller import BLOCK_MODES
+from extractor import EXTRACTION_ENGINES, is_empty_row
+from fetcher import FETCH_MODES, HttpFetcher
+from frontier import CrawlFrontier
+from manifest import CrawlManifest
+from metrics import metrics
+from odds_detail import OddsDetailStage
+from output import DEFAULT_ODDS_OUTPUT_NAMES, DEFAULT_OUTPUT_NAMES, OUTPUT_FORMATS, open_odds_output, open_output
+from page_cache import PageCache
+from pipeline import CrawlPipeline
+from rate_limiter import rate_limiter
+from retry import (
+    COUNTRY, EMPTY_ROWS, TOURNAMENT, YEAR_PAGE, DeadLetters, EmptyRows, RetryPolicy, call_with_retries
+)
+from scraper import YearJob, fetch_season, fetch_year_http, is_current_season, match_key, parse_year
+from sharding import in_shard, shard_label, shard_path
+import argparse
+import logging
 import os
-import csv
 import time
-from datetime import datetime
+
+parser = argparse.ArgumentParser(description="Scrape tennis results and odds from oddsportal.com")
+parser.add_argument('--results-url', default=RESULTS_URL,
+                    help="Tennis results page the crawl starts from (e.g. a local fixture site)")
+parser.add_argument('--engine', choices=EXTRACTION_ENGINES, default=EXTRACTION_ENGINE,
+                    help="How match rows are read from each year page")
+parser.add_argument('--workers', type=int, default=WORKERS,
+                    help="Number of parallel browsers scraping year pages (0 scrapes inline on the main browser)")
+parser.add_argument('--tabs', type=int, default=TABS_PER_BROWSER,
+                    help="Year pages each worker browser loads at once in separate tabs (needs --workers above 0)")
+parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                    help="Threads parsing fetched year pages when --workers is above 0")
+parser.add_argument('--queue-size', type=int, default=PIPELINE_QUEUE_SIZE,
+                    help="Capacity of each queue between the fetch, parse and write stages")
+parser.add_argument('--fetch-mode', choices=FETCH_MODES, default=FETCH_MODE,
+                    help="Try year pages over plain HTTP before the browser ('http'), or always use the browser")
+parser.add_argument('--max-host-concurrency', type=int, default=RATE_LIMIT_MAX_CONCURRENCY,
+                    help="Upper bound for the adaptive number of simultaneous requests per host")
+parser.add_argument('--max-requests-per-second', type=float, default=RATE_LIMIT_MAX_RPS,
+                    help="Upper bound for the adaptive request rate per host")
+parser.add_argument('--no-rate-limit', action='store_true',
+                    help="Send requests as fast as the browsers allow, without adaptive rate control")
+parser.add_argument('--block-resources', choices=BLOCK_MODES, default=BLOCK_RESOURCES,
+                    help="Skip loading images/media/fonts ('media') and also analytics and ad domains ('all')")
+parser.add_argument('--recycle-pages', type=int, default=RECYCLE_MAX_PAGES,
+                    help="Restart a browser after it has loaded this many pages (0 = no limit)")
+parser.add_argument('--recycle-rss-mb', type=int, default=RECYCLE_MAX_RSS_MB,
+                    help="Restart a browser once its processes use more than this many MB of memory (0 = no limit)")
+parser.add_argument('--profile-dir', default=PROFILE_DIR,
+                    help="Reuse persistent Chrome profiles under this directory (one per browser) across runs")
+parser.add_argument('--shard-index', type=int, default=0,
+                    help="Which shard of the tournaments this run crawls, from 0 to --shard-count - 1")
+parser.add_argument('--shard-count', type=int, default=1,
+                    help="Split the tournaments into this many disjoint shards by a stable hash of their URL")
+parser.add_argument('--frontier-path', default=FRONTIER_PATH,
+                    help="SQLite file recording crawl progress, used to resume an interrupted crawl")
+parser.add_argument('--fresh', action='store_true',
+                    help="Discard previous progress and start the CSV from scratch instead of resuming; "
+                         "every tournament page is re-read as with --refresh-manifest")
+parser.add_argument('--incremental', action='store_true',
+                    help="Only re-scrape current-season pages of known tournaments and merge in new matches")
+parser.add_argument('--manifest', default=MANIFEST_PATH,
+                    help="JSON manifest of discovered tournaments and their year URLs, reused by later runs")
+parser.add_argument('--discover-only', action='store_true',
+                    help="Only build or refresh the manifest, without scraping any year page")
+parser.add_argument('--from-manifest', action='store_true',
+                    help="Scrape the tournaments listed in the manifest without walking the countries again")
+parser.add_argument('--refresh-manifest', action='store_true',
+                    help="Re-read every tournament page even if its manifest entry is recent")
+parser.add_argument('--retries', type=int, default=RETRY_ATTEMPTS,
+                    help="Attempts per country, tournament and year page before it goes to the dead-letter file")
+parser.add_argument('--dead-letters', default=DEAD_LETTER_PATH,
+                    help="JSON Lines file recording the units that still failed after their retries")
+parser.add_argument('--retry-dead-letters', action='store_true',
+                    help="Only re-crawl the units recorded in the dead-letter file instead of the whole site")
+parser.add_argument('--cache-dir', default=CACHE_DIR,
+                    help="Directory of the raw page cache that replay.py re-parses offline")
+parser.add_argument('--no-cache', action='store_true',
+                    help="Do not store fetched year pages in the page cache")
+parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT,
+                    help="Flat matches.csv, a Parquet dataset partitioned by country/tournament/year, "
+                         "or an indexed SQLite archive (see query_archive.py)")
+parser.add_argument('--output-path', default=None,
+                    help="CSV file, Parquet directory or SQLite file to write "
+                         "(default: matches.csv / matches_parquet / matches.db in the root)")
+parser.add_argument('--odds-details', action='store_true',
+                    help="After the results pass, also fetch every match's detail page for per-bookmaker "
+                         "opening and closing odds")
+parser.add_argument('--odds-workers', type=int, default=ODDS_DETAIL_WORKERS,
+                    help="Parallel browsers fetching match detail pages with --odds-details")
+parser.add_argument('--odds-output', default=None,
+                    help="Where to write the bookmaker odds (default: bookmaker_odds.csv / bookmaker_odds_parquet "
+                         "in the root, or the bookmaker_odds table of the SQLite archive)")
+parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
+                    help="DEBUG also logs every scraped match row")
+parser.add_argument('--metrics-json', default=None, help="Write the run metrics to this JSON file at the end")
+parser.add_argument('--metrics-prom', default=None,
+                    help="Write the run metrics to this Prometheus textfile-collector file at the end")
+args = parser.parse_args()
+
+logging.basicConfig(level=args.log_level, format='%(asctime)s %(levelname)s %(message)s')
 
 # Change to the root directory
 os.chdir(ROOT_DIR)
 
+# A sharded run only crawls the tournaments whose URL hashes to its shard. Paths left at
+# their defaults get a per-shard name, so several shards can run side by side on one box.
+if not 0 <= args.shard_index < args.shard_count:
+    parser.error("--shard-index must be between 0 and --shard-count - 1")
+if args.shard_count > 1:
+    if args.frontier_path == FRONTIER_PATH:
+        args.frontier_path = shard_path(FRONTIER_PATH, args.shard_index, args.shard_count)
+    if args.cache_dir == CACHE_DIR:
+        args.cache_dir = shard_path(CACHE_DIR, args.shard_index, args.shard_count)
+    if args.dead_letters == DEAD_LETTER_PATH:
+        args.dead_letters = shard_path(DEAD_LETTER_PATH, args.shard_index, args.shard_count)
+    if args.manifest == MANIFEST_PATH:
+        args.manifest = shard_path(MANIFEST_PATH, args.shard_index, args.shard_count)
+    print(f"Crawling {shard_label(args.shard_index, args.shard_count)}")
+
+# Page loads and fetches of every browser and thread share one adaptive limiter per host
+rate_limiter.configure(
+    max_concurrency=args.max_host_concurrency, max_rate=args.max_requests_per_second, enabled=not args.no_rate_limit
+)
+
 # Initialize the driver using driver_caller
-driver = Driver().get_driver()
-driver.maximize_window()
+def browser_profile(name):
+    if args.shard_count > 1:
+        name = f'{shard_label(args.shard_index, args.shard_count)}-{name}'
+    return os.path.join(args.profile_dir, name) if args.profile_dir else None
+
+
+def start_main_browser():
+    main_driver = Driver(args.block_resources, browser_profile('main')).get_driver()
+    main_driver.maximize_window()
+    return main_driver
+
+
+# The main browser does discovery (and the year pages when there are no workers); it is
+# restarted between tournaments once it has served too many pages or grown too large
+main_browser = BrowserLifecycle(
+    start_main_browser, 'main', max_pages=args.recycle_pages, max_rss_mb=args.recycle_rss_mb
+)
+driver = main_browser.get()
+
+# Open the crawl frontier; year pages it already marks as done are skipped on restart
+frontier = CrawlFrontier(args.frontier_path)
+if args.fresh:
+    frontier.reset()
+    # A fresh crawl must not reuse recent manifest entries either; they stay as the fallback
+    # of a tournament page that cannot be read, and for --from-manifest
+    args.refresh_manifest = True
+else:
+    print(f"Resuming crawl, year pages by state: {frontier.counts()}")
+    previous_shard = (frontier.get_meta('shard_index'), frontier.get_meta('shard_count'))
+    if previous_shard != (None, None) and previous_shard != (str(args.shard_index), str(args.shard_count)):
+        print(f"{args.frontier_path} belongs to shard {previous_shard[0]} of {previous_shard[1]}, "
+              f"use --fresh to re-shard the crawl")
+        main_browser.quit()
+        exit(1)
+# Lets merge_shards.py check that every shard of a crawl is present exactly once
+frontier.set_meta('shard_index', str(args.shard_index))
+frontier.set_meta('shard_count', str(args.shard_count))
+
+# Prepare the output for storing results with additional columns: Country and Tournament.
+# A resumed crawl appends to the rows written by the previous run.
+output_path = args.output_path or shard_path(
+    os.path.join(ROOT_DIR, DEFAULT_OUTPUT_NAMES[args.output_format]),
+    args.shard_index, args.shard_count
+)
+output = open_output(args.output_format, output_path, append=not args.fresh, batch_rows=PARQUET_BATCH_ROWS)
+# The SQLite backend keeps the bookmaker odds next to the matches they belong to
+odds_output_path = args.odds_output or (output_path if args.output_format == 'sqlite' else shard_path(
+    os.path.join(ROOT_DIR, DEFAULT_ODDS_OUTPUT_NAMES[args.output_format]), args.shard_index, args.shard_count
+))
+
+# Pages whose rows are still buffered by the output; they are only marked done once persisted
+pending_pages = []
+pending_keys = set()
+
+
+def open_page_cache(cache_dir):
+    """Open a page cache, first dropping fetches past CACHE_MAX_AGE_DAYS and shrinking it to CACHE_MAX_BYTES."""
+    cache = PageCache(cache_dir, CACHE_MAX_BYTES, CACHE_MAX_AGE_DAYS)
+    cache.evict()
+    return cache
+
+
+# Keep the rendered year pages so selectors can be fixed by re-parsing instead of re-crawling
+page_cache = None if args.no_cache else open_page_cache(args.cache_dir)
+
+# Tournaments and their year URLs found by earlier runs, so landing pages are not re-opened every run
+manifest = CrawlManifest(args.manifest)
+if args.from_manifest and not manifest.tournaments:
+    print(f"No tournaments in {args.manifest}, run with --discover-only first")
+    main_browser.quit()
+    exit(1)
+
+# Failed units are retried with backoff; whatever still fails is recorded for a follow-up run.
+# A follow-up run reads the previous records first; its own failures only replace them once it
+# has finished, so a crash or Ctrl-C part way through loses none of the units left to retry.
+retry_policy = RetryPolicy(args.retries, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+dead_letter_records = DeadLetters.load(args.dead_letters) if args.retry_dead_letters else []
+dead_letters = DeadLetters(args.dead_letters, fresh=args.fresh, replace=args.retry_dead_letters)
+if args.retry_dead_letters:
+    print(f"Retrying {len(dead_letter_records)} units from {args.dead_letters}")
+
+
+def job_context(job):
+    return {
+        'country_name': job.country_name,
+        'tournament_name': job.tournament_name,
+        'tournament_url': job.tournament_url,
+        'year_url': job.year_url,
+    }
+
+
+def write_result(job, rows, error):
+    """Write the rows scraped from one year page; runs on a single thread only."""
+    if error is not None:
+        print(f"Error processing year {job.year_url}: {error}")
+        metrics.count('year_pages_failed')
+        frontier.mark_failed(job, error)
+        dead_letters.add(YEAR_PAGE, job.year_url, error, **job_context(job))
+        return
+
+    # Rows where nothing could be read are not matches; record them so the page can be re-crawled
+    empty_rows = [row for row in rows if is_empty_row(row)]
+    if empty_rows:
+        rows = [row for row in rows if not is_empty_row(row)]
+        dead_letters.add(
+            EMPTY_ROWS, job.year_url, EmptyRows(f"{len(empty_rows)} rows with every field N/A"), **job_context(job)
+        )
+
+    # Drop matches already in the archive so re-scraped pages only add new ones
+    keys = [match_key(row) for row in rows]
+    seen_keys = frontier.known_matches(keys) | pending_keys
+    new_rows = []
+    new_keys = []
+    # Detail pages of the new matches, for the bookmaker odds stage of this or a later run
+    new_details = []
+    for row, key in zip(rows, keys):
+        if key not in seen_keys:
+            seen_keys.add(key)
+            new_rows.append(row)
+            new_keys.append(key)
+            if row.get('match_url'):
+                new_details.append((key, row['match_url']))
+
+    print(f"Found {len(rows)} total event rows in {job.year_url}, {len(new_rows)} new")
+    with metrics.timer('output_write'):
+        # The SQLite archive refreshes the matches it already holds, e.g. relabels a match first
+        # read from the 'Current' page with its season; CSV and Parquet only take new ones
+        output.write_rows(rows if output.upserts else new_rows)
+    metrics.count('rows_written', len(new_rows))
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for row in new_rows:
+            logging.debug(
+                f"Country: {row['country']}, Tournament: {row['tournament']}, "
+                f"Date: {row['date']}, Time: {row['time']}, Player 1: {row['player1']}, "
+                f"Player 2: {row['player2']}, Score: {row['score']}, Odds: {row['odds1']}-{row['odds2']}"
+            )
+
+    # Only mark the page as done once its rows are on disk
+    pending_pages.append((job, len(rows), new_keys, new_details))
+    pending_keys.update(new_keys)
+    with metrics.timer('output_flush'):
+        persisted = output.flush()
+    if persisted:
+        mark_pending_done()
+
+
+def mark_pending_done():
+    for page_job, row_count, page_keys, page_details in pending_pages:
+        frontier.mark_done(page_job, row_count, page_keys, page_details)
+    pending_pages.clear()
+    pending_keys.clear()
+
+
+def recycle_main_browser_if_due():
+    """Restart the main browser between pages once BrowserLifecycle says it is worn out."""
+    global driver
+    if main_browser.due():
+        driver = main_browser.recycle()
+
+
+def scrape_year_inline(job):
+    page = fetch_year_http(job, http_fetcher, page_cache) if http_fetcher is not None else None
+    if page is not None:
+        return parse_year(page)
+    # Each results page is parsed while the browser already loads the next one
+    rows = []
+    for page in fetch_season(driver, job, args.engine, page_cache):
+        main_browser.page_done(page.fetch_seconds)
+        rows.extend(parse_year(page))
+    return rows
+
+
+def schedule_year(job):
+    """Scrape a year page inline, or queue it for the crawl pipeline."""
+    frontier.add(job)
+    if pipeline is not None:
+        pipeline.submit(job)
+        return
+    try:
+        print(f"Processing year URL: {job.year_url}")
+        rows = call_with_retries(lambda: scrape_year_inline(job), retry_policy, f"year page {job.year_url}")
+        write_result(job, rows, None)
+    except Exception as year_e:
+        write_result(job, None, year_e)
+    recycle_main_browser_if_due()
+
+
+# Year pages are requested over a pooled HTTP session first; it picks up the browser's
+# cookies once the results page has been opened and the consent accepted
+http_fetcher = HttpFetcher(pool_size=max(HTTP_POOL_SIZE, args.workers)) if args.fetch_mode == 'http' else None
+
+# Parallel browsers fetch year pages, parser threads extract rows and a single thread
+# writes them; the main browser keeps doing discovery
+pipeline = CrawlPipeline(
+    args.workers, write_result, args.engine, page_cache,
+    driver_factory=lambda number: Driver(
+        args.block_resources, browser_profile(f'worker-{number}'), 'none' if args.tabs > 1 else 'normal'
+    ).get_driver(),
+    parse_workers=args.parse_workers, queue_size=args.queue_size, http=http_fetcher, retry_policy=retry_policy,
+    tabs=args.tabs, recycle_pages=args.recycle_pages, recycle_rss_mb=args.recycle_rss_mb,
+).start() if args.workers > 0 else None
+interrupted = False
+completed = False
+
+
+def read_tournament(tournament_url):
+    start = time.perf_counter()
+    open_tournament(driver, tournament_url)
+    main_browser.page_done(time.perf_counter() - start)
+    return tournament_details(driver, tournament_url)
+
+
+def crawl_tournament(tournament_url, country_index=None):
+    """Schedule the year pages of a tournament that still need scraping."""
+    # The country elements of the results page are no longer needed once tournaments are visited
+    recycle_main_browser_if_due()
+
+    # Known tournaments come from the manifest; the landing page is only opened for new
+    # tournaments and for entries old enough that a new season may have been added
+    if args.refresh_manifest or manifest.is_stale(tournament_url, MANIFEST_REFRESH_DAYS):
+        try:
+            country_name, tournament_name, year_urls = call_with_retries(
+                lambda: read_tournament(tournament_url), retry_policy, f"tournament {tournament_url}"
+            )
+        except Exception as e:
+            if manifest.get(tournament_url) is None:
+                raise
+            print(f"Could not refresh {tournament_url}, using its manifest entry: {e}")
+        else:
+            new_year_urls = manifest.add_tournament(
+                tournament_url, country_name, tournament_name, year_urls, country_index
+            )
+            metrics.count('manifest_new_seasons', len(new_year_urls))
+            if manifest.unsaved >= MANIFEST_SAVE_EVERY:
+                manifest.save(args.results_url)
+    else:
+        metrics.count('manifest_hits')
+
+    if args.discover_only:
+        return
+
+    # **10. Scrape each year's URL that is not archived yet**
+    for job in manifest.jobs(tournament_url):
+        # Finished seasons never change; the current one is refreshed in incremental mode
+        if frontier.is_done(job.year_url) and not (args.incremental and is_current_season(job.year_url)):
+            print(f"Skipping year URL already scraped: {job.year_url}")
+            continue
+        schedule_year(job)
+
+
+def crawl_tournament_safely(tournament_url, country_index):
+    try:
+        crawl_tournament(tournament_url, country_index)
+    except Exception as tournament_e:
+        print(f"Error processing tournament {tournament_url}: {tournament_e}")
+        dead_letters.add(TOURNAMENT, tournament_url, tournament_e, country_index=country_index)
+
+
+def discover_country(idx, country, total):
+    """Expand one country and return the URLs of its tournaments in this shard."""
+    try:
+        tournament_urls = call_with_retries(
+            lambda: expand_country(driver, country, idx, total), retry_policy, f"country {idx}/{total}"
+        )
+    except Exception as e:
+        print(f"Error collecting tournaments for Country {idx}/{total}: {e}")
+        dead_letters.add(COUNTRY, args.results_url, e, country_index=idx)
+        return []
+
+    # **14. After collecting the tournaments of the country, collapse the country container**
+    try:
+        collapse_country(driver, country)
+        print("Collapsed the country container")
+    except Exception as collapse_e:
+        print(f"Failed to collapse the country container: {collapse_e}")
+
+    if args.shard_count > 1:
+        tournament_urls = [url for url in tournament_urls if in_shard(url, args.shard_index, args.shard_count)]
+        print(f"{len(tournament_urls)} of them belong to {shard_label(args.shard_index, args.shard_count)}")
+    return tournament_urls
+
+
+def crawl_countries(country_indexes, country_containers):
+    """
+    Collect the tournaments of the given countries first, while the results page is still
+    open, and only then visit them: navigating away would leave the remaining country
+    elements stale.
+    """
+    total = len(country_containers)
+    tournaments = []
+    for idx in country_indexes:
+        if idx > total:
+            print(f"Country {idx} is no longer on the results page")
+            continue
+        tournaments.extend((url, idx) for url in discover_country(idx, country_containers[idx - 1], total))
+    print(f"Collected {len(tournaments)} tournament URLs from {len(country_indexes)} countries")
+
+    # **6. Now, process all collected tournaments**
+    for tournament_url, idx in tournaments:
+        crawl_tournament_safely(tournament_url, idx)
+
+
+def crawl_dead_letters(records, country_containers):
+    """Re-crawl only the units a previous run gave up on, instead of walking the whole site."""
+    # Countries are identified by their position on the results page, so they go first
+    crawl_countries(
+        sorted({record['country_index'] for record in records if record['kind'] == COUNTRY}), country_containers
+    )
+
+    year_urls = set()
+    for record in records:
+        if record['kind'] in (YEAR_PAGE, EMPTY_ROWS) and record['year_url'] not in year_urls:
+            year_urls.add(record['year_url'])
+            schedule_year(YearJob(
+                record['country_name'], record['tournament_name'], record['tournament_url'], record['year_url']
+            ))
+        elif record['kind'] == TOURNAMENT:
+            crawl_tournament_safely(record['url'], record.get('country_index'))
+
+
+def crawl_odds_details():
+    """Fetch the bookmaker odds of every written match whose detail page is not done yet."""
+    global pipeline
+    # Every year page has to be written and marked done first, which lists its matches in the frontier
+    if pipeline is not None:
+        pipeline.close()
+        pipeline = None
+    output.flush(force=True)
+    mark_pending_done()
+    # The odds browsers take over from here
+    main_browser.quit()
+
+    print(f"Match detail pages by state: {frontier.match_detail_counts()}")
+    # Kept apart from the year pages, which replay.py re-parses as season pages
+    match_cache = None if args.no_cache else open_page_cache(os.path.join(args.cache_dir, 'match_pages'))
+    odds_output = open_odds_output(args.output_format, odds_output_path, append=not args.fresh)
+    stage = OddsDetailStage(
+        args.odds_workers,
+        lambda number: Driver(args.block_resources, browser_profile(f'odds-{number}')).get_driver(),
+        cache=match_cache, retry_policy=retry_policy,
+        recycle_pages=args.recycle_pages, recycle_rss_mb=args.recycle_rss_mb,
+    )
+    try:
+        done, failed = stage.run(frontier, odds_output)
+        print(f"Bookmaker odds of {done} matches saved to {odds_output_path}, {failed} failed")
+    finally:
+        odds_output.close()
+        if match_cache is not None:
+            match_cache.close()
 
-# Prepare CSV file for storing results with additional columns: Country and Tournament
-csv_file_path = os.path.join(ROOT_DIR, 'matches.csv')
-csv_file = open(csv_file_path, 'w', newline='', encoding='utf-8')
-csv_writer = csv.writer(csv_file)
-csv_writer.writerow(['Country', 'Tournament', 'Date', 'Time', 'Player 1', 'Player 2', 'Score', 'Odds'])
 
 try:
     # Navigate to the main results page
-    driver.get("https://www.oddsportal.com/tennis/results/")
+    call_with_retries(lambda: open_results_page(driver, args.results_url), retry_policy, "results page")
     print("Page loaded")
 
     # Accept cookies if the prompt appears
-    try:
-        accept_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.ID, 'onetrust-accept-btn-handler'))
-        )
-        accept_button.click()
-        print("Accepted cookies")
-    except Exception:
-        print("No cookie consent button found or already accepted")
+    accept_cookies(driver)
 
     # Wait for the country containers to load
     try:
-        country_containers = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located(
-                (By.CSS_SELECTOR, 'ul.flex.content-start.w-full.text-xs.border-l')
-            )
-        )
-        print("Country containers are loaded")
+        country_containers = find_country_containers(driver)
+        if http_fetcher is not None:
+            http_fetcher.adopt_browser(driver)
     except Exception as e:
         print(f"Country containers not found: {e}")
-        driver.quit()
+        main_browser.quit()
         exit()
 
     print(f"Found {len(country_containers)} country containers")
 
-    if country_containers:
-        for idx, country in enumerate(country_containers, start=1):
-            try:
-                # **1. Reset `tournament_urls` for the current country to prevent accumulation**
-                tournament_urls = []
-
-                # **2. Click on the country container to expand tournaments**
-                driver.execute_script("arguments[0].scrollIntoView(true);", country)
-                driver.execute_script("arguments[0].click();", country)
-                print(f"Clicked on the country container to expand tournaments (Country {idx}/{len(country_containers)})")
-
-                # **3. Extract Country Name from the Tournament Page Later**
-                # Since we are extracting the country name from the tournament page,
-                # we don't need to extract it here from the main page.
-                # However, to ensure the correct country is being processed,
-                # we can keep track of the country URL or other identifiers if needed.
-
-                # **4. Wait for tournaments to be visible within the country**
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located(
-                        (By.CSS_SELECTOR, 'li.flex.items-center a')
-                    )
-                )
-
-                # **5. Find all tournament links within the current country**
-                tournaments = country.find_elements(
-                    By.CSS_SELECTOR,
-                    'li.flex.items-center a'
-                )
-                print(f"Found {len(tournaments)} tournaments in the country")
-
-                for tournament in tournaments:
-                    try:
-                        tournament_url = tournament.get_attribute('href')
-                        # Ensure the URL ends with '/results/'
-                        if not tournament_url.endswith('results/'):
-                            tournament_url = tournament_url.rstrip('/') + '/results/'
-                        tournament_urls.append(tournament_url)
-                    except Exception as e:
-                        print(f"Failed to get tournament URL: {e}")
-                        continue  # Skip this tournament
-
-                print(f"Collected {len(tournament_urls)} tournament URLs for Country {idx}/{len(country_containers)}")
-
-                # **6. Now, process all tournaments from the current country**
-                for tournament_url in tournament_urls:
-                    try:
-                        print(f"Opening tournament: {tournament_url}")
-                        driver.get(tournament_url)
-
-                        # Allow the page to load
-                        WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located(
-                                (By.XPATH, '//h1')
-                            )
-                        )
-                        time.sleep(0.2)  # Additional wait to ensure all elements load
-
-                        # **7. Extract Country Name from the Tournament Page**
-                        try:
-                            # Locate the breadcrumb navigation
-                            breadcrumb_ul = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located(
-                                    (By.XPATH, '//div[contains(@class, "bg-gray-med_light")]//ul[contains(@class, "flex items-center")]')
-                                )
-                            )
-                            # Extract all breadcrumb links
-                            breadcrumb_links = breadcrumb_ul.find_elements(By.TAG_NAME, 'a')
-
-                            # Assuming the country name is the third breadcrumb link
-                            if len(breadcrumb_links) >= 3:
-                                country_name = breadcrumb_links[2].text.strip()
-                            else:
-                                # Fallback in case the structure is different
-                                country_name = 'N/A'
-                            print(f"Country Name: {country_name}")
-                        except Exception as e:
-                            country_name = 'N/A'
-                            print(f"Failed to extract country name from tournament page: {e}")
-
-                        # **8. Extract Tournament Name**
-                        try:
-                            tournament_name = driver.find_element(By.XPATH, '//h1').text.strip().replace(' Results, Scores & Historical Odds', '')
-                            print(f"Tournament Name: {tournament_name}")
-                        except Exception as e:
-                            tournament_name = 'N/A'
-                            print(f"Failed to extract tournament name: {e}")
-
-                        # **9. Collect all available years for the tournament**
-                        try:
-                            years_container = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located(
-                                    (By.XPATH, '//div[contains(@class, "breadcrumbs")]//select')
-                                )
-                            )
-                            year_select = years_container
-                            year_options = year_select.find_elements(By.TAG_NAME, 'option')
-
-                            # Collect year URLs and ensure they end with '/results/'
-                            year_urls = []
-                            for year_option in year_options:
-                                try:
-                                    year_url = year_option.get_attribute('value')
-                                    if not year_url.endswith('results/'):
-                                        year_url = year_url.rstrip('/') + '/results/'
-                                    year_urls.append(year_url)
-                                except Exception as e:
-                                    print(f"Failed to get year URL: {e}")
-                                    continue  # Skip this year
-                            print(f"Found {len(year_urls)} years for this tournament")
-                        except Exception as e:
-                            print(f"No years navigation found for this tournament: {e}")
-                            year_urls = [tournament_url]  # Default to the current tournament page
-
-                        # **10. Iterate over each year's URL**
-                        for year_url in year_urls:
-                            try:
-                                print(f"Processing year URL: {year_url}")
-                                driver.get(year_url)
-
-                                # Allow the page to load
-                                WebDriverWait(driver, 10).until(
-                                    EC.presence_of_element_located(
-                                        (By.XPATH, '//div[contains(@class, "flex flex-col px-3 text-sm")]')
-                                    )
-                                )
-                                time.sleep(0.1)  # Additional wait to ensure all elements load
-
-                                # **11. Find the matches container**
-                                try:
-                                    matches_container = driver.find_element(
-                                        By.XPATH,
-                                        '//div[contains(@class, "flex flex-col px-3 text-sm")]'
-                                    )
-                                    print("Matches container loaded")
-                                except Exception as e:
-                                    print(f"Matches container not found: {e}")
-                                    continue
-
-                                # **12. Find all eventRow divs within the matches container**
-                                event_rows = matches_container.find_elements(
-                                    By.XPATH,
-                                    './/div[contains(@class, "eventRow")]'
-                                )
-                                print(f"Found {len(event_rows)} total event rows in matches container")
-
-                                # **13. Initialize current_date to 'N/A'**
-                                current_date = 'N/A'
-
-                                for event_row in event_rows:
-                                    try:
-                                        # **a. Check if the event_row contains a date**
-                                        try:
-                                            date_element = event_row.find_element(
-                                                By.XPATH,
-                                                './/div[contains(@class, "text-black-main") and contains(@class, "font-main")]'
-                                            )
-                                            match_date_str = date_element.text.strip()
-                                            # Parse the date string and format it as YYYYMMDD
-                                            match_date = datetime.strptime(match_date_str, '%d %b %Y').strftime('%Y%m%d')
-                                            current_date = match_date  # Update current_date
-                                        except Exception:
-                                            match_date = current_date  # Use the last known date
-
-                                        # **b. Extract Match Time**
-                                        try:
-                                            # The match time is within a <p> tag inside the 'flex w-full' div
-                                            time_element = event_row.find_element(
-                                                By.XPATH,
-                                                './/div[contains(@class, "flex w-full")]//p'
-                                            )
-                                            match_time = time_element.text.strip()
-                                        except Exception:
-                                            match_time = 'N/A'
-
-                                        # **c. Extract Player 1 Name**
-                                        try:
-                                            # Player 1 is the first <p> with class 'participant-name' within the first <a> tag
-                                            player1_element = event_row.find_element(
-                                                By.XPATH,
-                                                './/a[contains(@title, "")][1]//p[contains(@class, "participant-name")]'
-                                            )
-                                            player1 = player1_element.text.strip()
-                                        except Exception:
-                                            player1 = 'N/A'
-
-                                        # **d. Extract Player 2 Name**
-                                        try:
-                                            # Player 2 is the first <p> with class 'participant-name' within the second <a> tag
-                                            player2_element = event_row.find_element(
-                                                By.XPATH,
-                                                './/a[contains(@title, "")][2]//p[contains(@class, "participant-name")]'
-                                            )
-                                            player2 = player2_element.text.strip()
-                                        except Exception:
-                                            player2 = 'N/A'
-
-                                        # **e. Extract Scores**
-                                        try:
-                                            score_elements = event_row.find_elements(
-                                                By.XPATH,
-                                                './/div[contains(@class, "flex gap-1 font-bold")]//div[contains(@class, "hidden") or contains(@class, "font-bold")]'
-                                            )
-                                            scores = [elem.text.strip() for elem in score_elements if elem.text.strip()]
-                                            score = ' '.join(scores) if scores else 'N/A'
-                                        except Exception:
-                                            score = 'N/A'
-
-                                        # **f. Extract Odds**
-                                        try:
-                                            odds_elements = event_row.find_elements(
-                                                By.XPATH,
-                                                './/div[@data-testid="add-to-coupon-button"]//p'
-                                            )
-                                            if len(odds_elements) >= 2:
-                                                odds1 = odds_elements[0].text.strip()
-                                                odds2 = odds_elements[1].text.strip()
-                                            else:
-                                                odds1 = odds2 = 'N/A'
-                                        except Exception:
-                                            odds1 = odds2 = 'N/A'
-
-                                        # **g. Extract the Year from the URL**
-                                        year = year_url.rstrip('/').split('-')[-1]
-                                        if not year.isdigit():
-                                            year = 'Current'
-
-                                        # **h. Write the extracted match details to CSV with Country and Tournament Name**
-                                        csv_writer.writerow([
-                                            country_name,
-                                            tournament_name,
-                                            match_date,
-                                            match_time,
-                                            player1,
-                                            player2,
-                                            score,
-                                            f"{odds1}-{odds2}"
-                                        ])
-                                        print(
-                                            f"Country: {country_name}, Tournament: {tournament_name}, "
-                                            f"Date: {match_date}, Time: {match_time}, Player 1: {player1}, "
-                                            f"Player 2: {player2}, Score: {score}, Odds: {odds1}-{odds2}"
-                                        )
-
-                                    except Exception as match_e:
-                                        print(f"Error processing match: {match_e}")
-                                        continue  # Skip to the next match
-
-                            except Exception as year_e:
-                                print(f"Error processing year {year_url}: {year_e}")
-                                continue  # Skip to the next year
-
-                    except Exception as tournament_e:
-                        print(f"Error processing tournament {tournament_url}: {tournament_e}")
-                        continue  # Skip to the next tournament
-
-                # **14. After processing all tournaments in the country, collapse the country container**
-                try:
-                    driver.execute_script("arguments[0].click();", country)
-                    print("Collapsed the country container")
-                except Exception as collapse_e:
-                    print(f"Failed to collapse the country container: {collapse_e}")
-
-            except Exception as e:
-                print(f"Error collecting tournaments for Country {idx}/{len(country_containers)}: {e}")
-
+    if args.retry_dead_letters:
+        crawl_dead_letters(dead_letter_records, country_containers)
+    elif args.from_manifest:
+        # Skip the country walk entirely; tournaments added to the site since the manifest was built are not seen
+        manifest_urls = [
+            url for url in manifest.tournament_urls() if in_shard(url, args.shard_index, args.shard_count)
+        ]
+        print(f"Crawling {len(manifest_urls)} tournaments from {args.manifest}")
+        for tournament_url in manifest_urls:
+            crawl_tournament_safely(tournament_url, manifest.get(tournament_url)['country_index'])
+    elif country_containers:
+        crawl_countries(range(1, len(country_containers) + 1), country_containers)
     else:
         print("No country containers found.")
 
+    if args.discover_only:
+        print(f"Manifest lists {len(manifest.tournaments)} tournaments with {manifest.year_count()} year pages")
+    elif args.odds_details:
+        crawl_odds_details()
+    completed = True
+
+except KeyboardInterrupt:
+    interrupted = True
+    print("Interrupted, finishing the pages already in progress")
+
 except Exception as main_e:
     print(f"An unexpected error occurred: {main_e}")
 
 finally:
-    # Close the browser and CSV file after scraping is done
-    driver.quit()
-    csv_file.close()
-    print("Browser closed and CSV file saved.")
+    # Let the pipeline drain (or abandon queued pages on Ctrl-C) before closing the output
+    if pipeline is not None:
+        pipeline.close(cancel=interrupted)
+    # Close the browser and the output after scraping is done
+    main_browser.quit()
+    if http_fetcher is not None:
+        http_fetcher.close()
+    output.close()
+    mark_pending_done()
+    if page_cache is not None:
+        page_cache.close()
+    manifest.save(args.results_url)
+    print(f"Year pages by state: {frontier.counts()}")
+    if args.retry_dead_letters and not completed:
+        print(f"Retry stopped early, {args.dead_letters} still lists every unit it started with")
+    else:
+        dead_letters.commit()
+        if dead_letters.recorded:
+            print(f"{dead_letters.recorded} failed units recorded in {args.dead_letters}, "
+                  f"re-crawl them with --retry-dead-letters")
+    frontier.close()
+    print(f"Browser closed and output saved to {output_path}.")
+
+    print(metrics.summary())
+    if args.metrics_json:
+        metrics.write_json(args.metrics_json)
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
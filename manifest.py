@@ -0,0 +1,87 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from scraper import YearJob
+
+
+class CrawlManifest:
+    """
+    JSON map of every discovered tournament to its country and tournament names and the
+    year URLs of its season <select>, written by the discovery stage of main.py. A later
+    run reads the tournament pages from here instead of opening each landing page again;
+    an entry is only re-read once it is older than the refresh age, which is when a new
+    season can have appeared.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.tournaments = {}
+        self.results_url = None
+        self.unsaved = 0
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            self.results_url = data.get('results_url')
+            self.tournaments = data.get('tournaments', {})
+
+    @staticmethod
+    def _now():
+        return datetime.now().isoformat(timespec='seconds')
+
+    def get(self, tournament_url):
+        return self.tournaments.get(tournament_url)
+
+    def is_stale(self, tournament_url, max_age_days):
+        entry = self.tournaments.get(tournament_url)
+        if entry is None:
+            return True
+        if max_age_days is None:
+            return False
+        refreshed_at = datetime.fromisoformat(entry['refreshed_at'])
+        return datetime.now() - refreshed_at > timedelta(days=max_age_days)
+
+    def add_tournament(self, tournament_url, country_name, tournament_name, year_urls, country_index=None):
+        previous = self.tournaments.get(tournament_url)
+        now = self._now()
+        self.tournaments[tournament_url] = {
+            'country_name': country_name,
+            'tournament_name': tournament_name,
+            'country_index': country_index,
+            'year_urls': list(year_urls),
+            'discovered_at': previous['discovered_at'] if previous else now,
+            'refreshed_at': now,
+        }
+        self.unsaved += 1
+        if previous is not None:
+            return [url for url in year_urls if url not in previous['year_urls']]
+        return list(year_urls)
+
+    def jobs(self, tournament_url):
+        """YearJobs of every season of a known tournament."""
+        entry = self.tournaments[tournament_url]
+        return [
+            YearJob(entry['country_name'], entry['tournament_name'], tournament_url, year_url)
+            for year_url in entry['year_urls']
+        ]
+
+    def tournament_urls(self):
+        return list(self.tournaments)
+
+    def year_count(self):
+        return sum(len(entry['year_urls']) for entry in self.tournaments.values())
+
+    def save(self, results_url=None):
+        if results_url is not None:
+            self.results_url = results_url
+        data = {
+            'saved_at': self._now(),
+            'results_url': self.results_url,
+            'tournaments': self.tournaments,
+        }
+        # Write to a temporary file first so an interrupted save keeps the previous manifest
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.unsaved = 0
@@ -0,0 +1,112 @@
+from config.os_config import ROOT_DIR
+from config.scraper_config import FRONTIER_PATH, OUTPUT_FORMAT, PARQUET_BATCH_ROWS
+from frontier import CrawlFrontier
+from output import DEFAULT_OUTPUT_NAMES, OUTPUT_FORMATS, open_output, read_rows
+from scraper import match_key
+from sharding import shard_of, shard_path
+import argparse
+import os
+import sys
+import time
+
+# Combine the outputs of a sharded crawl (main.py --shard-index/--shard-count) into one
+# deduplicated archive. Each shard is checked against its frontier: it must be a distinct
+# shard of the same crawl, only hold tournaments that hash to it, and have written exactly
+# as many rows as its frontier recorded matches.
+parser = argparse.ArgumentParser(description="Merge and validate the outputs of a sharded crawl")
+parser.add_argument('--shard-count', type=int, default=None,
+                    help="Merge the default per-shard paths of a crawl with this many shards")
+parser.add_argument('--shard', nargs=2, action='append', default=[], metavar=('OUTPUT', 'FRONTIER'),
+                    help="Output path and frontier file of one shard; repeat for every shard")
+parser.add_argument('--input-format', choices=OUTPUT_FORMATS, default=OUTPUT_FORMAT,
+                    help="Format the shards were written in")
+parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default=None,
+                    help="Format of the merged archive (default: same as the shards)")
+parser.add_argument('--output', default=None,
+                    help="CSV file, Parquet directory or SQLite file to write "
+                         "(default: matches.csv / matches_parquet / matches.db in the root)")
+args = parser.parse_args()
+
+shards = [tuple(shard) for shard in args.shard]
+if not shards and args.shard_count:
+    default_output = os.path.join(ROOT_DIR, DEFAULT_OUTPUT_NAMES[args.input_format])
+    shards = [
+        (shard_path(default_output, index, args.shard_count), shard_path(FRONTIER_PATH, index, args.shard_count))
+        for index in range(args.shard_count)
+    ]
+if not shards:
+    parser.error("give --shard-count or at least one --shard OUTPUT FRONTIER")
+
+output_format = args.output_format or args.input_format
+output_path = args.output or os.path.join(ROOT_DIR, DEFAULT_OUTPUT_NAMES[output_format])
+output = open_output(output_format, output_path, batch_rows=PARQUET_BATCH_ROWS)
+
+start = time.perf_counter()
+problems = []
+seen_keys = set()
+seen_shards = {}
+shard_counts = set()
+rows_written = 0
+
+print(f"{'shard':<10}{'rows':>10}{'expected':>10}{'unique':>10}{'dupes':>8}{'tournaments':>13}  output")
+try:
+    for output_file, frontier_file in shards:
+        if not os.path.exists(output_file) or not os.path.exists(frontier_file):
+            problems.append(f"missing output or frontier: {output_file}, {frontier_file}")
+            continue
+
+        frontier = CrawlFrontier(frontier_file)
+        try:
+            shard_index = int(frontier.get_meta('shard_index') or 0)
+            shard_count = int(frontier.get_meta('shard_count') or 1)
+            expected_rows = frontier.match_count()
+            tournament_urls = frontier.tournament_urls()
+        finally:
+            frontier.close()
+
+        label = f'{shard_index}/{shard_count}'
+        shard_counts.add(shard_count)
+        if shard_index in seen_shards:
+            problems.append(f"shard {label} given twice: {seen_shards[shard_index]} and {output_file}")
+        seen_shards[shard_index] = output_file
+        stray = [url for url in tournament_urls if shard_of(url, shard_count) != shard_index]
+        if stray:
+            problems.append(f"shard {label} crawled {len(stray)} tournaments of other shards, e.g. {stray[0]}")
+
+        rows = duplicates = 0
+        batch = []
+        for row in read_rows(args.input_format, output_file):
+            rows += 1
+            key = match_key(row)
+            if key in seen_keys:
+                duplicates += 1
+                continue
+            seen_keys.add(key)
+            batch.append(row)
+            if len(batch) >= 10000:
+                output.write_rows(batch)
+                output.flush()
+                rows_written += len(batch)
+                batch = []
+        output.write_rows(batch)
+        rows_written += len(batch)
+
+        if rows != expected_rows:
+            problems.append(f"shard {label} wrote {rows} rows but its frontier recorded {expected_rows} matches")
+        print(f"{label:<10}{rows:>10}{expected_rows:>10}{rows - duplicates:>10}{duplicates:>8}"
+              f"{len(tournament_urls):>13}  {output_file}")
+finally:
+    output.close()
+
+if len(shard_counts) > 1:
+    problems.append(f"shards come from crawls with different shard counts: {sorted(shard_counts)}")
+elif shard_counts:
+    missing = sorted(set(range(shard_counts.pop())) - set(seen_shards))
+    if missing:
+        problems.append(f"shards missing from the merge: {missing}")
+
+print(f"Merged {len(shards)} shards into {rows_written} rows in {time.perf_counter() - start:.2f}s: {output_path}")
+for problem in problems:
+    print(f"Validation failed: {problem}")
+if problems:
+    sys.exit(1)
@@ -0,0 +1,228 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+QUANTILES = (0.5, 0.95, 0.99)
+# Samples kept per distribution for its percentiles, however long the crawl runs
+RESERVOIR_SIZE = 4096
+
+
+def percentile(sorted_samples, quantile):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = min(len(sorted_samples), max(1, math.ceil(quantile * len(sorted_samples))))
+    return sorted_samples[rank - 1]
+
+
+class Distribution:
+    """
+    Running count, sum, min and max of a series of samples, and a uniform random sample
+    of at most `size` of them (reservoir sampling) to estimate its percentiles from.
+    """
+
+    def __init__(self, size=RESERVOIR_SIZE):
+        self.size = size
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.samples = []
+
+    def add(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            # Every sample seen so far stays in the reservoir with the same probability
+            index = random.randrange(self.count)
+            if index < self.size:
+                self.samples[index] = value
+
+    def stats(self):
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max if self.count else 0.0,
+            **{f'p{int(q * 100)}': percentile(ordered, q) for q in QUANTILES},
+        }
+
+
+class Metrics:
+    """
+    Process-wide run metrics: duration distributions per crawl stage, event counters,
+    WebDriver commands issued and rows/sec per tournament. Memory stays constant over
+    a crawl of any length. Safe to update from worker threads.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.timings = defaultdict(Distribution)
+        self.counters = Counter()
+        self.webdriver_commands = Counter()
+        self.gauges = {}
+        self.tournament_rows = Counter()
+        self.tournament_seconds = defaultdict(float)
+        self.values = defaultdict(Distribution)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.timings[stage].add(seconds)
+
+    def record_value(self, name, value):
+        """Record a sample of a non-duration distribution, e.g. page size."""
+        with self.lock:
+            self.values[name].add(value)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def set_gauge(self, name, value, **labels):
+        """Set a gauge; `labels` such as host= tell apart the series of one metric."""
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def record_tournament(self, tournament_name, rows, seconds):
+        with self.lock:
+            self.tournament_rows[tournament_name] += rows
+            self.tournament_seconds[tournament_name] += seconds
+
+    def instrument_driver(self, driver):
+        """Count every WebDriver command the driver sends, by command name."""
+        execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            with self.lock:
+                self.webdriver_commands[driver_command] += 1
+            return execute(driver_command, params)
+
+        driver.execute = counted_execute
+        return driver
+
+    def snapshot(self):
+        with self.lock:
+            stages = {stage: distribution.stats() for stage, distribution in self.timings.items()}
+            values = {name: distribution.stats() for name, distribution in self.values.items()}
+            tournaments = {
+                name: {
+                    'rows': rows,
+                    'seconds': self.tournament_seconds[name],
+                    'rows_per_second': rows / self.tournament_seconds[name] if self.tournament_seconds[name] else 0.0,
+                }
+                for name, rows in self.tournament_rows.items()
+            }
+            return {
+                'elapsed_seconds': time.time() - self.started_at,
+                'stages': stages,
+                'values': values,
+                'counters': dict(self.counters),
+                'gauges': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(self.gauges.items())
+                ],
+                'webdriver_commands': {
+                    'total': sum(self.webdriver_commands.values()),
+                    **dict(self.webdriver_commands),
+                },
+                'tournaments': tournaments,
+            }
+
+    def summary(self):
+        data = self.snapshot()
+        lines = [f"Run metrics after {data['elapsed_seconds']:.1f}s"]
+        lines.append(f"  {'stage':<24}{'count':>8}{'total s':>10}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}")
+        for stage, stats in sorted(data['stages'].items(), key=lambda item: -item[1]['sum']):
+            lines.append(
+                f"  {stage:<24}{stats['count']:>8}{stats['sum']:>10.2f}"
+                f"{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['p99']:>9.3f}"
+            )
+        for name, stats in sorted(data['values'].items()):
+            lines.append(
+                f"  {name}: mean {stats['mean']:.1f}, p50 {stats['p50']:.1f}, "
+                f"p95 {stats['p95']:.1f}, p99 {stats['p99']:.1f} ({stats['count']} samples)"
+            )
+        lines.append(f"  WebDriver commands: {data['webdriver_commands']['total']}")
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f"  {name}: {value}")
+        for gauge in data['gauges']:
+            labels = ', '.join(f"{key}={value}" for key, value in gauge['labels'].items())
+            lines.append(f"  {gauge['name']}{f' ({labels})' if labels else ''}: {gauge['value']}")
+        for name, stats in sorted(data['tournaments'].items(), key=lambda item: -item[1]['rows']):
+            lines.append(f"  {name}: {stats['rows']} rows, {stats['rows_per_second']:.1f} rows/s")
+        return '\n'.join(lines)
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def write_prometheus(self, path):
+        """Write the metrics in the Prometheus textfile collector format."""
+        data = self.snapshot()
+
+        def label(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+        lines = ['# TYPE scraper_stage_seconds summary']
+        for stage, stats in sorted(data['stages'].items()):
+            for q in QUANTILES:
+                lines.append(
+                    f'scraper_stage_seconds{{stage="{label(stage)}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]}'
+                )
+            lines.append(f'scraper_stage_seconds_sum{{stage="{label(stage)}"}} {stats["sum"]}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{label(stage)}"}} {stats["count"]}')
+
+        lines.append('# TYPE scraper_value summary')
+        for name, stats in sorted(data['values'].items()):
+            for q in QUANTILES:
+                lines.append(f'scraper_value{{name="{label(name)}",quantile="{q}"}} {stats[f"p{int(q * 100)}"]}')
+            lines.append(f'scraper_value_sum{{name="{label(name)}"}} {stats["sum"]}')
+            lines.append(f'scraper_value_count{{name="{label(name)}"}} {stats["count"]}')
+
+        lines.append('# TYPE scraper_webdriver_commands_total counter')
+        for command, value in sorted(data['webdriver_commands'].items()):
+            if command != 'total':
+                lines.append(f'scraper_webdriver_commands_total{{command="{label(command)}"}} {value}')
+
+        lines.append('# TYPE scraper_events_total counter')
+        for name, value in sorted(data['counters'].items()):
+            lines.append(f'scraper_events_total{{name="{label(name)}"}} {value}')
+
+        lines.append('# TYPE scraper_gauge gauge')
+        for gauge in data['gauges']:
+            labels = ''.join(f',{key}="{label(value)}"' for key, value in gauge['labels'].items())
+            lines.append(f'scraper_gauge{{name="{label(gauge["name"])}"{labels}}} {gauge["value"]}')
+
+        lines.append('# TYPE scraper_tournament_rows_per_second gauge')
+        for name, stats in sorted(data['tournaments'].items()):
+            lines.append(f'scraper_tournament_rows_per_second{{tournament="{label(name)}"}} {stats["rows_per_second"]}')
+
+        # Write to a temporary file first so the collector never reads a partial file
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
+# Shared by the crawler, the worker threads and the driver factory
+metrics = Metrics()
@@ -0,0 +1,278 @@
+import queue
+import threading
+import time
+from typing import NamedTuple
+
+from browser_lifecycle import BrowserLifecycle
+from config.scraper_config import (
+    ODDS_DETAIL_BATCH_SIZE, OPENING_ODDS_TIMEOUT_MS, RECYCLE_MAX_PAGES, RECYCLE_MAX_RSS_MB
+)
+from extractor import BOOKMAKER_ODDS_XPATH, BOOKMAKER_ROW_XPATH, OPENING_ODDS_ATTRIBUTE, extract_bookmaker_odds
+from metrics import metrics
+from pipeline import browser_alive
+from rate_limiter import rate_limiter
+from readiness import wait_until_ready
+from retry import RetryPolicy, call_with_retries
+
+# Hovers every odds cell of the bookmaker table in turn and copies the value after
+# "Opening odds" from the tooltip the site shows into an attribute of the cell, so the
+# page snapshot (and the page cache) carries the opening odds next to the closing ones.
+# Calls back with the number of cells that got an opening value.
+OPENING_ODDS_JS = """
+const rowXpath = arguments[0];
+const cellXpath = arguments[1];
+const attribute = arguments[2];
+const timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+
+function findAll(node, xpath) {
+    const result = document.evaluate(xpath, node, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        nodes.push(result.snapshotItem(i));
+    }
+    return nodes;
+}
+
+function findLabel() {
+    return document.evaluate('//*[contains(text(), "Opening odds")]', document, null,
+                             XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function hover(cell, entering) {
+    cell.dispatchEvent(new MouseEvent(entering ? 'mouseover' : 'mouseout', {bubbles: true}));
+    cell.dispatchEvent(new MouseEvent(entering ? 'mouseenter' : 'mouseleave', {bubbles: false}));
+}
+
+const cells = [];
+for (const row of findAll(document.body, rowXpath)) {
+    cells.push(...findAll(row, cellXpath).filter(cell => !cell.hasAttribute(attribute)));
+}
+let index = 0;
+let found = 0;
+
+function next() {
+    if (index >= cells.length) {
+        return done(found);
+    }
+    const cell = cells[index++];
+    const start = performance.now();
+    hover(cell, true);
+    (function poll() {
+        const label = findLabel();
+        if (!label && performance.now() - start < timeoutMs) {
+            return setTimeout(poll, 25);
+        }
+        if (label) {
+            const text = label.parentNode.innerText || label.parentNode.textContent;
+            const values = (text.split('Opening odds')[1] || '').match(/\\d+\\.\\d+/g);
+            if (values) {
+                cell.setAttribute(attribute, values[values.length - 1]);
+                found++;
+            }
+        }
+        hover(cell, false);
+        // Wait for the tooltip to close so the next cell cannot read this one's value
+        const closing = performance.now();
+        (function gone() {
+            if (findLabel() && performance.now() - closing < timeoutMs) {
+                return setTimeout(gone, 25);
+            }
+            next();
+        })();
+    })();
+}
+
+next();
+"""
+
+
+class MatchDetailJob(NamedTuple):
+    """The detail page of one written match, identified by its match_key."""
+    match_key: str
+    match_url: str
+
+
+def collect_opening_odds(driver):
+    """Copy the opening odds of every bookmaker cell of the current page onto the cell; returns how many."""
+    cells = driver.execute_script(
+        "return document.evaluate(arguments[0], document.body, null, XPathResult.NUMBER_TYPE, null).numberValue;",
+        f'count({BOOKMAKER_ROW_XPATH}{BOOKMAKER_ODDS_XPATH[1:]})',
+    )
+    # Every cell may wait out the tooltip timeout twice, once to open and once to close
+    driver.set_script_timeout(2 * cells * OPENING_ODDS_TIMEOUT_MS / 1000 + 5)
+    with metrics.timer('opening_odds'):
+        found = driver.execute_async_script(
+            OPENING_ODDS_JS, BOOKMAKER_ROW_XPATH, BOOKMAKER_ODDS_XPATH, OPENING_ODDS_ATTRIBUTE, OPENING_ODDS_TIMEOUT_MS
+        )
+    metrics.count('opening_odds_found', int(found))
+    return int(found)
+
+
+def fetch_match_detail(driver, job, cache=None):
+    """Load a match detail page, read its opening odds and return the rendered HTML."""
+    with rate_limiter.slot(job.match_url):
+        with metrics.timer('match_page_load'):
+            driver.get(job.match_url)
+        wait_until_ready(driver, 'match')
+    collect_opening_odds(driver)
+    html = driver.page_source
+    if cache is not None:
+        cache.put(job.match_url, html)
+    return html
+
+
+def odds_rows(job, html):
+    """Long-format rows of a detail page: one per bookmaker and player (outcome 1 or 2)."""
+    rows = []
+    for bookmaker, odds in extract_bookmaker_odds(html):
+        for outcome, (opening_odds, closing_odds) in enumerate(odds[:2], start=1):
+            rows.append({
+                'match_key': job.match_key,
+                'match_url': job.match_url,
+                'bookmaker': bookmaker,
+                'outcome': outcome,
+                'opening_odds': opening_odds,
+                'closing_odds': closing_odds,
+            })
+    return rows
+
+
+class OddsDetailStage:
+    """
+    Fetches the detail page of every match the frontier lists as pending in `workers`
+    parallel browsers, each recycled like the crawl's fetch threads. Pages already in the
+    cache are parsed without a browser. The calling thread collects the results and, every
+    `batch_size` matches, writes their rows, flushes the output and records the batch in
+    the frontier in one transaction, so an interrupted stage resumes after its last batch.
+    """
+
+    def __init__(self, workers, driver_factory, cache=None, retry_policy=None, batch_size=ODDS_DETAIL_BATCH_SIZE,
+                 recycle_pages=RECYCLE_MAX_PAGES, recycle_rss_mb=RECYCLE_MAX_RSS_MB):
+        self.workers = workers
+        # Called with the worker number; must return a ready WebDriver
+        self.driver_factory = driver_factory
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy(1, 0, 0)
+        self.batch_size = batch_size
+        self.recycle_pages = recycle_pages
+        self.recycle_rss_mb = recycle_rss_mb
+        self.jobs = queue.Queue(maxsize=2 * workers)
+        # Unbounded, so fetch threads never wait on the thread writing the batches
+        self.results = queue.Queue()
+        self.stop_event = threading.Event()
+
+    def run(self, frontier, output):
+        """Fetch every pending match detail page; returns (matches done, matches failed)."""
+        threads = [threading.Thread(target=self._feed, args=(frontier,), name='odds-feeder', daemon=True)]
+        threads += [
+            threading.Thread(target=self._fetch_loop, args=(number,), name=f'odds-fetcher-{number}', daemon=True)
+            for number in range(1, self.workers + 1)
+        ]
+        for thread in threads:
+            thread.start()
+
+        batch = []
+        done = failed = 0
+        running = self.workers
+        interrupted = False
+        while running:
+            try:
+                result = self.results.get()
+            except KeyboardInterrupt:
+                # Finish the pages being fetched and keep their rows, then let the caller stop
+                interrupted = True
+                self.stop_event.set()
+                continue
+            if result is None:
+                running -= 1
+                continue
+            batch.append(result)
+            if len(batch) >= self.batch_size:
+                done, failed = self._write_batch(frontier, output, batch, done, failed)
+                batch = []
+        done, failed = self._write_batch(frontier, output, batch, done, failed)
+        for thread in threads:
+            thread.join()
+        if interrupted:
+            raise KeyboardInterrupt
+        return done, failed
+
+    @staticmethod
+    def _write_batch(frontier, output, batch, done, failed):
+        if not batch:
+            return done, failed
+        with metrics.timer('odds_output_write'):
+            for job, rows, error in batch:
+                if error is None:
+                    output.write_rows(rows)
+            output.flush(force=True)
+        # Only recorded once the rows are on disk, like the year pages of the results pass
+        frontier.mark_match_details([
+            (job.match_key, None if rows is None else len({row['bookmaker'] for row in rows}), error)
+            for job, rows, error in batch
+        ])
+        batch_failed = sum(error is not None for _, _, error in batch)
+        metrics.count('match_pages', len(batch) - batch_failed)
+        metrics.count('match_pages_failed', batch_failed)
+        print(f"Bookmaker odds: {done + len(batch) - batch_failed} matches done, {failed + batch_failed} failed")
+        return done + len(batch) - batch_failed, failed + batch_failed
+
+    def _feed(self, frontier):
+        after_key = ''
+        try:
+            while not self.stop_event.is_set():
+                pending = frontier.pending_match_details(after_key, self.batch_size)
+                if not pending:
+                    break
+                for match_key, match_url in pending:
+                    if self.stop_event.is_set():
+                        break
+                    self.jobs.put(MatchDetailJob(match_key, match_url))
+                after_key = pending[-1][0]
+        finally:
+            for _ in range(self.workers):
+                self.jobs.put(None)
+
+    def _fetch_loop(self, number):
+        # Started on the first page the cache cannot answer
+        browser = BrowserLifecycle(
+            lambda: self.driver_factory(number), f'odds-{number}',
+            max_pages=self.recycle_pages, max_rss_mb=self.recycle_rss_mb,
+        )
+
+        def fetch(job):
+            html = self.cache.get(job.match_url) if self.cache is not None else None
+            if html is not None:
+                metrics.count('match_pages_cached')
+                return odds_rows(job, html)
+            driver = browser.get()
+            start = time.perf_counter()
+            try:
+                html = fetch_match_detail(driver, job, self.cache)
+            except Exception:
+                if not browser_alive(driver):
+                    print(f"Odds fetcher {number} lost its browser, starting a new one")
+                    browser.quit()
+                raise
+            browser.page_done(time.perf_counter() - start)
+            return odds_rows(job, html)
+
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                if self.stop_event.is_set():
+                    continue
+                try:
+                    rows = call_with_retries(lambda: fetch(job), self.retry_policy, f"match page {job.match_url}")
+                    self.results.put((job, rows, None))
+                except Exception as e:
+                    print(f"Error fetching bookmaker odds of {job.match_url}: {e}")
+                    self.results.put((job, None, e))
+                if browser.due():
+                    browser.recycle()
+        finally:
+            browser.quit()
+            self.results.put(None)
@@ -0,0 +1,314 @@
+import csv
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+CSV_HEADER = ['Country', 'Tournament', 'Date', 'Time', 'Player 1', 'Player 2', 'Score', 'Odds']
+
+
+class CsvOutput:
+    """Writes match rows to a flat CSV file, appending to an existing file when asked to."""
+
+    # Rows are only ever appended, so the crawler passes on new matches only
+    upserts = False
+
+    def __init__(self, path, append=False):
+        self.path = str(path)
+        append = append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self.file = open(self.path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if not append:
+            self.writer.writerow(CSV_HEADER)
+
+    def write_rows(self, rows):
+        self.writer.writerows(
+            [
+                row['country'],
+                row['tournament'],
+                row['date'],
+                row['time'],
+                row['player1'],
+                row['player2'],
+                row['score'],
+                f"{row['odds1']}-{row['odds2']}"
+            ]
+            for row in rows
+        )
+
+    def flush(self, force=False):
+        """Push written rows to disk; returns True once every written row is persisted."""
+        self.file.flush()
+        return True
+
+    def close(self):
+        self.file.close()
+
+
+def to_float(value):
+    """Odds as written to the CSV as a float, None for 'N/A'."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_date(value):
+    """A YYYYMMDD date as written to the CSV as a date, None for 'N/A'."""
+    try:
+        return datetime.strptime(value, '%Y%m%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+class ParquetOutput:
+    """
+    Buffers match rows into typed Arrow record batches and writes them as a Parquet
+    dataset partitioned by country/tournament/year (hive style, e.g. country=USA/...).
+
+    Dates are date32, odds are float64 and the partition columns are dictionary-encoded,
+    so readers no longer have to parse strings or split the "odds1-odds2" column.
+    """
+
+    upserts = False
+
+    def __init__(self, path, append=False, batch_rows=50000):
+        # Only needed for this backend, so CSV runs do not require pyarrow
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.pq = pq
+        self.path = Path(path)
+        self.batch_rows = batch_rows
+        self.schema = pa.schema([
+            ('country', pa.dictionary(pa.int32(), pa.string())),
+            ('tournament', pa.dictionary(pa.int32(), pa.string())),
+            ('year', pa.dictionary(pa.int32(), pa.string())),
+            ('date', pa.date32()),
+            ('time', pa.string()),
+            ('player1', pa.string()),
+            ('player2', pa.string()),
+            ('score', pa.string()),
+            ('odds1', pa.float64()),
+            ('odds2', pa.float64()),
+        ])
+        self.batches = []
+        self.buffered_rows = 0
+
+        if not append and self.path.exists():
+            # Same as truncating the CSV, but only ever touching Parquet files
+            for old_file in self.path.rglob('*.parquet'):
+                old_file.unlink()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def write_rows(self, rows):
+        if not rows:
+            return
+        pa = self.pa
+        columns = {
+            'country': [row['country'] for row in rows],
+            'tournament': [row['tournament'] for row in rows],
+            'year': [row['year'] for row in rows],
+            'date': [to_date(row['date']) for row in rows],
+            'time': [row['time'] for row in rows],
+            'player1': [row['player1'] for row in rows],
+            'player2': [row['player2'] for row in rows],
+            'score': [row['score'] for row in rows],
+            'odds1': [to_float(row['odds1']) for row in rows],
+            'odds2': [to_float(row['odds2']) for row in rows],
+        }
+        arrays = [pa.array(columns[field.name]).cast(field.type) if pa.types.is_dictionary(field.type)
+                  else pa.array(columns[field.name], type=field.type)
+                  for field in self.schema]
+        self.batches.append(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.buffered_rows += len(rows)
+
+    def flush(self, force=False):
+        """
+        Write the buffered batches once at least `batch_rows` rows are waiting (or always
+        with `force`); returns True once every written row is persisted.
+        """
+        if self.buffered_rows and (force or self.buffered_rows >= self.batch_rows):
+            table = self.pa.Table.from_batches(self.batches, schema=self.schema)
+            self.pq.write_to_dataset(
+                table,
+                root_path=str(self.path),
+                partition_cols=['country', 'tournament', 'year'],
+                basename_template=f'part-{uuid.uuid4().hex}-{{i}}.parquet',
+                # One batch of a full crawl easily spans more seasons than Arrow's default of 1024
+                max_partitions=len(table.group_by(['country', 'tournament', 'year']).aggregate([])) + 1,
+            )
+            self.batches = []
+            self.buffered_rows = 0
+        return self.buffered_rows == 0
+
+    def close(self):
+        self.flush(force=True)
+
+
+ODDS_CSV_HEADER = ['Match Key', 'Match URL', 'Bookmaker', 'Outcome', 'Opening Odds', 'Closing Odds']
+
+
+class OddsCsvOutput:
+    """Writes long-format bookmaker odds rows (one per match, bookmaker and player) to a CSV file."""
+
+    def __init__(self, path, append=False):
+        self.path = str(path)
+        append = append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        self.file = open(self.path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if not append:
+            self.writer.writerow(ODDS_CSV_HEADER)
+
+    def write_rows(self, rows):
+        self.writer.writerows(
+            [row['match_key'], row['match_url'], row['bookmaker'], row['outcome'], row['opening_odds'],
+             row['closing_odds']]
+            for row in rows
+        )
+
+    def flush(self, force=False):
+        self.file.flush()
+        return True
+
+    def close(self):
+        self.file.close()
+
+
+class OddsParquetOutput:
+    """
+    Writes long-format bookmaker odds rows as a flat Parquet dataset, one file per flush.
+    Bookmaker names are dictionary-encoded and the odds are float64.
+    """
+
+    def __init__(self, path, append=False):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.pq = pq
+        self.path = Path(path)
+        self.schema = pa.schema([
+            ('match_key', pa.string()),
+            ('match_url', pa.string()),
+            ('bookmaker', pa.dictionary(pa.int32(), pa.string())),
+            ('outcome', pa.int8()),
+            ('opening_odds', pa.float64()),
+            ('closing_odds', pa.float64()),
+        ])
+        self.rows = []
+        if not append and self.path.exists():
+            for old_file in self.path.glob('*.parquet'):
+                old_file.unlink()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def write_rows(self, rows):
+        self.rows.extend(rows)
+
+    def flush(self, force=False):
+        # The odds stage only flushes once per batch, so every flush is a file
+        if self.rows:
+            pa = self.pa
+            arrays = [
+                pa.array([row['match_key'] for row in self.rows], type=pa.string()),
+                pa.array([row['match_url'] for row in self.rows], type=pa.string()),
+                pa.array([row['bookmaker'] for row in self.rows]).dictionary_encode().cast(self.schema[2].type),
+                pa.array([row['outcome'] for row in self.rows], type=pa.int8()),
+                pa.array([to_float(row['opening_odds']) for row in self.rows], type=pa.float64()),
+                pa.array([to_float(row['closing_odds']) for row in self.rows], type=pa.float64()),
+            ]
+            self.pq.write_table(
+                pa.Table.from_arrays(arrays, schema=self.schema), str(self.path / f'part-{uuid.uuid4().hex}.parquet')
+            )
+            self.rows = []
+        return True
+
+    def close(self):
+        self.flush(force=True)
+
+
+def _csv_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for country, tournament, date, time, player1, player2, score, odds in reader:
+            odds1, _, odds2 = odds.partition('-')
+            yield {
+                'country': country, 'tournament': tournament, 'year': None, 'date': date, 'time': time,
+                'player1': player1, 'player2': player2, 'score': score, 'odds1': odds1, 'odds2': odds2,
+            }
+
+
+def _parquet_rows(path):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    # Read partition values as written instead of letting Arrow infer e.g. integer years
+    partitioning = ds.partitioning(
+        pa.schema([('country', pa.string()), ('tournament', pa.string()), ('year', pa.string())]), flavor='hive'
+    )
+    dataset = ds.dataset(str(path), format='parquet', partitioning=partitioning)
+    for batch in dataset.to_batches():
+        for row in batch.to_pylist():
+            row['date'] = row['date'].strftime('%Y%m%d') if row['date'] is not None else 'N/A'
+            for field in ('odds1', 'odds2'):
+                row[field] = repr(row[field]) if row[field] is not None else 'N/A'
+            yield row
+
+
+def _sqlite_rows(path):
+    from archive import MatchArchive
+
+    archive = MatchArchive(path)
+    try:
+        yield from archive.iter_rows()
+    finally:
+        archive.close()
+
+
+OUTPUT_FORMATS = ('csv', 'parquet', 'sqlite')
+
+# File or directory name of each backend's output when no path is given. The SQLite backend
+# keeps the bookmaker odds in the match archive itself, joined on match_key.
+DEFAULT_OUTPUT_NAMES = {'csv': 'matches.csv', 'parquet': 'matches_parquet', 'sqlite': 'matches.db'}
+DEFAULT_ODDS_OUTPUT_NAMES = {'csv': 'bookmaker_odds.csv', 'parquet': 'bookmaker_odds_parquet', 'sqlite': 'matches.db'}
+
+
+def read_rows(output_format, path):
+    """
+    Stream the match rows of an archive written by open_output as row dicts. CSV files
+    have no year column, so their rows come back with year None.
+    """
+    if output_format == 'csv':
+        return _csv_rows(path)
+    if output_format == 'parquet':
+        return _parquet_rows(path)
+    if output_format == 'sqlite':
+        return _sqlite_rows(path)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def open_output(output_format, path, append=False, batch_rows=50000):
+    """Open the output backend for `output_format` ('csv', 'parquet' or 'sqlite')."""
+    if output_format == 'csv':
+        return CsvOutput(path, append=append)
+    if output_format == 'parquet':
+        return ParquetOutput(path, append=append, batch_rows=batch_rows)
+    if output_format == 'sqlite':
+        # Imported here like pyarrow, the archive batches by its own ARCHIVE_BATCH_ROWS
+        from archive import MatchArchive
+        return MatchArchive(path, append=append)
+    raise ValueError(f"Unknown output format: {output_format}")
+
+
+def open_odds_output(output_format, path, append=False):
+    """Open the bookmaker odds backend for `output_format` ('csv', 'parquet' or 'sqlite')."""
+    if output_format == 'csv':
+        return OddsCsvOutput(path, append=append)
+    if output_format == 'parquet':
+        return OddsParquetOutput(path, append=append)
+    if output_format == 'sqlite':
+        from archive import BookmakerOddsArchive
+        return BookmakerOddsArchive(path, append=append)
+    raise ValueError(f"Unknown output format: {output_format}")
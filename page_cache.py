@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class PageCache:
+    """
+    Content-addressed, gzip-compressed store of rendered year pages.
+
+    Every fetch is indexed by (url, fetched_at) and points at an object named by the
+    SHA-256 of its HTML, so re-fetching an unchanged page costs no extra disk. Objects
+    are evicted least-recently-used first once the cache outgrows `max_bytes`, and
+    fetches older than `max_age_days` are dropped.
+    """
+
+    def __init__(self, root, max_bytes=5 * 1024 ** 3, max_age_days=None):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        # Worker threads store pages while the writer thread may read them
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(self.root / 'index.db'), check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                digest TEXT NOT NULL,
+                PRIMARY KEY (url, fetched_at)
+            )
+            """
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest)")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _object_path(self, digest):
+        return self.objects_dir / digest[:2] / f'{digest}.html.gz'
+
+    def put(self, url, html, fetched_at=None):
+        """Store the rendered HTML of `url` and return its content digest."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+
+        with self.lock:
+            known = self.connection.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if known is None:
+                path.parent.mkdir(exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                size = path.stat().st_size
+                self.connection.execute(
+                    "INSERT INTO objects (digest, size, last_access) VALUES (?, ?, ?)", (digest, size, fetched_at)
+                )
+                self.total_bytes += size
+            else:
+                self.connection.execute("UPDATE objects SET last_access = ? WHERE digest = ?", (fetched_at, digest))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pages (url, fetched_at, digest) VALUES (?, ?, ?)", (url, fetched_at, digest)
+            )
+            if self.total_bytes > self.max_bytes:
+                self._evict_lru()
+        return digest
+
+    def get(self, url):
+        """Return the most recently fetched HTML of `url`, or None if it is not cached."""
+        with self.lock:
+            result = self.connection.execute(
+                "SELECT digest FROM pages WHERE url = ? ORDER BY fetched_at DESC LIMIT 1", (url,)
+            ).fetchone()
+            if result is None:
+                return None
+            self.connection.execute("UPDATE objects SET last_access = ? WHERE digest = ?", (time.time(), result[0]))
+        return self.read_object(result[0])
+
+    def read_object(self, digest):
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def latest_pages(self):
+        """Return (url, fetched_at, digest) of the newest fetch of every cached URL."""
+        with self.lock:
+            return self.connection.execute(
+                """
+                SELECT url, MAX(fetched_at), digest FROM pages
+                GROUP BY url ORDER BY url
+                """
+            ).fetchall()
+
+    def evict(self):
+        """Drop fetches older than the age limit, then shrink to the size limit."""
+        with self.lock:
+            if self.max_age_days is not None:
+                cutoff = time.time() - self.max_age_days * 86400
+                self.connection.execute("DELETE FROM pages WHERE fetched_at < ?", (cutoff,))
+                orphans = self.connection.execute(
+                    "SELECT digest, size FROM objects WHERE digest NOT IN (SELECT digest FROM pages)"
+                ).fetchall()
+                self._delete_objects(orphans)
+            if self.total_bytes > self.max_bytes:
+                self._evict_lru()
+
+    def _evict_lru(self):
+        # Shrink to 90% of the cap so eviction does not run again on the very next put
+        target = self.max_bytes * 0.9
+        victims = []
+        freed = 0
+        for digest, size in self.connection.execute("SELECT digest, size FROM objects ORDER BY last_access"):
+            if self.total_bytes - freed <= target:
+                break
+            victims.append((digest, size))
+            freed += size
+        self._delete_objects(victims)
+
+    def _delete_objects(self, objects):
+        for digest, size in objects:
+            self.connection.execute("DELETE FROM pages WHERE digest = ?", (digest,))
+            self.connection.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= size
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,62 @@
+from extractor import (
+    EVENT_ROW_XPATH, MATCHES_CONTAINER_XPATH, PAGINATION_XPATH, SEEN_ROW_ATTRIBUTE, season_page_url
+)
+from metrics import metrics
+
+# Highest page number among the pagination links, which also list the last page of a long season
+PAGE_COUNT_JS = """
+const links = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+let count = 1;
+for (let i = 0; i < links.snapshotLength; i++) {
+    const number = parseInt(links.snapshotItem(i).getAttribute('data-number'), 10);
+    if (number > count) {
+        count = number;
+    }
+}
+return count;
+"""
+
+# Flags the rows on screen as seen, so readiness and extraction only count the rows of the
+# next page whether the site replaces the list or appends to it, and switches to that page
+# the way a visitor would: through its pagination link, or its URL.
+# Returns at once; the rows are fetched and rendered by the page's own scripts afterwards.
+TURN_PAGE_JS = """
+const containerXpath = arguments[0];
+const rowXpath = arguments[1];
+const seenAttribute = arguments[2];
+const linkXpath = arguments[3];
+const url = arguments[4];
+
+const container = document.evaluate(containerXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (container) {
+    const rows = document.evaluate(rowXpath, container, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (let i = 0; i < rows.snapshotLength; i++) {
+        rows.snapshotItem(i).setAttribute(seenAttribute, '');
+    }
+}
+// The next probe_ready() starts watching this document afresh
+window.__crawlReadiness = null;
+const link = document.evaluate(linkXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (link) {
+    link.click();
+} else {
+    window.location.href = url;
+}
+"""
+
+
+def read_page_count(driver):
+    """Number of results pages of the season in the current tab, 1 when it is not paginated."""
+    return int(driver.execute_script(PAGE_COUNT_JS, PAGINATION_XPATH))
+
+
+def turn_page(driver, year_url, number):
+    """
+    Start switching the season in the current tab to results page `number` without waiting
+    for it; wait_until_ready(driver, 'season_page') or probe_ready() then tell when it is shown.
+    """
+    metrics.count('season_page_turns')
+    driver.execute_script(
+        TURN_PAGE_JS, MATCHES_CONTAINER_XPATH, EVENT_ROW_XPATH, SEEN_ROW_ATTRIBUTE,
+        f'{PAGINATION_XPATH}[@data-number="{number}"]', season_page_url(year_url, number),
+    )
@@ -0,0 +1,281 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+from browser_lifecycle import BrowserLifecycle
+from config.scraper_config import RECYCLE_MAX_PAGES, RECYCLE_MAX_RSS_MB
+from driver_caller import Driver
+from metrics import metrics
+from retry import RetriesExhausted, RetryPolicy, call_with_retries
+from scraper import fetch_season, fetch_year_http, parse_year
+from tabs import TabBrowser
+
+# How long a multi-tab fetcher sleeps when none of its tabs finished in a pass
+TAB_POLL_SECONDS = 0.05
+
+
+def browser_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+class CrawlPipeline:
+    """
+    Crawl stages connected by bounded queues:
+
+        discovery (caller) -> fetch (browser threads) -> parse (lxml threads) -> write (one thread)
+
+    Each fetch thread owns its own Driver, started on first use when pages are tried
+    over plain HTTP first; parse threads turn page snapshots into rows while the
+    browsers are already loading the next pages; a single writer calls
+    `on_result(job, rows, error)` once every results page of a season is parsed, so
+    output never needs its own locking. Queues are
+    bounded, so a slow stage makes the stages before it wait instead of piling up
+    pages in memory. With `tabs` > 1 each fetch thread keeps that many pages loading
+    at once in the tabs of its one browser (see TabBrowser). Every fetch thread restarts
+    its browser between pages once BrowserLifecycle finds it worn out.
+    """
+
+    def __init__(self, fetch_workers, on_result, engine='snapshot', cache=None, driver_factory=None,
+                 parse_workers=1, queue_size=16, http=None, retry_policy=None, tabs=1,
+                 recycle_pages=RECYCLE_MAX_PAGES, recycle_rss_mb=RECYCLE_MAX_RSS_MB):
+        self.fetch_workers = fetch_workers
+        # Year pages each fetch thread keeps loading at once in the tabs of its browser
+        self.tabs = tabs
+        # Limits after which a fetch thread restarts its browser, see BrowserLifecycle
+        self.recycle_pages = recycle_pages
+        self.recycle_rss_mb = recycle_rss_mb
+        self.parse_workers = parse_workers
+        # Called with the worker number; must return a ready WebDriver
+        self.driver_factory = driver_factory or (lambda number: Driver().get_driver())
+        self.on_result = on_result
+        self.engine = engine
+        self.cache = cache
+        # Shared HttpFetcher tried before each fetch thread's browser
+        self.http = http
+        # Each fetch thread retries its own failed pages with backoff while the others carry on
+        self.retry_policy = retry_policy or RetryPolicy(1, 0, 0)
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.pages = queue.Queue(maxsize=queue_size)
+        self.results = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        self._fetch_threads = []
+        self._parse_threads = []
+        self._writer_thread = None
+
+    def start(self):
+        self._writer_thread = threading.Thread(target=self._write_loop, name='writer', daemon=True)
+        self._writer_thread.start()
+        for number in range(1, self.parse_workers + 1):
+            thread = threading.Thread(target=self._parse_loop, name=f'parser-{number}', daemon=True)
+            thread.start()
+            self._parse_threads.append(thread)
+        for number in range(1, self.fetch_workers + 1):
+            target = self._tab_fetch_loop if self.tabs > 1 else self._fetch_loop
+            thread = threading.Thread(target=target, args=(number,), name=f'fetcher-{number}', daemon=True)
+            thread.start()
+            self._fetch_threads.append(thread)
+        return self
+
+    def submit(self, job):
+        """Queue a YearJob; blocks while the fetch stage is saturated."""
+        self.jobs.put(job)
+
+    def close(self, cancel=False):
+        """
+        Wait for every queued job to pass through all stages, then shut them down in order.
+        With `cancel=True` (e.g. on Ctrl-C) queued jobs are dropped and only the pages
+        already being fetched are completed.
+        """
+        if cancel:
+            self.stop_event.set()
+            self._drain(self.jobs)
+        self._stop_stage(self.jobs, self._fetch_threads)
+        self._stop_stage(self.pages, self._parse_threads)
+        self._stop_stage(self.results, [self._writer_thread] if self._writer_thread else [])
+
+    @staticmethod
+    def _stop_stage(inbox, threads):
+        for _ in threads:
+            inbox.put(None)
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def _drain(jobs):
+        while True:
+            try:
+                jobs.get_nowait()
+            except queue.Empty:
+                return
+
+    def _browser_lifecycle(self, number):
+        return BrowserLifecycle(
+            lambda: self.driver_factory(number), f'worker-{number}',
+            max_pages=self.recycle_pages, max_rss_mb=self.recycle_rss_mb,
+        )
+
+    def _fetch_loop(self, number):
+        # With an HttpFetcher the browser is only started once a page actually needs it
+        browser = self._browser_lifecycle(number)
+
+        def fetch(job):
+            page = fetch_year_http(job, self.http, self.cache) if self.http is not None else None
+            if page is not None:
+                self.pages.put(page)
+                return
+            driver = browser.get()
+            try:
+                # Parsers extract each results page while the browser loads the season's next one
+                for page in fetch_season(driver, job, self.engine, self.cache):
+                    browser.page_done(page.fetch_seconds)
+                    self.pages.put(page)
+            except Exception:
+                # A crashed browser only takes this worker down until its next attempt
+                if not browser_alive(driver):
+                    print(f"Fetcher {number} lost its browser, starting a new one")
+                    browser.quit()
+                raise
+
+        try:
+            while True:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                if self.stop_event.is_set():
+                    continue
+                try:
+                    call_with_retries(lambda: fetch(job), self.retry_policy, f"year page {job.year_url}")
+                except Exception as e:
+                    self.results.put((job, None, e, 1, 1))
+                # Restart a worn-out browser between pages, never in the middle of one
+                if browser.due():
+                    browser.recycle()
+        finally:
+            browser.quit()
+
+    def _tab_fetch_loop(self, number):
+        # Pages waiting for an idle tab, as (job, attempt), and failed pages waiting out their backoff
+        backlog = deque()
+        retries = []
+        lifecycle = self._browser_lifecycle(number)
+        browser = None
+        closing = False
+
+        try:
+            while True:
+                if self.stop_event.is_set():
+                    backlog.clear()
+                    retries = []
+                now = time.monotonic()
+                backlog.extend((job, attempt) for not_before, job, attempt in retries if not_before <= now)
+                retries = [retry for retry in retries if retry[0] > now]
+                loading = browser is not None and bool(browser.busy)
+
+                # Keep about one queued page per idle tab; only block on the queue when nothing else is going on
+                idle_tabs = self.tabs if browser is None else len(browser.idle)
+                while not closing and len(backlog) < idle_tabs:
+                    try:
+                        if backlog or retries or loading:
+                            job = self.jobs.get_nowait()
+                        else:
+                            job = self.jobs.get()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        closing = True
+                    elif not self.stop_event.is_set():
+                        backlog.append((job, 1))
+                if closing and not backlog and not retries and not loading:
+                    break
+
+                finished = []
+                # A browser due for a restart gets no new pages until its tabs are done
+                while backlog and not lifecycle.due():
+                    job, attempt = backlog[0]
+                    try:
+                        page = fetch_year_http(job, self.http, self.cache) if self.http is not None else None
+                        if page is None:
+                            if browser is None:
+                                browser = TabBrowser(lifecycle.get(), self.tabs, self.engine, self.cache)
+                            if not browser.idle or not browser.start(job, attempt):
+                                break
+                        else:
+                            finished.append((job, attempt, page, None))
+                    except Exception as e:
+                        finished.append((job, attempt, None, e))
+                    backlog.popleft()
+
+                if browser is not None and browser.busy:
+                    finished.extend(browser.poll())
+                for job, attempt, page, error in finished:
+                    if error is None:
+                        lifecycle.page_done(page.fetch_seconds)
+                        self.pages.put(page)
+                    elif attempt < self.retry_policy.attempts:
+                        # The other tabs keep loading while this page waits out its backoff
+                        metrics.count('retries')
+                        logging.info(f"Attempt {attempt} of year page {job.year_url} failed ({type(error).__name__}: {error})")
+                        retries.append((time.monotonic() + self.retry_policy.delay(attempt), job, attempt + 1))
+                    else:
+                        self.results.put(
+                            (job, None, RetriesExhausted(f"year page {job.year_url}", error, attempt), 1, 1)
+                        )
+
+                if any(error is not None for *_, error in finished) and browser is not None \
+                        and not browser_alive(browser.driver):
+                    print(f"Fetcher {number} lost its browser, starting a new one")
+                    lifecycle.quit()
+                    # Pages still loading in the dead browser are retried like any other failure
+                    for tab in browser.busy:
+                        retries.append((time.monotonic(), tab.job, tab.attempt))
+                    browser = None
+                elif browser is not None and lifecycle.due() and not browser.busy:
+                    lifecycle.recycle()
+                    browser = None
+                if not finished:
+                    time.sleep(TAB_POLL_SECONDS)
+        finally:
+            lifecycle.quit()
+
+    def _parse_loop(self):
+        while True:
+            page = self.pages.get()
+            if page is None:
+                break
+            try:
+                self.results.put((page.job, parse_year(page), None, page.page_number, page.page_count))
+            except Exception as e:
+                self.results.put((page.job, None, e, page.page_number, page.page_count))
+
+    def _write_loop(self):
+        # Rows of paginated seasons still missing pages, by year URL and page number. Pages
+        # are parsed in any order, and a retried season may deliver some of them twice.
+        partial = {}
+        # Seasons already written whose stray pages of an earlier attempt must not start over
+        finished = set()
+        while True:
+            result = self.results.get()
+            if result is None:
+                break
+            job, rows, error, page_number, page_count = result
+            if job.year_url in finished:
+                continue
+            if error is None and page_count > 1:
+                pages = partial.setdefault(job.year_url, {})
+                pages[page_number] = rows
+                if any(number not in pages for number in range(1, page_count + 1)):
+                    continue
+                rows = [row for number in range(1, page_count + 1) for row in pages[number]]
+            if error is not None or job.year_url in partial:
+                partial.pop(job.year_url, None)
+                finished.add(job.year_url)
+            try:
+                self.on_result(job, rows, error)
+            except Exception as e:
+                print(f"Failed to write results for {job.year_url}: {e}")
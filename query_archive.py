@@ -0,0 +1,71 @@
+from archive import MatchArchive
+from config.os_config import ROOT_DIR
+from output import DEFAULT_OUTPUT_NAMES
+import argparse
+import csv
+import os
+import sys
+
+# Common lookups on the SQLite archive written by main.py --output-format sqlite, e.g.
+#   python query_archive.py player Alcaraz --since 2023-01-01
+#   python query_archive.py h2h Sinner Medvedev
+#   python query_archive.py season "Australian Open" 2024 --country Australia
+parser = argparse.ArgumentParser(description="Query the indexed SQLite match archive")
+parser.add_argument('--archive', default=os.path.join(ROOT_DIR, DEFAULT_OUTPUT_NAMES['sqlite']),
+                    help="SQLite archive to read")
+parser.add_argument('--csv', action='store_true', help="Print the matches as CSV instead of a table")
+commands = parser.add_subparsers(dest='command', required=True)
+
+players_parser = commands.add_parser('players', help="List the players whose name contains a pattern")
+players_parser.add_argument('pattern')
+
+player_parser = commands.add_parser('player', help="Match history of one player")
+player_parser.add_argument('name', help="Player name as listed on the site, or a unique part of it")
+player_parser.add_argument('--since', help="First date to include, YYYY-MM-DD")
+player_parser.add_argument('--until', help="Last date to include, YYYY-MM-DD")
+
+h2h_parser = commands.add_parser('h2h', help="Head-to-head matches of two players")
+h2h_parser.add_argument('name_a')
+h2h_parser.add_argument('name_b')
+h2h_parser.add_argument('--since', help="First date to include, YYYY-MM-DD")
+h2h_parser.add_argument('--until', help="Last date to include, YYYY-MM-DD")
+
+season_parser = commands.add_parser('season', help="All matches of one tournament season")
+season_parser.add_argument('tournament')
+season_parser.add_argument('season', help="Season year, or 'Current'")
+season_parser.add_argument('--country', help="Country of the tournament, when several share its name")
+args = parser.parse_args()
+
+if not os.path.exists(args.archive):
+    print(f"No archive at {args.archive}, crawl with --output-format sqlite first")
+    sys.exit(1)
+
+archive = MatchArchive(args.archive)
+try:
+    if args.command == 'players':
+        for player_id, name in archive.find_players(args.pattern):
+            print(f"{player_id:>8}  {name}")
+        sys.exit(0)
+    if args.command == 'player':
+        matches = archive.player_matches(args.name, args.since, args.until)
+    elif args.command == 'h2h':
+        matches = archive.head_to_head(args.name_a, args.name_b, args.since, args.until)
+    else:
+        matches = archive.tournament_season(args.tournament, args.season, args.country)
+except LookupError as e:
+    print(e)
+    sys.exit(1)
+finally:
+    archive.close()
+
+columns = ['date', 'time', 'country', 'tournament', 'season', 'player1', 'player2', 'score', 'odds1', 'odds2']
+if args.csv:
+    writer = csv.DictWriter(sys.stdout, fieldnames=columns, extrasaction='ignore')
+    writer.writeheader()
+    writer.writerows(matches)
+else:
+    for match in matches:
+        odds = f"{match['odds1'] or '-'} / {match['odds2'] or '-'}"
+        print(f"{match['date'] or 'N/A':<11}{match['time']:<6} {match['tournament']} {match['season']}: "
+              f"{match['player1']} vs {match['player2']}  {match['score']}  ({odds})")
+    print(f"{len(matches)} matches")
@@ -0,0 +1,190 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from config.scraper_config import (
+    RATE_LIMIT_INITIAL_CONCURRENCY, RATE_LIMIT_INITIAL_RPS, RATE_LIMIT_MAX_CONCURRENCY, RATE_LIMIT_MAX_RPS,
+    RATE_LIMIT_MIN_RPS, RATE_LIMIT_SLOW_FACTOR
+)
+from metrics import metrics
+
+# Smoothing of the per-host latency baseline; small so one slow page does not move it much
+LATENCY_ALPHA = 0.1
+# After a decrease, further bad signals are ignored for this long so one burst only halves once
+DECREASE_COOLDOWN_SECONDS = 5.0
+
+
+class HostState:
+    """Limits and latency baseline of a single host."""
+
+    def __init__(self, concurrency, rate):
+        self.concurrency = float(concurrency)
+        self.rate = float(rate)
+        self.in_flight = 0
+        self.next_start = 0.0
+        self.latency = None
+        self.last_decrease = 0.0
+
+
+class Request:
+    """Handle of one rate-limited request; call throttled() when the site pushed back."""
+
+    def __init__(self):
+        self.pushed_back = False
+        self.host = None
+        self.state = None
+        self.started = None
+
+    def throttled(self):
+        self.pushed_back = True
+
+    def exclude(self, seconds):
+        """Leave `seconds` the caller spent on other work while the request was open out of its latency."""
+        if self.started is not None:
+            self.started += seconds
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host AIMD controller for page loads and HTTP fetches. Every request holds one of
+    the host's concurrency slots and starts at least 1/rate seconds after the previous one.
+    A fast success grows the concurrency by about one slot per round trip and the rate by
+    a fixed step; an error, a timeout, a throttling response or a page several times slower
+    than the host's baseline halves both. Current limits are published as metrics gauges.
+    Shared by every browser and fetch thread.
+    """
+
+    def __init__(self, initial_concurrency=RATE_LIMIT_INITIAL_CONCURRENCY, max_concurrency=RATE_LIMIT_MAX_CONCURRENCY,
+                 initial_rate=RATE_LIMIT_INITIAL_RPS, min_rate=RATE_LIMIT_MIN_RPS, max_rate=RATE_LIMIT_MAX_RPS,
+                 slow_factor=RATE_LIMIT_SLOW_FACTOR):
+        self.condition = threading.Condition()
+        self.hosts = {}
+        self.enabled = True
+        self.configure(initial_concurrency, max_concurrency, initial_rate, min_rate, max_rate, slow_factor)
+
+    def configure(self, initial_concurrency=None, max_concurrency=None, initial_rate=None, min_rate=None,
+                  max_rate=None, slow_factor=None, enabled=None):
+        """Change the limits; only hosts seen after the call start from the new initial values."""
+        with self.condition:
+            if initial_concurrency is not None:
+                self.initial_concurrency = initial_concurrency
+            if max_concurrency is not None:
+                self.max_concurrency = max_concurrency
+            if initial_rate is not None:
+                self.initial_rate = initial_rate
+            if min_rate is not None:
+                self.min_rate = min_rate
+            if max_rate is not None:
+                self.max_rate = max_rate
+            if slow_factor is not None:
+                self.slow_factor = slow_factor
+            if enabled is not None:
+                self.enabled = enabled
+            self.condition.notify_all()
+
+    def _host(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(
+                min(self.initial_concurrency, self.max_concurrency),
+                min(max(self.initial_rate, self.min_rate), self.max_rate),
+            )
+            self.hosts[host] = state
+            self._publish(host, state)
+        return state
+
+    @contextmanager
+    def slot(self, url):
+        """
+        Wait for a free slot of the url's host and yield a Request. An exception raised
+        inside the block counts as a failed request.
+        """
+        request = self.acquire(url)
+        failed = True
+        try:
+            yield request
+            failed = False
+        finally:
+            self.release(request, failed)
+
+    def acquire(self, url, block=True):
+        """
+        Take a slot of the url's host for a request that ends with release(). With
+        `block=False` returns None instead of waiting, for callers juggling several loads.
+        """
+        request = Request()
+        if not self.enabled:
+            return request
+
+        host = urlsplit(url).netloc
+        with metrics.timer('rate_limit_wait'):
+            with self.condition:
+                state = self._host(host)
+                while True:
+                    if state.in_flight >= int(state.concurrency):
+                        if not block:
+                            return None
+                        # Woken up by _finish when a request of this host completes
+                        self.condition.wait()
+                        continue
+                    delay = state.next_start - time.monotonic()
+                    if delay <= 0:
+                        break
+                    if not block:
+                        return None
+                    self.condition.wait(delay)
+                state.in_flight += 1
+                state.next_start = time.monotonic() + 1 / state.rate
+
+        request.host = host
+        request.state = state
+        request.started = time.perf_counter()
+        return request
+
+    def release(self, request, failed=False):
+        if request.state is None:
+            return
+        self._finish(
+            request.host, request.state, time.perf_counter() - request.started, failed or request.pushed_back
+        )
+        request.state = None
+
+    def _finish(self, host, state, seconds, failed):
+        with self.condition:
+            state.in_flight -= 1
+            slow = state.latency is not None and seconds > self.slow_factor * state.latency
+            if failed or slow:
+                metrics.count('rate_limit_backoffs')
+                now = time.monotonic()
+                if now - state.last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                    state.last_decrease = now
+                    state.concurrency = max(1.0, state.concurrency / 2)
+                    state.rate = max(self.min_rate, state.rate / 2)
+                    # Space out the next request by the new, slower interval
+                    state.next_start = max(state.next_start, now + 1 / state.rate)
+            else:
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+                state.rate = min(self.max_rate, state.rate + self.min_rate)
+            if not failed:
+                state.latency = seconds if state.latency is None else (
+                    (1 - LATENCY_ALPHA) * state.latency + LATENCY_ALPHA * seconds
+                )
+            self._publish(host, state)
+            self.condition.notify_all()
+
+    @staticmethod
+    def _publish(host, state):
+        metrics.set_gauge('concurrency_limit', int(state.concurrency), host=host)
+        metrics.set_gauge('requests_per_second_limit', round(state.rate, 2), host=host)
+
+    def limits(self):
+        with self.condition:
+            return {
+                host: {'concurrency': int(state.concurrency), 'rate': state.rate, 'in_flight': state.in_flight}
+                for host, state in self.hosts.items()
+            }
+
+
+# Shared by the discovery browser, the pipeline's fetch threads and the HTTP fetcher
+rate_limiter = AdaptiveRateLimiter()
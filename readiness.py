@@ -0,0 +1,231 @@
+from typing import NamedTuple, Optional
+
+from extractor import BOOKMAKER_ROW_XPATH, EVENT_ROW_XPATH, MATCHES_CONTAINER_XPATH
+from metrics import metrics
+
+
+class PageNotReady(Exception):
+    """The page did not settle before its readiness timeout."""
+
+
+class ReadinessPolicy(NamedTuple):
+    """
+    When a page type counts as "done": `container_xpath` must exist, at least `min_rows`
+    nodes matching `row_xpath` must be inside it, and neither the container's DOM nor
+    the number of network requests may have changed for `quiet_ms`. A container that
+    stays empty is accepted after `empty_grace_ms` of quiet.
+    """
+    container_xpath: str
+    row_xpath: Optional[str]
+    min_rows: int
+    quiet_ms: int
+    empty_grace_ms: int
+    timeout_ms: int
+
+
+READINESS_POLICIES = {
+    # Tennis results page with the country containers
+    'results': ReadinessPolicy(
+        container_xpath='//body',
+        row_xpath='.//ul[contains(@class, "content-start") and contains(@class, "border-l")]',
+        min_rows=1, quiet_ms=300, empty_grace_ms=10000, timeout_ms=15000,
+    ),
+    # Tournament landing page: heading, breadcrumbs and the year <select>
+    'tournament': ReadinessPolicy(
+        container_xpath='//h1',
+        row_xpath=None,
+        min_rows=0, quiet_ms=200, empty_grace_ms=200, timeout_ms=10000,
+    ),
+    # Season results list
+    'season': ReadinessPolicy(
+        container_xpath=MATCHES_CONTAINER_XPATH,
+        row_xpath=EVENT_ROW_XPATH,
+        min_rows=1, quiet_ms=250, empty_grace_ms=2000, timeout_ms=15000,
+    ),
+    # Further results page of a season, switched to in the same document: rows of the
+    # previous page are flagged as seen and do not count, and its data request gets longer
+    'season_page': ReadinessPolicy(
+        container_xpath=MATCHES_CONTAINER_XPATH,
+        row_xpath=EVENT_ROW_XPATH,
+        min_rows=1, quiet_ms=250, empty_grace_ms=5000, timeout_ms=15000,
+    ),
+    # Match detail page with the bookmaker odds table; some matches were never offered
+    'match': ReadinessPolicy(
+        container_xpath='//body',
+        row_xpath=BOOKMAKER_ROW_XPATH,
+        min_rows=1, quiet_ms=250, empty_grace_ms=3000, timeout_ms=15000,
+    ),
+}
+
+# Installs a MutationObserver on the container and polls until the row count is high
+# enough and both the DOM and the network have been quiet for the policy's window.
+WAIT_UNTIL_READY_JS = """
+const containerXpath = arguments[0];
+const rowXpath = arguments[1];
+const minRows = arguments[2];
+const quietMs = arguments[3];
+const emptyGraceMs = arguments[4];
+const timeoutMs = arguments[5];
+const done = arguments[arguments.length - 1];
+
+const start = performance.now();
+let lastChange = start;
+let observer = null;
+let lastRequests = -1;
+
+function findContainer() {
+    return document.evaluate(containerXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function countRows(container) {
+    if (!rowXpath) {
+        return 0;
+    }
+    return document.evaluate('count(' + rowXpath + ')', container, null, XPathResult.NUMBER_TYPE, null).numberValue;
+}
+
+function finish(result) {
+    if (observer) {
+        observer.disconnect();
+    }
+    done(result);
+}
+
+function check() {
+    const now = performance.now();
+    const container = findContainer();
+    if (container && !observer) {
+        observer = new MutationObserver(function () { lastChange = performance.now(); });
+        observer.observe(container, {childList: true, subtree: true, characterData: true});
+        lastChange = now;
+    }
+
+    // A change in the number of requests counts as activity, approximating network idle
+    const requests = performance.getEntriesByType('resource').length;
+    if (requests !== lastRequests) {
+        lastRequests = requests;
+        lastChange = now;
+    }
+
+    const rows = container ? countRows(container) : 0;
+    const quietFor = now - lastChange;
+    if (container && document.readyState !== 'loading') {
+        if (rows >= minRows && quietFor >= quietMs) {
+            return finish({ready: true, rows: rows, found: true});
+        }
+        if (rows === 0 && quietFor >= emptyGraceMs) {
+            return finish({ready: true, rows: 0, found: true});
+        }
+    }
+    if (now - start >= timeoutMs) {
+        return finish({ready: false, rows: rows, found: !!container});
+    }
+    setTimeout(check, 50);
+}
+
+check();
+"""
+
+
+def wait_until_ready(driver, page_type):
+    """
+    Block until the current page of `page_type` has settled according to its policy and
+    return the number of rows found. Raises PageNotReady instead of letting a partially
+    rendered page be read.
+    """
+    policy = READINESS_POLICIES[page_type]
+    # Leave the browser-side timeout room to report before WebDriver gives up on the script
+    driver.set_script_timeout(policy.timeout_ms / 1000 + 5)
+    with metrics.timer(f'ready_{page_type}'):
+        result = driver.execute_async_script(
+            WAIT_UNTIL_READY_JS,
+            policy.container_xpath, policy.row_xpath, policy.min_rows,
+            policy.quiet_ms, policy.empty_grace_ms, policy.timeout_ms,
+        )
+    if not result['ready']:
+        metrics.count(f'not_ready_{page_type}')
+        if not result['found']:
+            raise PageNotReady(f"{page_type} page: container not found within {policy.timeout_ms} ms")
+        raise PageNotReady(
+            f"{page_type} page: still changing after {policy.timeout_ms} ms ({int(result['rows'])} rows so far)"
+        )
+    return int(result['rows'])
+
+
+# Non-blocking variant for pages loading in background tabs: each call takes one sample and
+# keeps the observer, the time of the first sample and of the last change on `window`, which
+# a new document or a page turn resets.
+# A document flagged by mark_stale() is the previous page still showing before the navigation commits.
+PROBE_READY_JS = """
+const containerXpath = arguments[0];
+const rowXpath = arguments[1];
+const minRows = arguments[2];
+const quietMs = arguments[3];
+const emptyGraceMs = arguments[4];
+const timeoutMs = arguments[5];
+
+if (window.__crawlStale) {
+    return {ready: false, timedOut: false, rows: 0, found: false};
+}
+const now = performance.now();
+let state = window.__crawlReadiness;
+if (!state) {
+    // Timed from the first sample, not from performance.now()'s origin: a results page
+    // turned to in the same document would otherwise inherit the age of the document
+    state = window.__crawlReadiness = {start: now, lastChange: now, observer: null, lastRequests: -1};
+}
+
+const container = document.evaluate(containerXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (container && !state.observer) {
+    state.observer = new MutationObserver(function () { state.lastChange = performance.now(); });
+    state.observer.observe(container, {childList: true, subtree: true, characterData: true});
+    state.lastChange = now;
+}
+const requests = performance.getEntriesByType('resource').length;
+if (requests !== state.lastRequests) {
+    state.lastRequests = requests;
+    state.lastChange = now;
+}
+
+let rows = 0;
+if (container && rowXpath) {
+    rows = document.evaluate('count(' + rowXpath + ')', container, null, XPathResult.NUMBER_TYPE, null).numberValue;
+}
+const quietFor = now - state.lastChange;
+let ready = false;
+if (container && document.readyState !== 'loading') {
+    ready = (rows >= minRows && quietFor >= quietMs) || (rows === 0 && quietFor >= emptyGraceMs);
+}
+if (ready && state.observer) {
+    state.observer.disconnect();
+}
+return {ready: ready, timedOut: !ready && now - state.start >= timeoutMs, rows: rows, found: !!container};
+"""
+
+
+def mark_stale(driver):
+    """Flag the document in the current tab as outdated before navigating it elsewhere."""
+    driver.execute_script('window.__crawlStale = true;')
+
+
+def probe_ready(driver, page_type):
+    """
+    Sample the page in the current tab once: returns the row count when it is ready,
+    None while it is still loading, and raises PageNotReady once its policy times out.
+    """
+    policy = READINESS_POLICIES[page_type]
+    result = driver.execute_script(
+        PROBE_READY_JS,
+        policy.container_xpath, policy.row_xpath, policy.min_rows,
+        policy.quiet_ms, policy.empty_grace_ms, policy.timeout_ms,
+    )
+    if result['ready']:
+        return int(result['rows'])
+    if result['timedOut']:
+        metrics.count(f'not_ready_{page_type}')
+        if not result['found']:
+            raise PageNotReady(f"{page_type} page: container not found within {policy.timeout_ms} ms")
+        raise PageNotReady(
+            f"{page_type} page: still changing after {policy.timeout_ms} ms ({int(result['rows'])} rows so far)"
+        )
+    return None
@@ -0,0 +1,44 @@
+from config.os_config import ROOT_DIR
+from config.scraper_config import CACHE_DIR, FRONTIER_PATH, PARQUET_BATCH_ROWS
+from frontier import CrawlFrontier
+from output import DEFAULT_OUTPUT_NAMES, OUTPUT_FORMATS, open_output
+from page_cache import PageCache
+from scraper import iter_cached_rows
+import argparse
+import os
+import time
+
+# Re-run row extraction over every cached year page without starting a browser,
+# e.g. after fixing a selector, and write the result as a fresh CSV or Parquet dataset.
+parser = argparse.ArgumentParser(description="Re-parse the raw page cache into a matches archive")
+parser.add_argument('--cache-dir', default=CACHE_DIR, help="Page cache written by main.py")
+parser.add_argument('--frontier-path', default=FRONTIER_PATH,
+                    help="Crawl frontier used to look up country and tournament names of each page")
+parser.add_argument('--output-format', choices=OUTPUT_FORMATS, default='csv', help="Output backend")
+parser.add_argument('--output', default=None,
+                    help="CSV file, Parquet directory or SQLite file to write (default: matches_replay.csv / "
+                         "matches_replay_parquet / matches_replay.db)")
+args = parser.parse_args()
+
+cache = PageCache(args.cache_dir)
+frontier = CrawlFrontier(args.frontier_path) if os.path.exists(args.frontier_path) else None
+output_path = args.output or os.path.join(
+    ROOT_DIR, DEFAULT_OUTPUT_NAMES[args.output_format].replace('matches', 'matches_replay')
+)
+output = open_output(args.output_format, output_path, batch_rows=PARQUET_BATCH_ROWS)
+
+start = time.perf_counter()
+pages = rows_written = 0
+
+try:
+    for _, rows in iter_cached_rows(cache, frontier):
+        output.write_rows(rows)
+        pages += 1
+        rows_written += len(rows)
+finally:
+    output.close()
+    cache.close()
+    if frontier is not None:
+        frontier.close()
+
+print(f"Replayed {pages} cached pages into {rows_written} rows in {time.perf_counter() - start:.2f}s: {output_path}")
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from metrics import metrics
+
+# Kinds of crawl units recorded in the dead-letter file
+COUNTRY = 'country'
+TOURNAMENT = 'tournament'
+YEAR_PAGE = 'year_page'
+EMPTY_ROWS = 'empty_rows'
+
+
+class RetryPolicy(NamedTuple):
+    """How often a failed unit is tried again and how long to wait in between."""
+    attempts: int
+    base_delay: float
+    max_delay: float
+
+    def delay(self, attempt):
+        """Exponential backoff with full jitter before the attempt after `attempt`."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class EmptyRows(Exception):
+    """Rows whose every field came back 'N/A', usually from a page that had not rendered."""
+
+
+class RetriesExhausted(Exception):
+    """A unit kept failing; `error` is the exception of its last attempt."""
+
+    def __init__(self, description, error, attempts):
+        super().__init__(f"{description} failed {attempts} times, last error {type(error).__name__}: {error}")
+        self.error = error
+        self.attempts = attempts
+
+
+def call_with_retries(func, policy, description):
+    """
+    Call `func()` until it succeeds or the policy runs out of attempts, sleeping with
+    backoff in between. Only the calling thread waits, so other workers keep going.
+    """
+    for attempt in range(1, policy.attempts + 1):
+        try:
+            return func()
+        except Exception as e:
+            if attempt == policy.attempts:
+                raise RetriesExhausted(description, e, attempt) from e
+            delay = policy.delay(attempt)
+            metrics.count('retries')
+            logging.info(f"Attempt {attempt} of {description} failed ({type(e).__name__}: {e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def error_details(error):
+    """Return (error_class, message, attempts) of an exception, unwrapping RetriesExhausted."""
+    if isinstance(error, RetriesExhausted):
+        return type(error.error).__name__, str(error.error), error.attempts
+    return type(error).__name__, str(error), 1
+
+
+class DeadLetters:
+    """
+    JSON Lines file of crawl units that still failed after their retries, one object per
+    unit with its kind, URL, error class and enough context to retry it on its own with
+    `main.py --retry-dead-letters`. Appended to from any thread.
+
+    With `replace`, the run retries the units of `path` itself: its failures go to a side
+    file that commit() moves over `path` once the run has finished, so the units not
+    retried yet are kept when it stops early.
+    """
+
+    def __init__(self, path, fresh=False, replace=False):
+        self.path = path
+        self.write_path = f'{path}.retry' if replace else path
+        self.lock = threading.Lock()
+        self.recorded = 0
+        # A side file left by a retry run that stopped early is outdated, the original is not
+        if (fresh or replace) and os.path.exists(self.write_path):
+            os.remove(self.write_path)
+
+    def add(self, kind, url, error, **context):
+        error_class, message, attempts = error_details(error)
+        record = {
+            'kind': kind,
+            'url': url,
+            'error_class': error_class,
+            'error': message,
+            'attempts': attempts,
+            'failed_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            **context,
+        }
+        with self.lock:
+            with open(self.write_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+            self.recorded += 1
+        metrics.count(f'dead_letters_{kind}')
+
+    def commit(self):
+        """Replace the retried file with the failures of this run (none left: no file)."""
+        if self.write_path == self.path:
+            return
+        with self.lock:
+            if os.path.exists(self.write_path):
+                os.replace(self.write_path, self.path)
+            elif os.path.exists(self.path):
+                os.remove(self.path)
+
+    @staticmethod
+    def load(path):
+        """Read the records of a dead-letter file, skipping a truncated last line."""
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logging.warning(f"Skipping unreadable dead-letter line: {line.strip()[:200]}")
+        return records
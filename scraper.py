@@ -0,0 +1,218 @@
+from typing import NamedTuple, Optional
+
+from driver_caller import record_page_weight
+from metrics import metrics
+from rate_limiter import rate_limiter
+from pagination import read_page_count, turn_page
+from readiness import wait_until_ready
+from extractor import (
+    MATCHES_CONTAINER_XPATH, extract_page_meta, extract_rows, extract_rows_from_html, page_count_from_html,
+    season_page_url, year_from_url
+)
+import hashlib
+import time
+from urllib.parse import urljoin
+
+
+class YearJob(NamedTuple):
+    """A single season page to scrape, with the names read from its tournament page."""
+    country_name: str
+    tournament_name: str
+    tournament_url: str
+    year_url: str
+
+
+def is_current_season(year_url):
+    return year_from_url(year_url) == 'Current'
+
+
+def match_key(row):
+    """
+    Identify a match independently of the year URL it was scraped from, so a match
+    read from the current-season page and later from its finished season is stored once.
+    """
+    fields = [row['country'], row['tournament'], row['date'], row['time'], row['player1'], row['player2']]
+    return hashlib.sha1('\x1f'.join(fields).encode('utf-8')).hexdigest()
+
+
+def tag_rows(rows, job):
+    """Add the country, tournament and year of the page the rows were read from, and make match URLs absolute."""
+    year = year_from_url(job.year_url)
+    for row in rows:
+        row['country'] = job.country_name
+        row['tournament'] = job.tournament_name
+        row['year'] = year
+        if row.get('match_url'):
+            row['match_url'] = urljoin(job.year_url, row['match_url'])
+    return rows
+
+
+class FetchedPage(NamedTuple):
+    """
+    A loaded results page of a season: either the rendered HTML still to be parsed, or rows
+    already read in the browser. Seasons split over several pages yield one per page.
+    """
+    job: YearJob
+    html: Optional[str]
+    rows: Optional[list]
+    fetch_seconds: float
+    page_number: int = 1
+    page_count: int = 1
+
+
+def fetch_year_http(job, http, cache=None):
+    """
+    Try to fetch a year page over plain HTTP. Returns None when the page has to be
+    loaded in the browser instead.
+    """
+    # Only imported with an HttpFetcher in use, which has loaded requests already
+    from fetcher import NeedsBrowser
+
+    start = time.perf_counter()
+    try:
+        html = http.fetch(job.year_url)
+    except NeedsBrowser:
+        return None
+    # Further pages are only switched to by the site's scripts, so a paginated season goes to the browser
+    if page_count_from_html(html) > 1:
+        metrics.count('http_paginated_fallbacks')
+        return None
+    if cache is not None:
+        cache.put(job.year_url, html)
+    return FetchedPage(job, html, None, time.perf_counter() - start)
+
+
+def fetch_year(driver, job, engine='snapshot', cache=None, http=None):
+    """
+    Load a year page and wait until it is ready. The 'snapshot' engine only takes the HTML,
+    leaving the parsing to parse_year; the browser-side engines extract their rows here.
+    With a PageCache the rendered page_source is stored so it can be re-parsed offline later.
+    With an HttpFetcher the page is first requested over plain HTTP, and only loaded in
+    the browser when that response cannot be used.
+    """
+    if http is not None:
+        page = fetch_year_http(job, http, cache)
+        if page is not None:
+            return page
+
+    start = time.perf_counter()
+    with rate_limiter.slot(job.year_url):
+        with metrics.timer('year_page_load'):
+            driver.get(job.year_url)
+
+        # Wait until the match list has stopped changing, rather than reading a half-rendered season
+        wait_until_ready(driver, 'season')
+    record_page_weight(driver)
+
+    return snapshot_page(driver, job, engine, cache, start)
+
+
+def snapshot_page(driver, job, engine, cache, start, page_number=1, page_count=1):
+    """Read a loaded, ready results page from the browser (the current tab) into a FetchedPage."""
+    from selenium.webdriver.common.by import By
+
+    with metrics.timer(f'fetch_{engine}'):
+        html = rows = None
+        if cache is not None:
+            html = driver.page_source
+            cache.put(season_page_url(job.year_url, page_number), html)
+        if engine == 'snapshot':
+            if html is None:
+                html = driver.find_element(By.XPATH, MATCHES_CONTAINER_XPATH).get_attribute('outerHTML')
+        else:
+            matches_container = driver.find_element(By.XPATH, MATCHES_CONTAINER_XPATH)
+            rows = extract_rows(matches_container, engine)
+            html = None
+
+    return FetchedPage(job, html, rows, time.perf_counter() - start, page_number, page_count)
+
+
+def fetch_season(driver, job, engine='snapshot', cache=None, http=None):
+    """
+    Yield a FetchedPage for every results page of a season. Page 1 is fetched like any year
+    page; when the season is split over more pages, the switch to the next page is started
+    before the current one is handed out, so the next page loads while the caller extracts
+    the current one. The next page holds its rate-limiter slot from the switch until it is
+    ready, but the time the caller spends on the current page is not counted as its latency.
+    """
+    if http is not None:
+        page = fetch_year_http(job, http, cache)
+        if page is not None:
+            yield page
+            return
+
+    page = fetch_year(driver, job, engine, cache)
+    page = page._replace(page_count=read_page_count(driver))
+    for number in range(2, page.page_count + 1):
+        request = rate_limiter.acquire(job.year_url)
+        start = time.perf_counter()
+        failed = True
+        try:
+            turn_page(driver, job.year_url, number)
+            handed_out = time.perf_counter()
+            try:
+                yield page
+            except GeneratorExit:
+                # The caller stopped early, which says nothing about the host
+                failed = False
+                raise
+            # Time the caller spent on the previous page is not part of this page's load
+            caller_seconds = time.perf_counter() - handed_out
+            start += caller_seconds
+            request.exclude(caller_seconds)
+            wait_until_ready(driver, 'season_page')
+            failed = False
+        finally:
+            rate_limiter.release(request, failed)
+        page = snapshot_page(driver, job, engine, cache, start, number, page.page_count)
+    yield page
+
+
+def parse_year(page):
+    """Return the match rows of a fetched page, tagged with country, tournament and year."""
+    start = time.perf_counter()
+    rows = page.rows
+    if rows is None:
+        with metrics.timer('extract_snapshot'):
+            rows = extract_rows_from_html(page.html)
+
+    metrics.count('results_pages')
+    if page.page_number == 1:
+        metrics.count('year_pages')
+    metrics.record_tournament(
+        page.job.tournament_name, len(rows), page.fetch_seconds + time.perf_counter() - start
+    )
+    return tag_rows(rows, page.job)
+
+
+def iter_cached_rows(cache, frontier=None):
+    """
+    Re-parse every page of a PageCache offline and yield (page_url, rows), with each match
+    only once even when several cached pages list it. Pages that cannot be parsed are
+    reported and skipped.
+    """
+    seen_keys = set()
+    for page_url, _, digest in cache.latest_pages():
+        # Further results pages of a season are cached under the season URL plus a #/page/N/ fragment
+        year_url = page_url.split('#')[0]
+        try:
+            html = cache.read_object(digest)
+
+            # Prefer the names the crawl read from the tournament page, fall back to the cached page itself
+            known_page = frontier.year_page(year_url) if frontier is not None else None
+            if known_page is not None:
+                job = YearJob(*known_page)
+            else:
+                country_name, tournament_name = extract_page_meta(html)
+                job = YearJob(country_name, tournament_name, year_url, year_url)
+
+            rows = []
+            for row in tag_rows(extract_rows_from_html(html), job):
+                key = match_key(row)
+                if key not in seen_keys:
+                    seen_keys.add(key)
+                    rows.append(row)
+        except Exception as e:
+            print(f"Failed to replay {page_url}: {e}")
+            continue
+        yield page_url, rows
@@ -0,0 +1,31 @@
+import hashlib
+import os
+from urllib.parse import urlsplit
+
+
+def shard_of(tournament_url, shard_count):
+    """
+    Shard number of a tournament. Only the URL path is hashed, so http/https, the host
+    name and a missing '/results/' suffix do not move a tournament to another shard.
+    """
+    path = urlsplit(tournament_url).path.rstrip('/')
+    if path.endswith('/results'):
+        path = path[:-len('/results')]
+    digest = hashlib.sha1(path.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+def in_shard(tournament_url, shard_index, shard_count):
+    return shard_count <= 1 or shard_of(tournament_url, shard_count) == shard_index
+
+
+def shard_label(shard_index, shard_count):
+    return f'shard-{shard_index}-of-{shard_count}'
+
+
+def shard_path(path, shard_index, shard_count):
+    """Per-shard variant of a file or directory path, e.g. matches.csv -> matches.shard-0-of-4.csv."""
+    if shard_count <= 1:
+        return path
+    root, ext = os.path.splitext(str(path))
+    return f'{root}.{shard_label(shard_index, shard_count)}{ext}'
@@ -0,0 +1,129 @@
+import time
+
+from driver_caller import record_page_weight
+from metrics import metrics
+from pagination import read_page_count, turn_page
+from rate_limiter import rate_limiter
+from readiness import READINESS_POLICIES, PageNotReady, mark_stale, probe_ready
+from scraper import snapshot_page
+
+# Extra time on top of the season readiness timeout before a tab is given up from Python,
+# e.g. when its navigation never commits and the page-side timeout cannot fire
+TAB_DEADLINE_SLACK_SECONDS = 10
+
+
+class Tab:
+    def __init__(self, handle):
+        self.handle = handle
+        self.job = None
+        self.attempt = 0
+        self.page_number = 1
+        self.page_count = 1
+        self.request = None
+        self.started = None
+
+
+class TabBrowser:
+    """
+    Keeps several year pages loading at once in the tabs of a single browser. The driver
+    must use the 'none' page load strategy so driver.get() returns as soon as a navigation
+    starts; poll() then visits the loading tabs in turn and reads every page that has become
+    ready, so one slow page no longer holds up the others. A tab walks every results page
+    of its season: as soon as a page is read it switches to the next one and stays busy.
+    Used by one thread only.
+    """
+
+    def __init__(self, driver, tabs, engine='snapshot', cache=None):
+        self.driver = driver
+        self.engine = engine
+        self.cache = cache
+        policy = READINESS_POLICIES['season']
+        self.deadline_seconds = policy.timeout_ms / 1000 + TAB_DEADLINE_SLACK_SECONDS
+        handles = [driver.current_window_handle]
+        for _ in range(tabs - 1):
+            driver.switch_to.new_window('tab')
+            handles.append(driver.current_window_handle)
+        self.idle = [Tab(handle) for handle in handles]
+        self.busy = []
+        self.current = driver.current_window_handle
+
+    def _switch(self, tab):
+        if self.current != tab.handle:
+            self.driver.switch_to.window(tab.handle)
+            self.current = tab.handle
+
+    def start(self, job, attempt=1):
+        """Start loading `job` in an idle tab; returns False when the rate limiter has no slot free yet."""
+        request = rate_limiter.acquire(job.year_url, block=False)
+        if request is None:
+            return False
+        tab = self.idle.pop()
+        tab.job = job
+        tab.attempt = attempt
+        tab.page_number = tab.page_count = 1
+        tab.request = request
+        tab.started = time.perf_counter()
+        try:
+            self._switch(tab)
+            mark_stale(self.driver)
+            with metrics.timer('year_page_load'):
+                self.driver.get(job.year_url)
+        except Exception:
+            self._finish(tab, failed=True)
+            self.idle.append(tab)
+            raise
+        self.busy.append(tab)
+        metrics.set_gauge('tabs_loading', len(self.busy))
+        return True
+
+    def _turn(self, tab):
+        # The next page of a season is a request of its own; without a free slot the tab waits
+        request = rate_limiter.acquire(tab.job.year_url, block=False)
+        if request is None:
+            return False
+        tab.request = request
+        tab.started = time.perf_counter()
+        turn_page(self.driver, tab.job.year_url, tab.page_number)
+        return True
+
+    def poll(self):
+        """
+        Check every loading tab once. Returns (job, attempt, page, error) for each results
+        page read and each failed season; a tab is idle again once its season is done or failed.
+        """
+        finished = []
+        for tab in list(self.busy):
+            try:
+                self._switch(tab)
+                if tab.request is None:
+                    self._turn(tab)
+                    continue
+                if probe_ready(self.driver, 'season' if tab.page_number == 1 else 'season_page') is None:
+                    if time.perf_counter() - tab.started > self.deadline_seconds:
+                        raise PageNotReady(f"season page: no response within {self.deadline_seconds:.0f} s")
+                    continue
+                self._finish(tab, failed=False)
+                if tab.page_number == 1:
+                    record_page_weight(self.driver)
+                    tab.page_count = read_page_count(self.driver)
+                page = snapshot_page(
+                    self.driver, tab.job, self.engine, self.cache, tab.started, tab.page_number, tab.page_count
+                )
+                finished.append((tab.job, tab.attempt, page, None))
+                if tab.page_number < tab.page_count:
+                    tab.page_number += 1
+                    self._turn(tab)
+                    continue
+            except Exception as e:
+                if tab.request is not None:
+                    self._finish(tab, failed=True)
+                finished.append((tab.job, tab.attempt, None, e))
+            self.busy.remove(tab)
+            self.idle.append(tab)
+        metrics.set_gauge('tabs_loading', len(self.busy))
+        return finished
+
+    def _finish(self, tab, failed):
+        rate_limiter.release(tab.request, failed)
+        tab.request = None
+        metrics.observe('tab_load', time.perf_counter() - tab.started)
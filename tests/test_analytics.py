@@ -0,0 +1,102 @@
+import math
+
+import pandas as pd
+import pytest
+
+from analytics import add_metrics, iter_frames, summarize
+from archive import MatchArchive
+from output import CsvOutput, ParquetOutput
+
+
+def row(tournament, date, player1, player2, score, odds1, odds2, year='2023'):
+    return {'country': 'USA', 'tournament': tournament, 'year': year, 'date': date, 'time': '12:00',
+            'player1': player1, 'player2': player2, 'score': score, 'odds1': odds1, 'odds2': odds2}
+
+
+ROWS = [
+    # Favourite A wins at 1.5
+    row('Open', '20230105', 'A', 'B', '2 0', '1.5', '2.5'),
+    # Favourite C (player 2) loses, underdog B wins at 3.0
+    row('Open', '20230106', 'B', 'C', '2 1', '3.0', '1.4'),
+    # Retired without sets: no winner
+    row('Open', '20230107', 'A', 'C', 'ret.', '1.8', '2.0'),
+    # No odds listed
+    row('Cup', '20230108', 'A', 'B', '0 2', 'N/A', 'N/A'),
+    row('Cup', 'N/A', 'C', 'B', '2 0', '1.9', '1.9'),
+]
+
+
+def write_archive(tmp_path, output_format, rows=ROWS):
+    if output_format == 'csv':
+        path = tmp_path / 'matches.csv'
+        output = CsvOutput(path)
+    elif output_format == 'parquet':
+        path = tmp_path / 'matches_parquet'
+        output = ParquetOutput(path)
+    else:
+        path = tmp_path / 'matches.db'
+        output = MatchArchive(path)
+    output.write_rows(rows)
+    output.close()
+    return path
+
+
+def test_metrics_of_single_matches():
+    frame = add_metrics(pd.DataFrame({
+        'score': ['2 0', '2 1', 'ret.', '0 2', '2 0'],
+        'odds1': [1.5, 3.0, 1.8, float('nan'), 1.9],
+        'odds2': [2.5, 1.4, 2.0, float('nan'), 1.9],
+    }))
+    assert frame['winner'].tolist() == [1, 1, 0, 2, 1]
+    assert frame['favourite'].tolist() == [1, 2, 1, 0, 0]
+    assert frame['favourite_won'].tolist() == [True, False, False, False, False]
+    assert frame['margin'][0] == pytest.approx(1 / 1.5 + 1 / 2.5 - 1)
+    assert frame['favourite_profit'][:2].tolist() == pytest.approx([0.5, -1.0])
+    assert frame['underdog_profit'][:2].tolist() == pytest.approx([-1.0, 2.0])
+    assert math.isnan(frame['favourite_profit'][2])
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet', 'sqlite'])
+def test_season_summary(tmp_path, output_format):
+    summary = summarize(output_format, write_archive(tmp_path, output_format), by='tournament')
+    open_ = summary.loc[('USA', 'Open')]
+    assert open_['matches'] == 3
+    assert open_['priced'] == 3
+    assert open_['favourite_win_rate'] == pytest.approx(0.5)
+    assert open_['favourite_roi'] == pytest.approx((0.5 - 1.0) / 2)
+    assert open_['underdog_roi'] == pytest.approx((-1.0 + 2.0) / 2)
+    cup = summary.loc[('USA', 'Cup')]
+    assert cup['matches'] == 2
+    assert cup['priced'] == 1
+    assert math.isnan(cup['favourite_win_rate'])
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet', 'sqlite'])
+def test_chunked_aggregation_matches_a_single_chunk(tmp_path, output_format):
+    rows = [
+        row(f'T{n % 7}', f'2023{n % 12 + 1:02d}{n % 28 + 1:02d}', f'P{n % 11}', f'P{n % 13 + 11}',
+            f'{2 - n % 3 // 2} {n % 3 // 2 * 2}', f'{1.1 + n % 9 / 10:.2f}', f'{1.2 + n % 5 / 4:.2f}',
+            year=str(2020 + n % 3))
+        for n in range(500)
+    ]
+    path = write_archive(tmp_path, output_format, rows)
+    assert max(len(frame) for frame in iter_frames(output_format, path, chunk_rows=64)) <= 128
+    for by in ('tournament', 'year', 'player'):
+        whole = summarize(output_format, path, by=by, chunk_rows=10000).sort_index()
+        chunked = summarize(output_format, path, by=by, chunk_rows=64).sort_index()
+        pd.testing.assert_frame_equal(whole, chunked, check_exact=False)
+
+
+def test_player_summary(tmp_path):
+    summary = summarize('csv', write_archive(tmp_path, 'csv'), by='player')
+    assert summary.loc['A', 'matches'] == 3
+    # A won the first match and lost the Cup match; the retirement is undecided
+    assert summary.loc['A', 'win_rate'] == pytest.approx(0.5)
+    # Only the priced, decided first match counts as a bet, won at 1.5
+    assert summary.loc['A', 'roi'] == pytest.approx(0.5)
+    # B won as player 1, as player 2 and lost to C
+    assert summary.loc['B', 'wins'] == 2
+
+
+def test_empty_archive(tmp_path):
+    assert summarize('csv', write_archive(tmp_path, 'csv', rows=[])).empty
@@ -0,0 +1,92 @@
+from urllib.parse import urlsplit
+
+import api
+import scraper
+from benchmark.fixture_site import FixtureSite
+from page_cache import PageCache
+from rate_limiter import AdaptiveRateLimiter
+
+BASE_URL = 'http://fixture.test'
+
+
+class FixtureElement:
+    def __init__(self, outer_html):
+        self.outer_html = outer_html
+
+    def get_attribute(self, name):
+        assert name == 'outerHTML'
+        return self.outer_html
+
+
+class FixtureDriver:
+    """Stands in for Chrome on the fixture site; turn_page only changes the rows of the matches container."""
+
+    def __init__(self, site):
+        self.site = site
+        self.path = None
+        self.page = 1
+
+    def get(self, url):
+        self.path = urlsplit(url).path
+        self.page = 1
+
+    @property
+    def page_source(self):
+        return self.site.render(BASE_URL, self.path)
+
+    def find_element(self, by, xpath):
+        rows = self.site.render(BASE_URL, self.path, self.page)
+        return FixtureElement(f'<div class="flex flex-col px-3 text-sm max-mm:px-0">{rows}</div>')
+
+    def execute_script(self, script):
+        raise RuntimeError("no page timing in the fixture driver")
+
+    def quit(self):
+        pass
+
+
+def fixture_scraper(monkeypatch, site):
+    driver = FixtureDriver(site)
+    monkeypatch.setattr(api.Scraper, '_start_browser', lambda self: driver)
+    monkeypatch.setattr(api.Scraper, '_open_results_page', lambda self, driver: None)
+    monkeypatch.setattr(scraper, 'rate_limiter', AdaptiveRateLimiter(initial_rate=1e9, max_rate=1e9))
+    monkeypatch.setattr(scraper, 'wait_until_ready', lambda driver, page_type: None)
+    monkeypatch.setattr(scraper, 'read_page_count', lambda driver: site.page_count())
+    monkeypatch.setattr(scraper, 'turn_page', lambda driver, year_url, number: setattr(driver, 'page', number))
+    return api.Scraper(results_url=f'{BASE_URL}/tennis/results/', engine='snapshot', fetch_mode='browser')
+
+
+def test_iter_matches_reads_the_names_from_the_whole_page_of_a_snapshot(monkeypatch):
+    site = FixtureSite(countries=1, tournaments=2, years=2, rows=12)
+    with fixture_scraper(monkeypatch, site) as matches_scraper:
+        matches = list(matches_scraper.iter_matches(f'{BASE_URL}/tennis/country-1/tournament-2-2023/results/'))
+
+    assert len(matches) == site.rows
+    assert {(m.country, m.tournament, m.season) for m in matches} == {('Country 1', 'Tournament 1.2', '2023')}
+
+
+def test_iter_matches_reads_every_results_page(monkeypatch):
+    site = FixtureSite(countries=1, tournaments=1, years=1, rows=23, rows_per_page=10)
+    with fixture_scraper(monkeypatch, site) as matches_scraper:
+        matches = list(matches_scraper.iter_matches(f'{BASE_URL}/tennis/country-1/tournament-1/results/'))
+
+    assert len(matches) == site.rows
+    assert {(m.country, m.tournament) for m in matches} == {('Country 1', 'Tournament 1.1')}
+    assert all(m.date is not None and m.odds1 is not None for m in matches)
+
+
+def test_iter_cached_matches_lists_each_cached_match_once(tmp_path):
+    site = FixtureSite(countries=1, tournaments=1, years=1, rows=12)
+    year_url = f'{BASE_URL}/tennis/country-1/tournament-1-2023/results/'
+    cache = PageCache(tmp_path / 'cache')
+    try:
+        html = site.render(BASE_URL, urlsplit(year_url).path)
+        cache.put(year_url, html, fetched_at=1)
+        cache.put(f'{year_url}#/page/1/', html, fetched_at=2)
+        cache.put(f'{BASE_URL}/tennis/country-1/tournament-1/results/', '<html><h1>Empty</h1></html>', fetched_at=3)
+    finally:
+        cache.close()
+
+    matches = list(api.iter_cached_matches(tmp_path / 'cache', tmp_path / 'frontier.db'))
+    assert len(matches) == site.rows
+    assert {(m.country, m.tournament, m.season) for m in matches} == {('Country 1', 'Tournament 1.1', '2023')}
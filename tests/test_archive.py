@@ -0,0 +1,72 @@
+import pytest
+
+from archive import MatchArchive
+
+
+def row(year, score='', odds1='N/A', odds2='N/A', player1='Sinner', player2='Medvedev', date='20240128'):
+    return {'country': 'Australia', 'tournament': 'Australian Open', 'year': year, 'date': date,
+            'time': '09:30', 'player1': player1, 'player2': player2, 'score': score, 'odds1': odds1,
+            'odds2': odds2}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = MatchArchive(tmp_path / 'matches.db')
+    yield archive
+    archive.close()
+
+
+def write(archive, rows):
+    archive.write_rows(rows)
+    archive.flush(force=True)
+
+
+def test_rescraped_match_is_upserted_with_its_season(archive):
+    # First read from the current season page, before it was played
+    write(archive, [row('Current', odds1='1.4', odds2='3.0')])
+    assert len(archive.tournament_season('Australian Open', 'Current')) == 1
+
+    # Read again from the finished season page
+    write(archive, [row('2024', score='3 2', odds1='1.35')])
+    assert archive.counts()['matches'] == 1
+    assert archive.tournament_season('Australian Open', 'Current') == []
+    [match] = archive.tournament_season('Australian Open', '2024', country='australia')
+    assert (match['score'], match['odds1'], match['odds2']) == ('3 2', 1.35, 3.0)
+
+    # A later incremental run that still sees it on the current page keeps the season
+    write(archive, [row('Current', score='3 2')])
+    assert len(archive.tournament_season('Australian Open', '2024')) == 1
+
+
+def test_lookups(archive):
+    write(archive, [
+        row('2024', score='3 2', odds1='1.35', odds2='3.2'),
+        row('2024', player1='Medvedev', player2='Zverev', date='20240126'),
+        row('2023', player1='Djokovic', player2='Sinner', date='20230127'),
+    ])
+    assert [m['date'] for m in archive.player_matches('sinner')] == ['2023-01-27', '2024-01-28']
+    assert [m['date'] for m in archive.player_matches('Sinner', since='2024-01-01')] == ['2024-01-28']
+    assert len(archive.head_to_head('Medvedev', 'Sinner')) == 1
+    assert archive.find_players('vedev') == [(archive.player_id('Medvedev'), 'Medvedev')]
+    with pytest.raises(LookupError):
+        archive.player_id('Federer')
+    with pytest.raises(LookupError):
+        # Matches Medvedev and Zverev
+        archive.player_id('ev')
+
+
+def test_rows_round_trip_in_crawler_shape(archive):
+    written = row('2024', score='3 2', odds1='1.35')
+    write(archive, [written])
+    assert list(archive.iter_rows()) == [written]
+
+
+def test_opening_without_append_empties_the_archive(tmp_path):
+    archive = MatchArchive(tmp_path / 'matches.db')
+    write(archive, [row('2024')])
+    archive.close()
+    archive = MatchArchive(tmp_path / 'matches.db', append=False)
+    try:
+        assert archive.counts() == {'matches': 0, 'players': 0, 'tournaments': 0, 'countries': 0}
+    finally:
+        archive.close()
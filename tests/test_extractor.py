@@ -0,0 +1,118 @@
+import pytest
+from lxml import html as lxml_html
+
+from benchmark.fixture_site import FixtureSite
+from extractor import _is_hidden, extract_page_meta, extract_rows_from_html, page_count_from_html
+
+BASE_URL = 'http://fixture.test'
+SCORE = '<div class="font-bold">2</div><div class="hidden">&ndash;</div><div class="font-bold">0</div>'
+
+
+def event_row(date_header='', time='12:30', players=('Nadal', 'Federer'), score='', odds=('1.50', '2.60')):
+    header = f'<div class="text-black-main font-main w-full">{date_header}</div>' if date_header else ''
+    links = ''.join(
+        f'<a title="{player}" href="/tennis/usa/us-open/nadal-federer-{i}/">'
+        f'<p class="participant-name truncate">{player}</p></a>'
+        for i, player in enumerate(players)
+    )
+    odds_cells = ''.join(f'<div data-testid="add-to-coupon-button"><p>{value}</p></div>' for value in odds)
+    return (
+        f'<div class="eventRow flex w-full flex-col text-xs">{header}'
+        f'<div class="flex w-full items-center"><p>{time}</p><div class="participants">{links}</div>'
+        f'<div class="flex gap-1 font-bold">{score}</div>{odds_cells}</div></div>'
+    )
+
+
+def container(*rows):
+    return f'<div class="flex flex-col px-3 text-sm max-mm:px-0">{"".join(rows)}</div>'
+
+
+def test_rows_carry_the_date_header_forward():
+    rows = extract_rows_from_html(container(
+        event_row(time='10:00'),
+        event_row('14 Oct 2024', time='11:00', score=SCORE),
+        event_row(time='12:00', score=SCORE),
+        event_row('15 Oct 2024', time='13:00', score=SCORE),
+    ))
+
+    # A row above the first date header has no date to inherit
+    assert [(row['date'], row['time']) for row in rows] == [
+        ('N/A', '10:00'), ('20241014', '11:00'), ('20241014', '12:00'), ('20241015', '13:00'),
+    ]
+
+
+def test_a_full_row_is_read_without_its_hidden_parts():
+    [row] = extract_rows_from_html(container(event_row('14 Oct 2024', score=SCORE)))
+
+    assert row == {
+        'date': '20241014', 'time': '12:30', 'player1': 'Nadal', 'player2': 'Federer', 'score': '2 0',
+        'odds1': '1.50', 'odds2': '2.60', 'match_url': '/tennis/usa/us-open/nadal-federer-0/',
+    }
+
+
+def test_missing_fields_fall_back_to_na():
+    hidden_score = '<div class="hidden"><div class="font-bold">2</div><div class="font-bold">1</div></div>'
+    [hidden, bare] = extract_rows_from_html(container(
+        event_row('14 Oct 2024', score=hidden_score, odds=('1.50',)),
+        '<div class="eventRow flex w-full flex-col text-xs"></div>',
+    ))
+
+    assert (hidden['score'], hidden['odds1'], hidden['odds2']) == ('N/A', 'N/A', 'N/A')
+    assert bare == {
+        'date': '20241014', 'time': 'N/A', 'player1': 'N/A', 'player2': 'N/A', 'score': 'N/A',
+        'odds1': 'N/A', 'odds2': 'N/A', 'match_url': None,
+    }
+
+
+def test_responsive_classes_show_a_hidden_element():
+    score = '<div class="font-bold">2</div><div class="hidden md:flex">:</div><div class="font-bold">1</div>'
+    [row] = extract_rows_from_html(container(event_row('14 Oct 2024', score=score)))
+
+    assert row['score'] == '2 : 1'
+
+
+@pytest.mark.parametrize('markup, hidden', [
+    ('<div><p id="target">x</p></div>', False),
+    ('<div class="hidden"><p id="target">x</p></div>', True),
+    ('<div class="hidden lg:block"><p id="target">x</p></div>', False),
+    # A class that only looks responsive does not make the element visible
+    ('<div class="hidden lg:text-sm"><p id="target">x</p></div>', True),
+    ('<div style="display: none"><p id="target">x</p></div>', True),
+    ('<div class="hidden-xs"><p id="target">x</p></div>', False),
+])
+def test_is_hidden(markup, hidden):
+    target = lxml_html.fromstring(markup).xpath('//*[@id="target"]')[0]
+    assert _is_hidden(target) is hidden
+
+
+def test_fixture_season_page_is_read_whole():
+    site = FixtureSite(rows=12)
+    page = site.season_page(BASE_URL, 'country-2', 'tournament-3', '2022')
+
+    rows = extract_rows_from_html(page)
+    assert len(rows) == site.rows
+    assert all(row['date'].startswith('2022') and row['odds1'] != 'N/A' and row['score'] in ('2 0', '2 1')
+               for row in rows)
+    # The matches container alone gives the same rows as the whole page
+    assert extract_rows_from_html(container(site.event_rows(BASE_URL, 'country-2', 'tournament-3', '2022'))) == rows
+
+
+def test_a_page_without_matches_container_is_rejected():
+    with pytest.raises(LookupError):
+        extract_rows_from_html('<html><body><h1>Not found</h1></body></html>')
+
+
+def test_extract_page_meta():
+    site = FixtureSite()
+    page = site.season_page(BASE_URL, 'country-2', 'tournament-3', 'Current')
+
+    assert extract_page_meta(page) == ('Country 2', 'Tournament 2.3')
+    assert extract_page_meta('<html><body><p>Maintenance</p></body></html>') == ('N/A', 'N/A')
+
+
+def test_page_count_from_html():
+    paginated = FixtureSite(rows=23, rows_per_page=10)
+    single = FixtureSite(rows=23)
+
+    assert page_count_from_html(paginated.season_page(BASE_URL, 'country-1', 'tournament-1', 'Current')) == 3
+    assert page_count_from_html(single.season_page(BASE_URL, 'country-1', 'tournament-1', 'Current')) == 1
@@ -0,0 +1,96 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import fetcher
+from benchmark.fixture_site import FixtureHandler, FixtureSite
+from fetcher import HttpFetcher, NeedsBrowser
+from rate_limiter import AdaptiveRateLimiter
+
+SEASON_PATH = '/tennis/country-1/tournament-1-2023/results/'
+
+# Pages the fixture site does not have: what the real site serves to a client it does not trust
+SPECIAL_PAGES = {
+    '/js-rendered/': '<html><body><div id="app"></div><script src="/static/app.js"></script></body></html>',
+    '/empty-list/': '<html><body><div class="flex flex-col px-3 text-sm max-mm:px-0"></div></body></html>',
+    '/challenge/': '<html><head><title>Just a moment...</title></head><body></body></html>',
+}
+
+
+class CheckingHandler(FixtureHandler):
+    site = FixtureSite(countries=1, tournaments=1, years=1, rows=10)
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        if self.path.startswith('/status/'):
+            self.send_error(int(self.path.split('/')[2]))
+        elif self.path in SPECIAL_PAGES:
+            self._send(SPECIAL_PAGES[self.path].encode('utf-8'), 'text/html; charset=utf-8')
+        else:
+            super().do_GET()
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CheckingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def http(monkeypatch):
+    monkeypatch.setattr(fetcher, 'rate_limiter', AdaptiveRateLimiter(initial_rate=1e9, max_rate=1e9))
+    http = HttpFetcher(pool_size=2, timeout=5, max_fallbacks=2)
+    yield http
+    http.close()
+
+
+def test_a_static_season_page_is_accepted(base_url, http):
+    page = http.fetch(base_url + SEASON_PATH)
+
+    assert page.count('eventRow') == CheckingHandler.site.rows
+    assert (http.succeeded, http.consecutive_fallbacks) == (1, 0)
+
+
+@pytest.mark.parametrize('path', ['/js-rendered/', '/empty-list/', '/challenge/', '/status/403', '/status/429'])
+def test_pages_that_need_a_browser(base_url, http, path):
+    with pytest.raises(NeedsBrowser):
+        http.fetch(base_url + path)
+    assert http.consecutive_fallbacks == 1
+
+
+def test_a_challenge_slows_the_host_down(base_url, http):
+    limiter = fetcher.rate_limiter
+    with pytest.raises(NeedsBrowser):
+        http.fetch(base_url + '/status/429')
+
+    [limits] = limiter.limits().values()
+    assert limits['rate'] < 1e9
+
+
+def test_http_is_given_up_after_consecutive_fallbacks(base_url, http):
+    for path in ('/challenge/', '/status/403'):
+        with pytest.raises(NeedsBrowser):
+            http.fetch(base_url + path)
+    assert http.disabled
+
+    CheckingHandler.paths.clear()
+    with pytest.raises(NeedsBrowser, match='disabled'):
+        http.fetch(base_url + SEASON_PATH)
+    # The page is not even requested any more
+    assert CheckingHandler.paths == []
+
+
+def test_a_working_session_is_not_given_up(base_url, http):
+    http.fetch(base_url + SEASON_PATH)
+    for path in ('/challenge/', '/status/403', '/js-rendered/'):
+        with pytest.raises(NeedsBrowser):
+            http.fetch(base_url + path)
+
+    assert not http.disabled
+    assert http.fetch(base_url + SEASON_PATH)
@@ -0,0 +1,73 @@
+from frontier import DONE, FAILED, PENDING, CrawlFrontier
+from scraper import YearJob
+
+
+def job(year):
+    return YearJob('USA', 'US Open', 'https://x/tennis/usa/us-open/results/',
+                   f'https://x/tennis/usa/us-open-{year}/results/')
+
+
+def test_progress_survives_a_restart(tmp_path):
+    path = tmp_path / 'frontier.db'
+    frontier = CrawlFrontier(path)
+    frontier.add(job(2022))
+    frontier.add(job(2023))
+    frontier.mark_done(job(2022), 2, match_keys=['a', 'b'], match_details=[('a', 'https://x/a/')])
+    frontier.mark_failed(job(2023), TimeoutError('slow'))
+    frontier.close()
+
+    # A crash leaves the SQLite file behind; the next run picks up from it
+    frontier = CrawlFrontier(path)
+    try:
+        assert frontier.is_done(job(2022).year_url)
+        assert frontier.state(job(2023).year_url) == FAILED
+        assert frontier.counts() == {DONE: 1, FAILED: 1}
+        assert frontier.known_matches(['a', 'c']) == {'a'}
+        assert frontier.match_count() == 2
+        assert frontier.pending_match_details() == [('a', 'https://x/a/')]
+    finally:
+        frontier.close()
+
+
+def test_rediscovering_a_page_keeps_its_state(tmp_path):
+    frontier = CrawlFrontier(tmp_path / 'frontier.db')
+    try:
+        frontier.mark_done(job(2022), 5)
+        frontier.add(job(2022))
+        assert frontier.is_done(job(2022).year_url)
+        frontier.add(job(2024))
+        assert frontier.state(job(2024).year_url) == PENDING
+        assert frontier.year_page(job(2024).year_url) == tuple(job(2024))
+        assert frontier.tournament_urls() == [job(2022).tournament_url]
+    finally:
+        frontier.close()
+
+
+def test_match_details_page_and_finish(tmp_path):
+    frontier = CrawlFrontier(tmp_path / 'frontier.db')
+    try:
+        details = [(key, f'https://x/{key}/') for key in 'abcde']
+        frontier.mark_done(job(2022), 5, match_keys='abcde', match_details=details)
+        assert frontier.pending_match_details(limit=2) == details[:2]
+        assert frontier.pending_match_details(after_key='b', limit=2) == details[2:4]
+
+        frontier.mark_match_details([('a', 3, None), ('b', None, ValueError('no table'))])
+        assert frontier.match_detail_counts() == {DONE: 1, FAILED: 1, PENDING: 3}
+        # Failed pages are tried again by the next run
+        assert [key for key, _ in frontier.pending_match_details()] == ['b', 'c', 'd', 'e']
+    finally:
+        frontier.close()
+
+
+def test_reset_forgets_everything(tmp_path):
+    frontier = CrawlFrontier(tmp_path / 'frontier.db')
+    try:
+        frontier.mark_done(job(2022), 1, match_keys=['a'], match_details=[('a', 'https://x/a/')])
+        frontier.set_meta('shard_count', '4')
+        frontier.reset()
+        assert frontier.counts() == {}
+        assert frontier.match_count() == 0
+        assert frontier.pending_match_details() == []
+        assert frontier.get_meta('shard_count') is None
+    finally:
+        frontier.close()
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+
+from config.os_config import ROOT_DIR
+from frontier import CrawlFrontier
+from output import CsvOutput, read_rows
+from scraper import YearJob, match_key
+from sharding import shard_of
+
+
+def row(tournament, player1, date='20240101'):
+    return {'country': 'USA', 'tournament': tournament, 'year': '2024', 'date': date, 'time': '12:00',
+            'player1': player1, 'player2': 'Opponent', 'score': '2 0', 'odds1': '1.5', 'odds2': '2.5'}
+
+
+def tournament_urls(shard_count):
+    """One tournament URL per shard."""
+    urls = {}
+    number = 0
+    while len(urls) < shard_count:
+        url = f'https://x/tennis/usa/tournament-{number}/results/'
+        urls.setdefault(shard_of(url, shard_count), url)
+        number += 1
+    return [urls[index] for index in range(shard_count)]
+
+
+def write_shard(tmp_path, index, shard_count, tournament_url, rows, recorded=None):
+    output_path = tmp_path / f'matches.{index}.csv'
+    frontier_path = tmp_path / f'frontier.{index}.db'
+    output = CsvOutput(output_path)
+    output.write_rows(rows)
+    output.close()
+    frontier = CrawlFrontier(frontier_path)
+    frontier.set_meta('shard_index', str(index))
+    frontier.set_meta('shard_count', str(shard_count))
+    job = YearJob('USA', rows[0]['tournament'], tournament_url, tournament_url.replace('/results/', '-2024/results/'))
+    frontier.mark_done(job, len(rows), match_keys=[match_key(r) for r in (recorded or rows)])
+    frontier.close()
+    return ['--shard', str(output_path), str(frontier_path)]
+
+
+def merge(tmp_path, shard_args):
+    merged = tmp_path / 'merged.csv'
+    result = subprocess.run(
+        [sys.executable, 'merge_shards.py', '--input-format', 'csv', '--output', str(merged), *shard_args],
+        cwd=ROOT_DIR, capture_output=True, text=True,
+    )
+    return result, merged
+
+
+def test_merges_shards_and_drops_duplicates(tmp_path):
+    urls = tournament_urls(2)
+    shared = row('T0', 'Shared')
+    shard_args = write_shard(tmp_path, 0, 2, urls[0], [row('T0', 'A'), shared])
+    shard_args += write_shard(tmp_path, 1, 2, urls[1], [row('T1', 'B'), shared])
+    result, merged = merge(tmp_path, shard_args)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert sorted(r['player1'] for r in read_rows('csv', merged)) == ['A', 'B', 'Shared']
+
+
+def test_rejects_a_missing_shard_and_a_short_output(tmp_path):
+    urls = tournament_urls(3)
+    # The frontier recorded one more match than the output holds
+    shard_args = write_shard(tmp_path, 0, 3, urls[0], [row('T0', 'A')],
+                             recorded=[row('T0', 'A'), row('T0', 'Lost')])
+    shard_args += write_shard(tmp_path, 1, 3, urls[1], [row('T1', 'B')])
+    result, _ = merge(tmp_path, shard_args)
+    assert result.returncode == 1
+    assert 'wrote 1 rows but its frontier recorded 2 matches' in result.stdout
+    assert 'shards missing from the merge: [2]' in result.stdout
+
+
+def test_rejects_tournaments_of_another_shard(tmp_path):
+    urls = tournament_urls(2)
+    shard_args = write_shard(tmp_path, 0, 2, urls[1], [row('T1', 'B')])
+    shard_args += write_shard(tmp_path, 1, 2, urls[1], [row('T1', 'C')])
+    result, _ = merge(tmp_path, shard_args)
+    assert result.returncode == 1
+    assert 'crawled 1 tournaments of other shards' in result.stdout
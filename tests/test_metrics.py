@@ -0,0 +1,42 @@
+import pytest
+
+from metrics import Distribution, Metrics
+
+
+def test_distribution_keeps_exact_totals_and_a_bounded_sample():
+    distribution = Distribution(size=100)
+    for value in range(1, 10001):
+        distribution.add(value)
+    stats = distribution.stats()
+    assert len(distribution.samples) == 100
+    assert (stats['count'], stats['sum'], stats['min'], stats['max']) == (10000, 50005000, 1, 10000)
+    assert stats['mean'] == 5000.5
+    # Estimated from the reservoir, so only roughly in place
+    assert 3000 < stats['p50'] < 7000
+    assert stats['p99'] > stats['p50']
+
+
+def test_small_series_have_exact_percentiles():
+    distribution = Distribution()
+    for value in (3, 1, 2):
+        distribution.add(value)
+    assert distribution.stats()['p50'] == 2
+    assert Distribution().stats()['count'] == 0
+
+
+def test_prometheus_summaries_have_sum_and_count(tmp_path):
+    metrics = Metrics()
+    metrics.observe('page_load', 0.5)
+    metrics.observe('page_load', 1.5)
+    metrics.record_value('page_transfer_kb', 100)
+    metrics.record_value('page_transfer_kb', 300)
+    metrics.count('year_pages', 2)
+    path = tmp_path / 'metrics.prom'
+    metrics.write_prometheus(path)
+    lines = path.read_text().splitlines()
+    assert 'scraper_stage_seconds_sum{stage="page_load"} 2.0' in lines
+    assert 'scraper_stage_seconds_count{stage="page_load"} 2' in lines
+    assert 'scraper_value_sum{name="page_transfer_kb"} 400.0' in lines
+    assert 'scraper_value_count{name="page_transfer_kb"} 2' in lines
+    assert 'scraper_events_total{name="year_pages"} 2' in lines
+    assert metrics.snapshot()['values']['page_transfer_kb']['mean'] == pytest.approx(200)
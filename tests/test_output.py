@@ -0,0 +1,40 @@
+from output import ParquetOutput, open_output, read_rows
+
+
+def row(n, tournament='Open', year='2024'):
+    return {'country': 'USA', 'tournament': tournament, 'year': year, 'date': '20240105', 'time': '12:00',
+            'player1': f'P{n}', 'player2': 'Q', 'score': '2 0', 'odds1': '1.5', 'odds2': 'N/A'}
+
+
+def test_parquet_round_trip_is_typed(tmp_path):
+    output = open_output('parquet', tmp_path / 'matches_parquet')
+    output.write_rows([row(1)])
+    output.close()
+    [read] = read_rows('parquet', tmp_path / 'matches_parquet')
+    assert read == {**row(1), 'odds1': '1.5', 'odds2': 'N/A'}
+    assert list((tmp_path / 'matches_parquet').glob('country=USA/tournament=Open/year=2024/*.parquet'))
+
+
+def test_parquet_batch_spanning_more_than_1024_partitions(tmp_path):
+    # Arrow refuses more than 1024 partitions per write by default; a batch of a full crawl has more
+    output = ParquetOutput(tmp_path / 'matches_parquet', batch_rows=10000)
+    rows = [row(n, tournament=f'T{n % 550}', year=str(2000 + n // 550)) for n in range(1100)]
+    output.write_rows(rows)
+    assert output.flush(force=True)
+    output.close()
+    assert len(list(read_rows('parquet', tmp_path / 'matches_parquet'))) == 1100
+
+
+def test_parquet_truncates_unless_appending(tmp_path):
+    for append, expected in ((False, 1), (True, 2)):
+        output = ParquetOutput(tmp_path / 'matches_parquet', append=append)
+        output.write_rows([row(1)])
+        output.close()
+        assert len(list(read_rows('parquet', tmp_path / 'matches_parquet'))) == expected
+
+
+def test_csv_round_trip(tmp_path):
+    output = open_output('csv', tmp_path / 'matches.csv')
+    output.write_rows([row(1)])
+    output.close()
+    assert list(read_rows('csv', tmp_path / 'matches.csv')) == [{**row(1), 'year': None}]
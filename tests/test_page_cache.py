@@ -0,0 +1,77 @@
+import os
+import time
+
+from page_cache import PageCache
+
+
+def page(kb=20):
+    # Random text, so every page compresses to about the same size
+    return os.urandom(kb * 512).hex()
+
+
+def test_round_trip_and_deduplication(tmp_path):
+    cache = PageCache(tmp_path)
+    try:
+        html = '<html>same</html>'
+        first = cache.put('https://x/a/', html, fetched_at=1)
+        second = cache.put('https://x/b/', html, fetched_at=2)
+        assert first == second
+        assert cache.get('https://x/a/') == html
+        assert cache.get('https://x/missing/') is None
+        assert len(list((tmp_path / 'objects').rglob('*.html.gz'))) == 1
+    finally:
+        cache.close()
+
+
+def test_get_returns_the_newest_fetch(tmp_path):
+    cache = PageCache(tmp_path)
+    try:
+        cache.put('https://x/a/', 'old', fetched_at=1)
+        cache.put('https://x/a/', 'new', fetched_at=2)
+        assert cache.get('https://x/a/') == 'new'
+        assert [(url, fetched_at) for url, fetched_at, _ in cache.latest_pages()] == [('https://x/a/', 2)]
+    finally:
+        cache.close()
+
+
+def test_least_recently_used_pages_are_evicted_first(tmp_path):
+    cache = PageCache(tmp_path)
+    try:
+        cache.put('https://x/1/', page(), fetched_at=1)
+        cache.put('https://x/2/', page(), fetched_at=2)
+        # Room for two and a half pages
+        cache.max_bytes = cache.total_bytes * 5 // 4
+        # Reading page 1 makes page 2 the least recently used
+        assert cache.get('https://x/1/') is not None
+        cache.put('https://x/3/', page(), fetched_at=time.time())
+        assert cache.get('https://x/2/') is None
+        assert cache.get('https://x/1/') is not None
+        assert cache.get('https://x/3/') is not None
+        assert cache.total_bytes <= cache.max_bytes
+    finally:
+        cache.close()
+
+
+def test_evict_drops_fetches_older_than_the_age_limit(tmp_path):
+    cache = PageCache(tmp_path, max_age_days=7)
+    try:
+        cache.put('https://x/old/', 'old page', fetched_at=time.time() - 8 * 86400)
+        cache.put('https://x/new/', 'new page')
+        cache.evict()
+        assert cache.get('https://x/old/') is None
+        assert cache.get('https://x/new/') == 'new page'
+        assert len(list((tmp_path / 'objects').rglob('*.html.gz'))) == 1
+    finally:
+        cache.close()
+
+
+def test_size_is_restored_after_reopening(tmp_path):
+    cache = PageCache(tmp_path)
+    cache.put('https://x/a/', page())
+    total_bytes = cache.total_bytes
+    cache.close()
+    cache = PageCache(tmp_path)
+    try:
+        assert cache.total_bytes == total_bytes > 0
+    finally:
+        cache.close()
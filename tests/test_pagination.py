@@ -0,0 +1,73 @@
+import pytest
+from lxml import html as lxml_html
+
+from benchmark.fixture_site import FixtureSite
+from extractor import extract_rows_from_html, page_count_from_html
+from pagination import PAGE_COUNT_JS, TURN_PAGE_JS, read_page_count, turn_page
+
+BASE_URL = 'http://fixture.test'
+YEAR_URL = f'{BASE_URL}/tennis/country-1/tournament-1-2023/results/'
+
+
+class FixtureDriver:
+    """
+    Runs what the pagination scripts do on a fixture season page with lxml, using the
+    XPaths and attribute the crawler passes to them. Turning a page appends its rows
+    below the ones already shown, like a site that loads more matches into the list.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.tree = lxml_html.fromstring(site.season_page(BASE_URL, 'country-1', 'tournament-1', '2023'))
+
+    @property
+    def page_source(self):
+        return lxml_html.tostring(self.tree, encoding='unicode')
+
+    def execute_script(self, script, *args):
+        if script == PAGE_COUNT_JS:
+            [link_xpath] = args
+            return max([int(link.get('data-number')) for link in self.tree.xpath(link_xpath)], default=1)
+        assert script == TURN_PAGE_JS
+        container_xpath, row_xpath, seen_attribute, link_xpath, url = args
+        container = self.tree.xpath(container_xpath)[0]
+        for row in container.xpath(row_xpath):
+            row.set(seen_attribute, '')
+        [link] = self.tree.xpath(link_xpath)
+        rows = self.site.event_rows(BASE_URL, 'country-1', 'tournament-1', '2023', int(link.get('data-number')))
+        for row in lxml_html.fragments_fromstring(rows):
+            container.append(row)
+
+
+@pytest.mark.parametrize('rows, rows_per_page, pages', [(23, 10, 3), (20, 10, 2), (9, 10, 1), (23, 0, 1)])
+def test_page_count(rows, rows_per_page, pages):
+    site = FixtureSite(countries=1, tournaments=1, years=1, rows=rows, rows_per_page=rows_per_page)
+    driver = FixtureDriver(site)
+
+    assert site.page_count() == pages
+    assert read_page_count(driver) == pages
+    assert page_count_from_html(driver.page_source) == pages
+
+
+def test_turning_a_page_leaves_only_its_rows_to_extract():
+    site = FixtureSite(countries=1, tournaments=1, years=1, rows=23, rows_per_page=10)
+    driver = FixtureDriver(site)
+    expected = [
+        extract_rows_from_html(site.season_page(BASE_URL, 'country-1', 'tournament-1', '2023'))
+    ] + [
+        extract_rows_from_html(
+            '<div class="flex flex-col px-3 text-sm">'
+            f'{site.event_rows(BASE_URL, "country-1", "tournament-1", "2023", number)}</div>'
+        )
+        for number in (2, 3)
+    ]
+
+    pages = [extract_rows_from_html(driver.page_source)]
+    for number in (2, 3):
+        turn_page(driver, YEAR_URL, number)
+        pages.append(extract_rows_from_html(driver.page_source))
+
+    assert [len(rows) for rows in pages] == [10, 10, 3]
+    assert pages == expected
+    # Rows already read stay in the page, flagged so they are not read again
+    assert driver.page_source.count('data-crawl-seen') == 20
@@ -0,0 +1,60 @@
+from pipeline import CrawlPipeline
+from scraper import YearJob
+
+PAGINATED = YearJob('Country 1', 'Tournament 1.1', 'https://x/tennis/c/t/', 'https://x/tennis/c/t-2023/results/')
+SINGLE = YearJob('Country 1', 'Tournament 1.1', 'https://x/tennis/c/t/', 'https://x/tennis/c/t-2022/results/')
+
+
+def page_rows(number):
+    return [{'page': number, 'row': row} for row in range(2)]
+
+
+def write(results):
+    """Run the writer stage over parse results given as (job, rows, error, page_number, page_count)."""
+    written = []
+    pipeline = CrawlPipeline(0, lambda job, rows, error: written.append((job.year_url, rows, error)))
+    for result in results:
+        pipeline.results.put(result)
+    pipeline.results.put(None)
+    pipeline._write_loop()
+    return written
+
+
+def test_pages_parsed_out_of_order_are_written_in_page_order():
+    written = write([
+        (PAGINATED, page_rows(2), None, 2, 3),
+        (SINGLE, page_rows(1), None, 1, 1),
+        (PAGINATED, page_rows(3), None, 3, 3),
+        (PAGINATED, page_rows(1), None, 1, 3),
+    ])
+
+    assert written == [
+        (SINGLE.year_url, page_rows(1), None),
+        (PAGINATED.year_url, page_rows(1) + page_rows(2) + page_rows(3), None),
+    ]
+
+
+def test_a_retried_season_is_written_once_without_duplicate_pages():
+    written = write([
+        # The first attempt got as far as page 2, the retry delivers every page again
+        (PAGINATED, page_rows(1), None, 1, 3),
+        (PAGINATED, page_rows(2), None, 2, 3),
+        (PAGINATED, page_rows(1), None, 1, 3),
+        (PAGINATED, page_rows(2), None, 2, 3),
+        (PAGINATED, page_rows(3), None, 3, 3),
+        # A page of the first attempt parsed only after the season was written
+        (PAGINATED, page_rows(3), None, 3, 3),
+    ])
+
+    assert written == [(PAGINATED.year_url, page_rows(1) + page_rows(2) + page_rows(3), None)]
+
+
+def test_a_failed_page_fails_the_season_once():
+    error = RuntimeError('page 2 could not be parsed')
+    written = write([
+        (PAGINATED, page_rows(1), None, 1, 3),
+        (PAGINATED, None, error, 2, 3),
+        (PAGINATED, page_rows(3), None, 3, 3),
+    ])
+
+    assert written == [(PAGINATED.year_url, None, error)]
@@ -0,0 +1,85 @@
+import pytest
+
+import rate_limiter as rate_limiter_module
+from metrics import Metrics
+from rate_limiter import AdaptiveRateLimiter
+
+URL = 'https://www.oddsportal.com/tennis/results/'
+HOST = 'www.oddsportal.com'
+
+
+@pytest.fixture
+def limiter():
+    # A rate high enough that spacing between requests never delays a test
+    return AdaptiveRateLimiter(initial_concurrency=2, max_concurrency=4, initial_rate=1e9, min_rate=1,
+                               max_rate=1e9, slow_factor=3)
+
+
+def test_success_grows_concurrency_additively(limiter):
+    limiter.release(limiter.acquire(URL))
+    assert limiter.hosts[HOST].concurrency == pytest.approx(2.5)
+    for _ in range(20):
+        limiter.release(limiter.acquire(URL))
+    assert limiter.limits()[HOST]['concurrency'] == 4
+
+
+def test_failure_halves_once_per_cooldown(limiter):
+    state = limiter._host(HOST)
+    state.concurrency = 4.0
+    state.rate = 1e6
+    limiter.release(limiter.acquire(URL), failed=True)
+    assert (state.concurrency, state.rate) == (2.0, 5e5)
+    # A second failure of the same burst does not halve again
+    limiter.release(limiter.acquire(URL), failed=True)
+    assert (state.concurrency, state.rate) == (2.0, 5e5)
+
+
+def test_throttled_and_slow_requests_count_as_failures(limiter, monkeypatch):
+    request = limiter.acquire(URL)
+    request.throttled()
+    limiter.release(request)
+    assert limiter.hosts[HOST].concurrency == 1.0
+
+    limiter.hosts[HOST].last_decrease = 0.0
+    limiter.hosts[HOST].concurrency = 4.0
+    limiter.hosts[HOST].latency = 0.1
+    request = limiter.acquire(URL)
+    request.started -= 1.0
+    limiter.release(request)
+    assert limiter.hosts[HOST].concurrency == 2.0
+
+
+def test_non_blocking_acquire_returns_none_when_the_host_is_full(limiter):
+    requests = [limiter.acquire(URL, block=False) for _ in range(2)]
+    assert all(request is not None for request in requests)
+    assert limiter.acquire(URL, block=False) is None
+    limiter.release(requests[0])
+    assert limiter.acquire(URL, block=False) is not None
+
+
+def test_slot_releases_as_failed_on_exception(limiter):
+    with pytest.raises(RuntimeError):
+        with limiter.slot(URL):
+            raise RuntimeError('page crashed')
+    assert limiter.hosts[HOST].in_flight == 0
+    assert limiter.hosts[HOST].concurrency == 1.0
+
+
+def test_disabled_limiter_hands_out_untracked_requests(limiter):
+    limiter.configure(enabled=False)
+    request = limiter.acquire(URL)
+    limiter.release(request)
+    assert HOST not in limiter.hosts
+
+
+def test_module_has_a_shared_limiter():
+    assert isinstance(rate_limiter_module.rate_limiter, AdaptiveRateLimiter)
+
+
+def test_limits_are_published_as_gauges_labelled_by_host(limiter, tmp_path, monkeypatch):
+    published = Metrics()
+    monkeypatch.setattr(rate_limiter_module, 'metrics', published)
+    limiter.release(limiter.acquire(URL))
+    path = tmp_path / 'metrics.prom'
+    published.write_prometheus(path)
+    assert f'scraper_gauge{{name="concurrency_limit",host="{HOST}"}} 2' in path.read_text().splitlines()
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from retry import (
+    TOURNAMENT, DeadLetters, RetriesExhausted, RetryPolicy, call_with_retries, error_details
+)
+
+NO_WAIT = RetryPolicy(attempts=3, base_delay=0, max_delay=0)
+
+
+def test_retries_until_success():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutError('slow')
+        return 'page'
+
+    assert call_with_retries(flaky, NO_WAIT, 'page') == 'page'
+    assert len(calls) == 3
+
+
+def test_gives_up_after_the_last_attempt():
+    def broken():
+        raise ValueError('bad html')
+
+    with pytest.raises(RetriesExhausted) as raised:
+        call_with_retries(broken, NO_WAIT, 'page')
+    assert raised.value.attempts == 3
+    assert error_details(raised.value) == ('ValueError', 'bad html', 3)
+    assert error_details(KeyError('x')) == ('KeyError', "'x'", 1)
+
+
+def test_backoff_stays_within_the_cap():
+    policy = RetryPolicy(attempts=10, base_delay=1, max_delay=4)
+    assert all(0 <= policy.delay(attempt) <= 4 for attempt in range(1, 10))
+
+
+def test_dead_letters_round_trip(tmp_path):
+    path = str(tmp_path / 'dead_letters.jsonl')
+    dead_letters = DeadLetters(path)
+    dead_letters.add(TOURNAMENT, 'https://x/t/', RetriesExhausted('tournament', TimeoutError('slow'), 3),
+                     country_name='USA')
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind": "trunc')
+    records = DeadLetters.load(path)
+    assert len(records) == 1
+    assert records[0]['kind'] == TOURNAMENT
+    assert records[0]['error_class'] == 'TimeoutError'
+    assert records[0]['attempts'] == 3
+    assert records[0]['country_name'] == 'USA'
+    assert DeadLetters.load(str(tmp_path / 'missing.jsonl')) == []
+
+
+def test_retry_run_replaces_the_file_only_when_committed(tmp_path):
+    path = str(tmp_path / 'dead_letters.jsonl')
+    DeadLetters(path).add(TOURNAMENT, 'https://x/a/', TimeoutError('slow'))
+    DeadLetters(path).add(TOURNAMENT, 'https://x/b/', TimeoutError('slow'))
+
+    # A retry run that stops early keeps every unit of the original file
+    retry = DeadLetters(path, replace=True)
+    retry.add(TOURNAMENT, 'https://x/a/', TimeoutError('still slow'))
+    assert [record['url'] for record in DeadLetters.load(path)] == ['https://x/a/', 'https://x/b/']
+
+    retry = DeadLetters(path, replace=True)
+    retry.add(TOURNAMENT, 'https://x/b/', TimeoutError('still slow'))
+    retry.commit()
+    assert [record['url'] for record in DeadLetters.load(path)] == ['https://x/b/']
+
+    # Nothing failed this time
+    DeadLetters(path, replace=True).commit()
+    assert not os.path.exists(path)
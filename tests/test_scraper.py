@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import scraper
+from extractor import year_from_url
+from rate_limiter import AdaptiveRateLimiter
+from scraper import FetchedPage, YearJob, is_current_season, match_key, tag_rows
+
+
+@pytest.mark.parametrize('year_url, year', [
+    ('https://www.oddsportal.com/tennis/australia/australian-open-2023/results/', '2023'),
+    ('https://www.oddsportal.com/tennis/australia/australian-open-2023/results', '2023'),
+    ('https://www.oddsportal.com/tennis/australia/australian-open-2023/', '2023'),
+    ('https://www.oddsportal.com/tennis/australia/australian-open/results/', 'Current'),
+    # Numbers that are part of the tournament name are not seasons
+    ('https://www.oddsportal.com/tennis/usa/atp-250/results/', 'Current'),
+    ('https://www.oddsportal.com/tennis/usa/atp-250-2021/results/', '2021'),
+    ('http://127.0.0.1:8000/tennis/country-1/tournament-1/results/', 'Current'),
+])
+def test_year_from_url(year_url, year):
+    assert year_from_url(year_url) == year
+
+
+def test_only_the_unsuffixed_page_is_refreshed_incrementally():
+    assert is_current_season('https://www.oddsportal.com/tennis/usa/us-open/results/')
+    assert not is_current_season('https://www.oddsportal.com/tennis/usa/us-open-2023/results/')
+
+
+def test_match_key_does_not_depend_on_the_season_page():
+    row = {'date': '20240105', 'time': '12:00', 'player1': 'A', 'player2': 'B', 'score': '2 0',
+           'odds1': '1.5', 'odds2': '2.5', 'match_url': '/tennis/usa/us-open/a-b-xyz/'}
+    current = YearJob('USA', 'US Open', 'https://x/tennis/usa/us-open/results/',
+                      'https://x/tennis/usa/us-open/results/')
+    finished = current._replace(year_url='https://x/tennis/usa/us-open-2024/results/')
+    [from_current] = tag_rows([dict(row)], current)
+    [from_finished] = tag_rows([dict(row)], finished)
+    assert (from_current['year'], from_finished['year']) == ('Current', '2024')
+    assert match_key(from_current) == match_key(from_finished)
+    assert from_current['match_url'] == 'https://x/tennis/usa/us-open/a-b-xyz/'
+
+
+def test_fetch_season_loads_the_next_page_while_the_caller_has_the_current_one(monkeypatch):
+    limiter = AdaptiveRateLimiter(initial_concurrency=1, initial_rate=1e9, max_rate=1e9)
+    monkeypatch.setattr(scraper, 'rate_limiter', limiter)
+    job = YearJob('USA', 'US Open', 'https://x/t/results/', 'https://x/t-2023/results/')
+    turned = []
+    monkeypatch.setattr(scraper, 'fetch_year', lambda driver, job, engine, cache: FetchedPage(job, '', [], 0.01))
+    monkeypatch.setattr(scraper, 'read_page_count', lambda driver: 3)
+    monkeypatch.setattr(scraper, 'turn_page', lambda driver, year_url, number: turned.append(number))
+    monkeypatch.setattr(scraper, 'wait_until_ready', lambda driver, page_type: 1)
+    monkeypatch.setattr(
+        scraper, 'snapshot_page',
+        lambda driver, job, engine, cache, start, number, count: FetchedPage(
+            job, '', [], time.perf_counter() - start, number, count
+        )
+    )
+
+    numbers = []
+    for page in scraper.fetch_season(None, job):
+        numbers.append(page.page_number)
+        assert page.fetch_seconds < 0.05
+        # The switch to the next page has already started when a page is handed out
+        assert turned == [number for number in (2, 3) if number <= page.page_number + 1]
+        time.sleep(0.05)
+    assert numbers == [1, 2, 3]
+    # The caller's time on each page counts neither as the host's latency nor as the page's load
+    assert limiter.hosts['x'].in_flight == 0
+    assert limiter.hosts['x'].latency < 0.05
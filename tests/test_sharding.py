@@ -0,0 +1,25 @@
+from sharding import in_shard, shard_of, shard_path
+
+
+def test_shard_ignores_scheme_host_and_results_suffix():
+    shard = shard_of('https://www.oddsportal.com/tennis/usa/us-open/results/', 8)
+    assert shard_of('http://oddsportal.com/tennis/usa/us-open', 8) == shard
+    assert shard_of('https://www.oddsportal.com/tennis/usa/us-open/', 8) == shard
+
+
+def test_every_tournament_is_in_exactly_one_shard():
+    urls = [f'https://x/tennis/country-{c}/tournament-{t}/results/' for c in range(10) for t in range(10)]
+    for url in urls:
+        assert sum(in_shard(url, index, 4) for index in range(4)) == 1
+    # The hash spreads tournaments over all shards
+    assert {shard_of(url, 4) for url in urls} == {0, 1, 2, 3}
+
+
+def test_single_shard_takes_everything():
+    assert in_shard('https://x/tennis/a/b/results/', 0, 1)
+
+
+def test_shard_path():
+    assert shard_path('matches.csv', 0, 1) == 'matches.csv'
+    assert shard_path('/data/matches.csv', 1, 4) == '/data/matches.shard-1-of-4.csv'
+    assert shard_path('/data/matches_parquet', 2, 4) == '/data/matches_parquet.shard-2-of-4'